@@ -0,0 +1,94 @@
+"""
+End-to-end crawl throughput against the local stand-in server: fetching,
+parsing, pagination and deduplication, without touching the network.
+
+    python benchmarks/bench_crawl.py --searches 8 --pages 5
+
+Each case runs the crawler against a fresh server with different latency,
+error and throttling settings and reports pages and listings per second.
+The server shares the crawler's event loop (serving pre-rendered pages is
+cheap), so absolute numbers are a lower bound on what the crawler alone
+would sustain.
+"""
+import argparse
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import common
+from server import StandInServer
+
+from scraper.crawler import ImmowebCrawler
+
+# name -> StandInServer settings
+CASES: Dict[str, Dict[str, Any]] = {
+    "clean": {"latency": 0.02},
+    "jitter": {"latency": 0.02, "jitter": 0.08},
+    "errors": {"latency": 0.02, "error_rate": 0.02},
+    "throttled": {"latency": 0.02, "throttle_rate": 0.02, "retry_after": 1},
+}
+
+async def _crawl_case(
+    settings: Dict[str, Any],
+    searches: int,
+    pages: int,
+    concurrency: int,
+    parser_backend: str,
+) -> Dict[str, float]:
+    logger = logging.getLogger("bench_crawl")
+    logger.setLevel(logging.CRITICAL)
+    async with StandInServer(pages_per_search=pages, **settings) as server:
+        crawler = ImmowebCrawler(
+            # One empty page past the last result page ends each search
+            max_pages=pages + 1,
+            concurrency=concurrency,
+            request_delay=0,
+            parser_backend=parser_backend,
+            logger=logger,
+        )
+        started = time.perf_counter()
+        listings = 0
+        async for _ in crawler.iter_listings(server.search_urls(searches)):
+            listings += 1
+        elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "listings": listings, **server.stats}
+
+def run(
+    searches: int = 8,
+    pages: int = 5,
+    concurrency: int = 8,
+    parser_backend: str = "html.parser",
+    cases: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for case in cases or CASES:
+        stats = asyncio.run(
+            _crawl_case(CASES[case], searches, pages, concurrency, parser_backend)
+        )
+        elapsed = stats["elapsed"]
+        results += [
+            common.result("crawl", case, "elapsed", elapsed, "seconds"),
+            common.result("crawl", case, "pages_per_sec", stats["pages"] / elapsed, "pages/s"),
+            common.result("crawl", case, "listings_per_sec", stats["listings"] / elapsed, "listings/s"),
+            common.result("crawl", case, "listings", stats["listings"], "count"),
+            common.result("crawl", case, "requests", stats["requests"], "count"),
+        ]
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--searches", type=int, default=8)
+    parser.add_argument("--pages", type=int, default=5, help="Result pages per search")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--parser-backend", default="html.parser")
+    parser.add_argument("--case", action="append", choices=list(CASES), help="Run only these cases")
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+    results = run(
+        args.searches, args.pages, args.concurrency, args.parser_backend, args.case
+    )
+    common.write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+Delta-mode cost against snapshot size, for the in-memory snapshot tracker
+and the SQLite state store.
+
+    python benchmarks/bench_delta.py --sizes 1000 10000 50000
+
+The current crawl differs from the previous one by 5% new, 5% changed and
+5% delisted listings. Times cover classifying every current listing and
+collecting the delisted ones, as a run does after crawling.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+
+import common
+import fixtures
+
+from monitoring.delta_mode import DeltaTracker
+from monitoring.state_store import ListingStateStore
+from scraper.listing import Listing
+from scraper.utils import listing_digest
+
+BATCH_SIZE = 500
+
+def make_current(previous: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """The next crawl of `previous`: 5% new, 5% changed, 5% delisted."""
+    count = len(previous)
+    step = 20
+    current = []
+    for i, item in enumerate(previous):
+        if i % step == 0:
+            continue  # delisted
+        item = dict(item)
+        if i % step == 1:
+            item["price"] = "€9,999/month"
+            item["contentHash"] = listing_digest(item)
+        current.append(item)
+    for extra in fixtures.make_listings(count // step, seed=11):
+        extra["id"] = str(int(extra["id"]) + 50_000_000)
+        extra["url"] += "-new"
+        current.append(extra)
+    return current
+
+def _classify(tracker: Any, current: List[Dict[str, Any]]) -> None:
+    for start in range(0, len(current), BATCH_SIZE):
+        tracker.annotate_batch(current[start : start + BATCH_SIZE])
+    for _ in tracker.unseen():
+        pass
+    tracker.close()
+
+def time_snapshot(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> float:
+    # As main.load_previous_snapshot does, the snapshot is held as Listings
+    snapshot = [Listing.from_dict(item) for item in previous]
+    batch = [Listing.from_dict(item) for item in current]
+    started = time.perf_counter()
+    _classify(DeltaTracker(snapshot), batch)
+    return time.perf_counter() - started
+
+def time_state_store(previous: List[Dict[str, Any]], current: List[Dict[str, Any]]) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "state.sqlite"
+        _classify(ListingStateStore(path), [Listing.from_dict(i) for i in previous])
+        batch = [Listing.from_dict(item) for item in current]
+        started = time.perf_counter()
+        _classify(ListingStateStore(path), batch)
+        return time.perf_counter() - started
+
+def run(sizes: Sequence[int] = (1_000, 10_000, 50_000), repeat: int = 3) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        previous = fixtures.make_listings(size)
+        current = make_current(previous)
+        for backend, timer in (("snapshot", time_snapshot), ("sqlite", time_state_store)):
+            elapsed = min(timer(previous, current) for _ in range(max(1, repeat)))
+            case = f"{backend}-{size}"
+            results += [
+                common.result("delta", case, "elapsed", elapsed, "seconds"),
+                common.result("delta", case, "throughput", len(current) / elapsed, "listings/s"),
+            ]
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+    common.write_results(run(args.sizes, args.repeat), args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,70 @@
+"""
+Time to write a run's listings in each output format, through the same
+sinks a run uses.
+
+    python benchmarks/bench_export.py --listings 20000
+
+Formats whose optional dependency is missing (Parquet without pyarrow)
+are skipped.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import common
+import fixtures
+
+from main import open_sinks
+from outputs.registry import EXPORTERS
+from scraper.listing import Listing
+
+def time_format(fmt: str, listings: List[Listing], directory: Path) -> Optional[Dict[str, float]]:
+    config = {"output_formats": [fmt], "parquet_row_group_size": 50_000}
+    started = time.perf_counter()
+    try:
+        sinks = open_sinks(config, directory / "listings")
+    except ImportError:
+        return None
+    with sinks[fmt] as sink:
+        sink.write_many(listings)
+    elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "size": sink.path.stat().st_size}
+
+def run(
+    listings: int = 20_000,
+    repeat: int = 3,
+    formats: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    records = [Listing.from_dict(item) for item in fixtures.make_listings(listings)]
+    results: List[Dict[str, Any]] = []
+    for fmt in formats or EXPORTERS:
+        best: Optional[Dict[str, float]] = None
+        for _ in range(max(1, repeat)):
+            with tempfile.TemporaryDirectory() as tmp:
+                stats = time_format(fmt, records, Path(tmp))
+            if stats is None:
+                break
+            if best is None or stats["elapsed"] < best["elapsed"]:
+                best = stats
+        if best is None:
+            continue
+        results += [
+            common.result("export", fmt, "elapsed", best["elapsed"], "seconds"),
+            common.result("export", fmt, "throughput", listings / best["elapsed"], "rows/s"),
+            common.result("export", fmt, "file_size", best["size"], "bytes"),
+        ]
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--format", action="append", choices=list(EXPORTERS))
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+    common.write_results(run(args.listings, args.repeat, args.format), args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
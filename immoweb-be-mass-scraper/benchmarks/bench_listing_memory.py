@@ -0,0 +1,55 @@
+"""
+Memory held per listing when a snapshot is loaded for delta mode: plain
+dicts (as `json.load` returns them) versus `Listing` records.
+
+    python benchmarks/bench_listing_memory.py --listings 100000
+
+Reports the bytes per listing of each representation.
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+from typing import Any, Dict, List
+
+import common
+import fixtures
+
+from scraper.listing import Listing
+
+def make_snapshot(count: int, seed: int = 7) -> str:
+    """JSON snapshot text with the field cardinalities of a real crawl."""
+    return json.dumps(fixtures.make_listings(count, seed), ensure_ascii=False)
+
+def measure(text: str, as_listings: bool) -> int:
+    gc.collect()
+    tracemalloc.start()
+    data = json.loads(text)
+    if as_listings:
+        # Same in-place conversion as main.load_previous_snapshot
+        for i, item in enumerate(data):
+            data[i] = Listing.from_dict(item)
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del data
+    return current
+
+def run(listings: int = 50_000) -> List[Dict[str, Any]]:
+    text = make_snapshot(listings)
+    dict_bytes = measure(text, as_listings=False)
+    listing_bytes = measure(text, as_listings=True)
+    return [
+        common.result("listing_memory", "dict", "per_listing", dict_bytes / listings, "bytes"),
+        common.result("listing_memory", "listing", "per_listing", listing_bytes / listings, "bytes"),
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listings", type=int, default=50_000)
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+    common.write_results(run(args.listings), args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,47 @@
+"""
+Cost of the normalization stage (range checks and derived price fields)
+against snapshot size, in the batches a run normalizes.
+
+    python benchmarks/bench_normalize.py --sizes 10000 100000
+"""
+import argparse
+from typing import Any, Dict, List
+
+import common
+import fixtures
+
+from scraper.listing import Listing
+from scraper.normalize import normalize_batch
+
+def run(sizes: List[int], batch_size: int = 500, repeat: int = 3) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    for size in sizes:
+        items = fixtures.make_listings(size)
+
+        def normalize_all() -> None:
+            listings = [Listing.from_dict(item) for item in items]
+            for start in range(0, size, batch_size):
+                normalize_batch(listings[start:start + batch_size])
+
+        # Building the listings is part of every repetition; time it alone
+        # to report the normalization cost only
+        build = common.best_of(lambda: [Listing.from_dict(item) for item in items], repeat)
+        elapsed = max(0.0, common.best_of(normalize_all, repeat) - build)
+        case = f"{size}_listings"
+        results += [
+            common.result("normalize", case, "elapsed", elapsed, "seconds"),
+            common.result("normalize", case, "throughput", size / max(elapsed, 1e-9), "listings/s"),
+        ]
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+    common.write_results(run(args.sizes, args.batch_size, args.repeat), args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+Parse cost of search-result pages, per page and per card, for every parser
+backend that is installed (DOM heuristics) and for pages that embed their
+results as JSON (the "embedded" case, which needs no HTML parser).
+
+    python benchmarks/bench_parse.py --pages 40 --repeat 3
+"""
+import argparse
+import importlib.util
+from typing import Any, Dict, List
+
+import common
+import fixtures
+
+from scraper.parser import PARSER_BACKENDS, extract_listings_from_search_page
+
+def available_backends() -> List[str]:
+    # "lxml" and "html5lib" are named after the package they need
+    return [
+        name
+        for name, features in PARSER_BACKENDS.items()
+        if features == "html.parser" or importlib.util.find_spec(features)
+    ]
+
+def run(pages: int = 40, cards: int = 30, repeat: int = 3) -> List[Dict[str, Any]]:
+    corpus = fixtures.corpus(pages, cards=cards)
+    page_bytes = sum(len(html.encode("utf-8")) for html in corpus)
+    results = [
+        common.result("parse", "corpus", "page_size", page_bytes / len(corpus), "bytes"),
+    ]
+    cases = [(backend, backend, corpus) for backend in available_backends()]
+    cases.append(("embedded", "html.parser", fixtures.corpus(pages, cards=cards, embedded=True)))
+    for case, backend, pages_html in cases:
+        parsed = 0
+
+        def parse_all() -> None:
+            nonlocal parsed
+            parsed = sum(
+                len(extract_listings_from_search_page(html, backend=backend))
+                for html in pages_html
+            )
+
+        elapsed = common.best_of(parse_all, repeat)
+        results += [
+            common.result("parse", case, "per_page", elapsed / len(pages_html), "seconds"),
+            common.result("parse", case, "per_card", elapsed / max(1, parsed), "seconds"),
+            common.result("parse", case, "throughput", parsed / elapsed, "cards/s"),
+        ]
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+    common.write_results(run(args.pages, args.cards, args.repeat), args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,93 @@
+"""
+CLI startup cost: wall time of `main.py --help` and of importing `main`,
+each in a fresh interpreter, plus the one-off import cost of every output
+format's exporter.
+
+    python benchmarks/bench_startup.py --repeat 5
+
+`heavy_modules` counts the optional heavy packages (bs4, openpyxl,
+pyarrow, aiohttp.web) that importing `main` already loaded; none of them
+is needed before a run uses it.
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+import common
+
+from outputs.registry import EXPORTERS
+
+HEAVY_MODULES = ("bs4", "openpyxl", "pyarrow", "aiohttp.web")
+
+_IMPORT_MAIN = f"""
+import sys, time, json
+sys.path.insert(0, {str(common.SRC_DIR)!r})
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+heavy = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+print(json.dumps({{"elapsed": elapsed, "heavy": heavy}}))
+"""
+
+_IMPORT_EXPORTER = f"""
+import sys, time, json
+sys.path.insert(0, {str(common.SRC_DIR)!r})
+import main
+from outputs.registry import load_sink_class
+started = time.perf_counter()
+try:
+    load_sink_class(sys.argv[1])
+except ImportError:
+    print("null")
+else:
+    print(json.dumps(time.perf_counter() - started))
+"""
+
+def _python(*args: str) -> str:
+    out = subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, check=True
+    )
+    return out.stdout
+
+def time_help(repeat: int) -> float:
+    main_py = str(common.SRC_DIR / "main.py")
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        _python(main_py, "--help")
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def run(repeat: int = 5) -> List[Dict[str, Any]]:
+    help_elapsed = time_help(repeat)
+    imports = [json.loads(_python("-c", _IMPORT_MAIN)) for _ in range(max(1, repeat))]
+    results = [
+        common.result("startup", "help", "elapsed", help_elapsed, "seconds"),
+        common.result(
+            "startup", "import_main", "elapsed", min(i["elapsed"] for i in imports), "seconds"
+        ),
+        common.result(
+            "startup", "import_main", "heavy_modules", len(imports[0]["heavy"]), "modules"
+        ),
+    ]
+    for fmt in EXPORTERS:
+        timings = [json.loads(_python("-c", _IMPORT_EXPORTER, fmt)) for _ in range(max(1, repeat))]
+        if timings[0] is None:
+            continue
+        results.append(
+            common.result("startup", f"exporter.{fmt}", "import", min(timings), "seconds")
+        )
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+    common.write_results(run(args.repeat), args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,71 @@
+"""Helpers shared by the benchmark scripts."""
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+SRC_DIR = BENCH_DIR.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+# Units where a larger value is an improvement; for all others (seconds,
+# bytes, ...) smaller is better
+HIGHER_IS_BETTER = ("pages/s", "cards/s", "listings/s", "rows/s", "ratio")
+
+def result(
+    benchmark: str, case: str, metric: str, value: float, unit: str
+) -> Dict[str, Any]:
+    return {
+        "benchmark": benchmark,
+        "case": case,
+        "metric": metric,
+        "value": round(value, 6),
+        "unit": unit,
+    }
+
+def best_of(fn: Callable[[], Any], repeat: int = 3) -> float:
+    """Fastest wall-clock time of `repeat` calls to `fn`, in seconds."""
+    best = float("inf")
+    for _ in range(max(1, repeat)):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def _git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+def metadata() -> Dict[str, Any]:
+    return {
+        "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+def write_results(results: List[Dict[str, Any]], output: Optional[str] = None) -> None:
+    """
+    Write a results document ({"meta": ..., "results": [...]}) as JSON to
+    `output`, or to stdout when no path is given.
+    """
+    document = {"meta": metadata(), "results": results}
+    text = json.dumps(document, indent=2)
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Compare two benchmark results files and flag regressions.
+
+    python benchmarks/compare.py baseline.json current.json --threshold 0.1
+
+Prints every metric present in both files with its relative change, and
+exits with status 1 if any got worse by more than the threshold.
+Throughput-style units count higher as better; times and sizes lower.
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+from common import HIGHER_IS_BETTER
+
+def _load(path: str) -> Dict[Tuple[str, str, str], Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        document = json.load(f)
+    return {
+        (r["benchmark"], r["case"], r["metric"]): r for r in document["results"]
+    }
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Relative change counted as a regression"
+    )
+    args = parser.parse_args()
+
+    baseline = _load(args.baseline)
+    current = _load(args.current)
+    regressions = 0
+    for key in sorted(baseline.keys() & current.keys()):
+        before = baseline[key]["value"]
+        after = current[key]["value"]
+        unit = current[key]["unit"]
+        if unit == "count" or not before:
+            continue
+        change = (after - before) / before
+        worse = -change if unit in HIGHER_IS_BETTER else change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{'/'.join(key):<45} {before:>14.6g} -> {after:<14.6g} {unit:<11} {change:+7.1%}{flag}")
+    if regressions:
+        print(f"{regressions} regression(s) above {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
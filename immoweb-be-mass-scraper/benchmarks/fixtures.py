@@ -0,0 +1,334 @@
+"""
+Synthetic corpus of Immoweb search-result pages and listing snapshots.
+
+Pages mimic the live markup closely enough to exercise every branch of the
+parser: cards with and without the class hooks it looks for, sale and rent
+prices (including project price ranges and "price on request"), English,
+French and Dutch labels, lazy-loaded photos with data: placeholders, and
+the heavy page chrome (navigation, filters, inline state script, footer)
+that dominates real pages by size. Pages can also carry their results as
+embedded JSON, like live pages do, for the parser's fast path. Everything
+is derived from a seed, so a given (search, page) is byte-for-byte
+identical between runs.
+
+    python benchmarks/fixtures.py --out /tmp/corpus --pages 20
+
+writes a corpus to disk for inspection or for other tools.
+"""
+import argparse
+import json
+import random
+from html import escape
+from pathlib import Path
+from typing import Any, Dict, List
+
+import common  # noqa: F401  (puts src/ on sys.path)
+
+from scraper.utils import listing_digest
+
+PROPERTY_TYPES = ("Apartment", "House", "Studio", "Villa", "Loft", "Duplex", "Penthouse")
+LOCALITIES = (
+    ("1000", "Brussels"),
+    ("1050", "Ixelles"),
+    ("1060", "Saint-Gilles"),
+    ("1180", "Uccle"),
+    ("2000", "Antwerpen"),
+    ("2018", "Antwerpen"),
+    ("3000", "Leuven"),
+    ("4000", "Liège"),
+    ("5000", "Namur"),
+    ("8000", "Brugge"),
+    ("8400", "Oostende"),
+    ("9000", "Gent"),
+)
+AGENCIES = tuple(f"Immo {name}" for name in ("Dewaele", "Trevi", "Century", "Latour", "Era", "Engel"))
+DESCRIPTIONS = (
+    "Bright apartment close to shops and public transport, with a south-facing terrace.",
+    "Lumineux appartement proche des commerces, cuisine équipée et cave privative.",
+    "Instapklaar appartement met ruime living, open keuken en zonnig terras.",
+    "Charming townhouse with garden, fully renovated in 2021, quiet street.",
+)
+LABELS = {
+    "en": ("bedrooms", "bathroom"),
+    "fr": ("chambres", "salle de bain"),
+    "nl": ("slaapkamers", "badkamer"),
+}
+_PLACEHOLDER = "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7"
+
+def _price(rnd: random.Random, transaction: str) -> Dict[str, Any]:
+    """The `price` object of a search result."""
+    price: Dict[str, Any] = {
+        "type": "residential_monthly_rent" if transaction == "for-rent" else "residential_sale",
+        "mainValue": None,
+        "minRangeValue": None,
+        "maxRangeValue": None,
+        "mainDisplayPrice": None,
+    }
+    roll = rnd.random()
+    if roll < 0.03:
+        return price  # Price on request
+    if transaction == "for-rent":
+        price["mainValue"] = rnd.randint(550, 3500)
+        price["mainDisplayPrice"] = f"€{price['mainValue']:,}/month"
+        return price
+    amount = rnd.randint(120, 1200) * 1000
+    if roll < 0.08:
+        # New-build projects advertise a range
+        high = amount + rnd.randint(20, 200) * 1000
+        price.update(minRangeValue=amount, maxRangeValue=high)
+        price["mainDisplayPrice"] = f"€{amount:,} - €{high:,}"
+        return price
+    price["mainValue"] = amount
+    price["mainDisplayPrice"] = f"€{amount:,}"
+    return price
+
+def make_result(rnd: random.Random, listing_id: int, transaction: str) -> Dict[str, Any]:
+    """One search result, shaped like the JSON Immoweb embeds in its pages."""
+    postcode, city = rnd.choice(LOCALITIES)
+    ptype = rnd.choice(PROPERTY_TYPES)
+    pictures = [
+        {
+            "smallUrl": f"https://static.immoweb.be/photos/0/{listing_id}/{n}/small.jpg",
+            "largeUrl": f"https://static.immoweb.be/photos/0/{listing_id}/{n}/{listing_id}_{n}.jpg",
+        }
+        for n in range(rnd.randint(1, 6))
+    ]
+    epc = rnd.choice("ABCDEFG") if rnd.random() < 0.6 else None
+    agency = rnd.choice(AGENCIES) if rnd.random() < 0.7 else None
+    posted = (
+        f"2024-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}T10:00:00.000+0000"
+        if rnd.random() < 0.5
+        else None
+    )
+    return {
+        "id": listing_id,
+        "customers": [{"id": 1000 + AGENCIES.index(agency), "name": agency}] if agency else [],
+        "media": {"pictures": pictures},
+        "price": _price(rnd, transaction),
+        "property": {
+            "type": ptype.upper(),
+            "subtype": ptype.upper(),
+            "title": None,
+            "description": rnd.choice(DESCRIPTIONS),
+            "bedroomCount": rnd.randint(0, 5),
+            "bathroomCount": rnd.randint(1, 3),
+            "netHabitableSurface": rnd.randint(25, 400),
+            "location": {"country": "Belgium", "locality": city, "postalCode": postcode},
+        },
+        "publication": {"creationDate": posted},
+        "transaction": {
+            "type": "FOR_RENT" if transaction == "for-rent" else "FOR_SALE",
+            "certificates": {"epcScore": epc},
+        },
+    }
+
+def render_card(rnd: random.Random, result: Dict[str, Any]) -> str:
+    """HTML for the result card showing `result`."""
+    listing_id = result["id"]
+    prop = result["property"]
+    lang = rnd.choice(("en", "en", "fr", "nl"))
+    ptype = prop["subtype"].capitalize()
+    postcode = prop["location"]["postalCode"]
+    city = prop["location"]["locality"]
+    transaction = "for-rent" if result["transaction"]["type"] == "FOR_RENT" else "for-sale"
+    url = (
+        f"https://www.immoweb.be/{lang}/classified/{ptype.lower()}/{transaction}/"
+        f"{city.lower()}/{postcode}/{listing_id}"
+    )
+    bedrooms_label, bathroom_label = LABELS[lang]
+    photos = "".join(
+        f'<img class="card__media-picture" src="{_PLACEHOLDER}" '
+        f'data-src="{escape(picture["largeUrl"])}" '
+        f'alt="{escape(ptype)} photo {n + 1}" loading="lazy">'
+        for n, picture in enumerate(result["media"]["pictures"])
+    )
+    price = escape(result["price"]["mainDisplayPrice"] or "Price on request")
+    # Older card templates lack the class hooks, so the parser falls back to
+    # scanning the card text
+    hooked = rnd.random() < 0.85
+    price_html = (
+        f'<p class="card--result__price"><span class="sr-only">Price</span>'
+        f'<span aria-hidden="true" class="price">{price}</span></p>'
+        if hooked
+        else f"<span>{price}</span>"
+    )
+    locality_class = "card__information--locality locality" if hooked else "card__information"
+    extras = []
+    epc = result["transaction"]["certificates"]["epcScore"]
+    if epc:
+        extras.append(f'<span class="epc">EPC {epc}</span>')
+    if result["customers"]:
+        extras.append(f'<p class="agency-name">{escape(result["customers"][0]["name"])}</p>')
+    posted = result["publication"]["creationDate"]
+    if posted:
+        extras.append(f'<span class="date">{posted[8:10]}/{posted[5:7]}/{posted[:4]}</span>')
+    return (
+        f'<li class="search-results__item">'
+        f'<article class="card card--result card--xl" id="classified_{listing_id}">'
+        f'<div class="card__media-container"><div class="card__media-wrapper">{photos}</div>'
+        f'<button class="card__save" aria-label="Save">&#9825;</button></div>'
+        f'<div class="card--result__body">'
+        f'<h2 class="card__title card--result__title">'
+        f'<a href="{url}" class="card__title-link">{escape(ptype)} {transaction.replace("-", " ")}</a></h2>'
+        f"{price_html}"
+        f'<p class="card__information card--result__information">'
+        f"{prop['bedroomCount']} {bedrooms_label} &middot; {prop['bathroomCount']} {bathroom_label}"
+        f" &middot; <span>{prop['netHabitableSurface']} m²</span></p>"
+        f'<p class="{locality_class}">{postcode} {escape(city)}</p>'
+        f'<div class="card__description">{escape(prop["description"])}</div>'
+        f'{"".join(extras)}'
+        f"</div></article></li>"
+    )
+
+def _chrome(rnd: random.Random) -> Dict[str, str]:
+    nav = "".join(
+        f'<li class="nav__item"><a class="nav__link" href="/en/search/{t.lower()}/{tr}?countries=BE">'
+        f"{t} {tr.replace('-', ' ')}</a></li>"
+        for t in PROPERTY_TYPES
+        for tr in ("for-sale", "for-rent")
+    )
+    filters = "".join(
+        f'<label class="filter__option"><input type="checkbox" name="postalCodes" value="{code}">'
+        f"{code} {escape(city)} <span class=\"filter__count\">({rnd.randint(10, 2000)})</span></label>"
+        for code, city in LOCALITIES * 8
+    )
+    footer = "".join(
+        f'<li><a href="/en/real-estate/{escape(city.lower())}/{code}">Real estate {escape(city)}</a></li>'
+        for code, city in LOCALITIES * 12
+    )
+    # Real pages embed a large JSON state blob for the front-end app
+    state = json.dumps(
+        {
+            "tracking": {"page": "search", "ids": [rnd.randint(1, 10**8) for _ in range(400)]},
+            "i18n": {f"key.{n}": f"Translated label {n}" for n in range(600)},
+        }
+    )
+    return {
+        "head": (
+            "<head><meta charset=\"utf-8\"><title>Real estate for sale - Immoweb</title>"
+            '<meta name="viewport" content="width=device-width, initial-scale=1">'
+            '<link rel="stylesheet" href="https://assets.immoweb.be/css/app.css">'
+            "<style>" + ".c{color:#333}" * 300 + "</style></head>"
+        ),
+        "header": f'<header class="header"><nav class="nav"><ul class="nav__list">{nav}</ul></nav></header>',
+        "filters": f'<aside class="search-filters"><form>{filters}</form></aside>',
+        "footer": f'<footer class="footer"><ul class="footer__links">{footer}</ul></footer>',
+        "script": f'<script id="app-state" type="application/json">{escape(state, quote=False)}</script>',
+    }
+
+def make_search_page(
+    search_id: int,
+    page: int,
+    *,
+    cards: int = 30,
+    transaction: str = "for-sale",
+    embedded: bool = False,
+    seed: int = 7,
+) -> str:
+    """
+    One page of search results. Listing ids are unique per (search, page,
+    card), so pages of different searches never share a listing. With
+    `embedded`, the page also carries its results as JSON in the search
+    component's `:results` attribute, as live pages do.
+    """
+    rnd = random.Random(f"{seed}:{search_id}:{page}")
+    chrome = _chrome(random.Random(seed))
+    results = [
+        make_result(rnd, 10_000_000 + search_id * 100_000 + page * 100 + n, transaction)
+        for n in range(cards)
+    ]
+    cards_html = "".join(render_card(rnd, result) for result in results)
+    component = (
+        f'<iw-search :results="{escape(json.dumps(results))}" :page="{page}"></iw-search>'
+        if embedded
+        else ""
+    )
+    pagination = "".join(
+        f'<a class="pagination__link" href="?page={n}">{n}</a>' for n in range(1, 11)
+    )
+    return (
+        f'<!DOCTYPE html><html lang="en">{chrome["head"]}<body>{chrome["header"]}'
+        f'<main class="search-results">{chrome["filters"]}{component}'
+        f'<ul class="search-results__list">{cards_html}</ul>'
+        f'<nav class="pagination">{pagination}</nav></main>'
+        f'{chrome["footer"]}{chrome["script"]}</body></html>'
+    )
+
+def make_empty_page(seed: int = 7) -> str:
+    """The page Immoweb serves past the last page of results."""
+    chrome = _chrome(random.Random(seed))
+    return (
+        f'<!DOCTYPE html><html lang="en">{chrome["head"]}<body>{chrome["header"]}'
+        f'<main class="search-results">{chrome["filters"]}'
+        f'<p class="search-results__empty">No results match your search.</p></main>'
+        f'{chrome["footer"]}{chrome["script"]}</body></html>'
+    )
+
+def corpus(pages: int, *, cards: int = 30, embedded: bool = False, seed: int = 7) -> List[str]:
+    """`pages` search pages, alternating sale and rent searches."""
+    return [
+        make_search_page(
+            n // 5,
+            n % 5 + 1,
+            cards=cards,
+            transaction="for-rent" if (n // 5) % 2 else "for-sale",
+            embedded=embedded,
+            seed=seed,
+        )
+        for n in range(pages)
+    ]
+
+def make_listings(count: int, seed: int = 7) -> List[Dict[str, Any]]:
+    """Listing dicts with the field cardinalities of a real crawl."""
+    rnd = random.Random(seed)
+    search_urls = [
+        f"https://www.immoweb.be/en/search/apartment/for-rent?page=1&orderBy=newest&q={i}"
+        for i in range(30)
+    ]
+    locations = [f"Commune {i} {1000 + i * 10}" for i in range(200)]
+    publishers = [f"Agency {i}" for i in range(50)]
+    listings: List[Dict[str, Any]] = []
+    for i in range(count):
+        ident = str(10_000_000 + i)
+        item = {
+            "id": ident,
+            "url": f"https://www.immoweb.be/en/classified/apartment/for-rent/city/1000/{ident}",
+            "title": f"{rnd.randint(1, 5)}-bedroom apartment for rent",
+            "description": "Bright apartment close to shops and public transport. " * 2,
+            "price": f"€{rnd.randint(600, 3000):,}/month",
+            "photos": [f"https://static.immoweb.be/photos/{ident}/{n}.jpg" for n in range(3)],
+            "location": rnd.choice(locations),
+            "propertyType": rnd.choice(["Apartment", "House", "Studio", "Villa", "Loft"]),
+            "bedrooms": rnd.randint(0, 5),
+            "bathrooms": rnd.randint(1, 3),
+            "area": rnd.randint(30, 250),
+            "energyClass": rnd.choice(["EPC A", "EPC B", "EPC C", "EPC D", "PEB E", None]),
+            "publisher": rnd.choice(publishers),
+            "contact": None,
+            "views": None,
+            "datePosted": None,
+            "apify_monitoring_status": rnd.choice(["new", "active", "active", "active"]),
+            "searchUrl": rnd.choice(search_urls),
+            "contentHash": None,
+            "changedFields": None,
+        }
+        item["contentHash"] = listing_digest(item)
+        listings.append(item)
+    return listings
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write the search-page corpus to disk")
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--cards", type=int, default=30)
+    parser.add_argument("--embedded", action="store_true", help="Embed results as JSON")
+    args = parser.parse_args()
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for n, html in enumerate(corpus(args.pages, cards=args.cards, embedded=args.embedded), start=1):
+        (args.out / f"search-{n:03d}.html").write_text(html, encoding="utf-8")
+    (args.out / "search-empty.html").write_text(make_empty_page(), encoding="utf-8")
+    print(f"Wrote {args.pages + 1} page(s) to {args.out}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
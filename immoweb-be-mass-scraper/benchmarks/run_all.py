@@ -0,0 +1,56 @@
+"""
+Run the whole offline benchmark suite and write one results file.
+
+    python benchmarks/run_all.py --output results.json
+    python benchmarks/run_all.py --quick
+
+`--quick` shrinks every benchmark for a smoke run. Compare two results
+files with `compare.py`.
+"""
+import argparse
+import sys
+from typing import Any, Callable, Dict, List
+
+import common
+import bench_crawl
+import bench_delta
+import bench_export
+import bench_listing_memory
+import bench_normalize
+import bench_parse
+import bench_startup
+
+# name -> runner, called with the --quick flag
+SUITE: Dict[str, Callable[[bool], List[Dict[str, Any]]]] = {
+    "parse": lambda quick: bench_parse.run(pages=10 if quick else 40, repeat=1 if quick else 3),
+    "crawl": lambda quick: bench_crawl.run(searches=4 if quick else 8, pages=3 if quick else 5),
+    "delta": lambda quick: bench_delta.run(
+        sizes=[1_000, 5_000] if quick else [1_000, 10_000, 50_000], repeat=1 if quick else 3
+    ),
+    "export": lambda quick: bench_export.run(
+        listings=2_000 if quick else 20_000, repeat=1 if quick else 3
+    ),
+    "listing_memory": lambda quick: bench_listing_memory.run(
+        listings=5_000 if quick else 50_000
+    ),
+    "normalize": lambda quick: bench_normalize.run(
+        sizes=[10_000] if quick else [10_000, 100_000], repeat=1 if quick else 3
+    ),
+    "startup": lambda quick: bench_startup.run(repeat=1 if quick else 5),
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="Small sizes, one repetition")
+    parser.add_argument("--only", action="append", choices=list(SUITE), help="Run only these benchmarks")
+    parser.add_argument("--output", help="Write results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results: List[Dict[str, Any]] = []
+    for name in args.only or SUITE:
+        print(f"Running {name} benchmark...", flush=True, file=sys.stderr)
+        results.extend(SUITE[name](args.quick))
+    common.write_results(results, args.output)
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,160 @@
+"""
+Local stand-in for Immoweb's search pages, serving the fixture corpus.
+
+Search URLs look like the real ones with the search number in `q`:
+
+    {base_url}/en/search/apartment/for-sale?countries=BE&q=3&page=2
+
+Every search has `pages_per_search` pages of results followed by empty
+pages. Each response is delayed by `latency` plus up to `jitter` seconds,
+and a seeded share of requests fails with 500 (`error_rate`) or is
+throttled with 429 and a Retry-After header (`throttle_rate`).
+
+Used in-process by the crawl benchmark, or standalone for manual runs:
+
+    python benchmarks/server.py --port 8765 --latency 0.05 --throttle-rate 0.02
+"""
+import argparse
+import asyncio
+import random
+from typing import Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+import fixtures
+
+class StandInServer:
+    def __init__(
+        self,
+        *,
+        pages_per_search: int = 5,
+        cards_per_page: int = 30,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 7,
+    ) -> None:
+        self.pages_per_search = pages_per_search
+        self.cards_per_page = cards_per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.seed = seed
+        self.stats: Dict[str, int] = {"requests": 0, "pages": 0, "empty": 0, "errors": 0, "throttled": 0}
+        self._rnd = random.Random(seed)
+        # Rendered once per (search, page) so that serving stays cheap next
+        # to the crawler sharing this process
+        self._pages: Dict[Tuple[int, int], str] = {}
+        self._empty = fixtures.make_empty_page(seed)
+        self._runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    def search_urls(self, count: int) -> List[str]:
+        return [
+            f"{self.base_url}/en/search/apartment/"
+            f"{'for-rent' if n % 2 else 'for-sale'}?countries=BE&q={n}"
+            for n in range(count)
+        ]
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        app = web.Application()
+        app.router.add_get("/en/search/{kind}/{transaction}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{bound_port}"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "StandInServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    def _page(self, search_id: int, page: int, transaction: str) -> str:
+        key = (search_id, page)
+        html = self._pages.get(key)
+        if html is None:
+            html = fixtures.make_search_page(
+                search_id,
+                page,
+                cards=self.cards_per_page,
+                transaction=transaction,
+                seed=self.seed,
+            )
+            self._pages[key] = html
+        return html
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        self.stats["requests"] += 1
+        delay = self.latency + (self._rnd.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        roll = self._rnd.random()
+        if roll < self.throttle_rate:
+            self.stats["throttled"] += 1
+            return web.Response(status=429, headers={"Retry-After": str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            self.stats["errors"] += 1
+            return web.Response(status=500, text="Internal Server Error")
+
+        try:
+            search_id = int(request.query.get("q", 0))
+            page = int(request.query.get("page", 1))
+        except ValueError:
+            return web.Response(status=400, text="Bad Request")
+        if page > self.pages_per_search:
+            self.stats["empty"] += 1
+            return web.Response(text=self._empty, content_type="text/html")
+        self.stats["pages"] += 1
+        html = self._page(search_id, page, request.match_info["transaction"])
+        return web.Response(text=html, content_type="text/html")
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = StandInServer(
+        pages_per_search=args.pages,
+        cards_per_page=args.cards,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+    )
+    await server.start(args.host, args.port)
+    print(f"Serving on {server.base_url}, e.g. {server.search_urls(1)[0]}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local stand-in for Immoweb search pages")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=5, help="Result pages per search")
+    parser.add_argument("--cards", type=int, default=30, help="Cards per result page")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random delay, seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of 500 responses")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of 429 responses")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After on 429s, seconds")
+    args = parser.parse_args()
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,31 @@
+import json
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, Set
+
+from scraper.crawler import ListingDeduplicator
+from scraper.listing import Listing
+
+from .worker import read_truncated_searches
+
+async def iter_merged_listings(result_paths: Iterable[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream the listings of completed work units in unit order, applying the
+    crawler's id/url deduplication across all of them, so the merged output
+    holds each listing once no matter how many shards it appeared in.
+    """
+    dedup = ListingDeduplicator()
+    for path in result_paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                item = Listing.from_dict(json.loads(line))
+                if dedup.add(item):
+                    yield item
+
+def merged_truncated_searches(result_paths: Iterable[str]) -> Set[str]:
+    """Searches that some completed work unit did not crawl to their end."""
+    truncated: Set[str] = set()
+    for path in result_paths:
+        truncated |= read_truncated_searches(Path(path))
+    return truncated
\ No newline at end of file
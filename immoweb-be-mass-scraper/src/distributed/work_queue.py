@@ -0,0 +1,265 @@
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+
+UNIT_STATUSES = ("pending", "leased", "done", "failed")
+
+class WorkUnit(NamedTuple):
+    unit_id: int
+    urls: List[str]
+    attempt: int
+
+def shard_urls(urls: List[str], shard_size: int) -> List[List[str]]:
+    """
+    Split search URLs into work units of at most `shard_size` URLs, keeping
+    their order. A search URL is never split: its pages are crawled in order
+    by one worker, exactly as in a single-process run.
+    """
+    size = max(1, shard_size)
+    return [urls[start : start + size] for start in range(0, len(urls), size)]
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class WorkQueue:
+    """
+    Queue of crawl work units shared by a coordinator and its workers.
+
+    The coordinator `submit`s the shards of a URL file as one job. Workers
+    `lease` a unit, keep the lease alive with `heartbeat` while crawling it
+    and report back with `complete` (with the path of the unit's results) or
+    `fail`. A lease that is not renewed within the lease timeout expires, and
+    the unit goes to the next worker that asks, so a dead worker only delays
+    its unit. A worker whose lease was taken over can no longer complete it.
+    """
+
+    lease_timeout: float = 300
+
+    def job_id(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def submit(self, shards: List[List[str]]) -> bool:
+        raise NotImplementedError
+
+    def lease(self, worker_id: str) -> Optional[WorkUnit]:
+        raise NotImplementedError
+
+    def heartbeat(self, unit: WorkUnit, worker_id: str) -> bool:
+        raise NotImplementedError
+
+    def complete(self, unit: WorkUnit, worker_id: str, result_path: str) -> bool:
+        raise NotImplementedError
+
+    def fail(self, unit: WorkUnit, worker_id: str, error: str) -> None:
+        raise NotImplementedError
+
+    def progress(self) -> Dict[str, int]:
+        raise NotImplementedError
+
+    def results(self) -> List[str]:
+        raise NotImplementedError
+
+    def failed_urls(self) -> List[str]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+    def finished(self) -> bool:
+        """True once a job exists and none of its units is pending or leased."""
+        counts = self.progress()
+        return (
+            self.job_id() is not None
+            and counts["pending"] == 0
+            and counts["leased"] == 0
+        )
+
+class SqliteWorkQueue(WorkQueue):
+    """
+    `WorkQueue` stored in a single SQLite file, for workers on one host or on
+    hosts sharing a filesystem with working locks. Leasing runs in an
+    IMMEDIATE transaction, so two workers never get the same unit.
+
+    Resubmitting the shards of a job still in progress keeps its progress,
+    so a restarted coordinator does not redo finished units. Once every
+    unit is done or failed the job is over: submitting the same shards
+    again starts a fresh job, so a scheduled run never reuses the results
+    of the previous one.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        lease_timeout: float = 300,
+        max_attempts: int = 3,
+    ) -> None:
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max(1, max_attempts)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode; transactions are opened explicitly where needed
+        self._conn = sqlite3.connect(str(path), timeout=60, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                submitted_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS units (
+                unit_id INTEGER PRIMARY KEY,
+                urls TEXT NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result_path TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS units_status ON units (status, lease_expires);
+            """
+        )
+
+    def job_id(self) -> Optional[str]:
+        row = self._conn.execute("SELECT job_id FROM jobs").fetchone()
+        return row[0] if row else None
+
+    def submit(self, shards: List[List[str]]) -> bool:
+        """
+        Replace the queue's job with `shards`. Returns False (and changes
+        nothing) when the queue already holds exactly these shards and some
+        of its units are still pending or leased.
+        """
+        job_id = hashlib.sha1(json.dumps(shards).encode("utf-8")).hexdigest()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            in_progress = self._conn.execute(
+                "SELECT 1 FROM units WHERE status IN ('pending', 'leased') LIMIT 1"
+            ).fetchone()
+            if self.job_id() == job_id and in_progress:
+                self._conn.execute("COMMIT")
+                return False
+            self._conn.execute("DELETE FROM jobs")
+            self._conn.execute("DELETE FROM units")
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, submitted_at) VALUES (?, ?)",
+                (job_id, time.time()),
+            )
+            self._conn.executemany(
+                "INSERT INTO units (unit_id, urls, status) VALUES (?, ?, 'pending')",
+                [(i, json.dumps(urls)) for i, urls in enumerate(shards, start=1)],
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return True
+
+    def lease(self, worker_id: str) -> Optional[WorkUnit]:
+        now = time.time()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Units whose last allowed attempt died with its worker
+            self._conn.execute(
+                """
+                UPDATE units SET status = 'failed', error = 'lease expired'
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+                """,
+                (now, self.max_attempts),
+            )
+            row = self._conn.execute(
+                """
+                SELECT unit_id, urls, attempts FROM units
+                WHERE status = 'pending'
+                   OR (status = 'leased' AND lease_expires < ?)
+                ORDER BY unit_id
+                LIMIT 1
+                """,
+                (now,),
+            ).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+            unit_id, urls, attempts = row
+            self._conn.execute(
+                """
+                UPDATE units
+                SET status = 'leased', worker = ?, lease_expires = ?, attempts = ?
+                WHERE unit_id = ?
+                """,
+                (worker_id, now + self.lease_timeout, attempts + 1, unit_id),
+            )
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        return WorkUnit(unit_id=unit_id, urls=json.loads(urls), attempt=attempts + 1)
+
+    def heartbeat(self, unit: WorkUnit, worker_id: str) -> bool:
+        """Extend the lease on `unit`; False if it is no longer ours."""
+        cur = self._conn.execute(
+            """
+            UPDATE units SET lease_expires = ?
+            WHERE unit_id = ? AND status = 'leased' AND worker = ? AND attempts = ?
+            """,
+            (time.time() + self.lease_timeout, unit.unit_id, worker_id, unit.attempt),
+        )
+        return cur.rowcount == 1
+
+    def complete(self, unit: WorkUnit, worker_id: str, result_path: str) -> bool:
+        cur = self._conn.execute(
+            """
+            UPDATE units SET status = 'done', result_path = ?, lease_expires = NULL
+            WHERE unit_id = ? AND status = 'leased' AND worker = ? AND attempts = ?
+            """,
+            (result_path, unit.unit_id, worker_id, unit.attempt),
+        )
+        return cur.rowcount == 1
+
+    def fail(self, unit: WorkUnit, worker_id: str, error: str) -> None:
+        """
+        Give `unit` back after an error. It is retried until it has been
+        attempted `max_attempts` times, then marked failed.
+        """
+        status = "failed" if unit.attempt >= self.max_attempts else "pending"
+        self._conn.execute(
+            """
+            UPDATE units SET status = ?, error = ?, lease_expires = NULL
+            WHERE unit_id = ? AND status = 'leased' AND worker = ? AND attempts = ?
+            """,
+            (status, error, unit.unit_id, worker_id, unit.attempt),
+        )
+
+    def progress(self) -> Dict[str, int]:
+        counts = {status: 0 for status in UNIT_STATUSES}
+        for status, count in self._conn.execute(
+            "SELECT status, COUNT(*) FROM units GROUP BY status"
+        ):
+            counts[status] = count
+        return counts
+
+    def results(self) -> List[str]:
+        """Result paths of the completed units, in unit (URL file) order."""
+        return [
+            row[0]
+            for row in self._conn.execute(
+                "SELECT result_path FROM units WHERE status = 'done' ORDER BY unit_id"
+            )
+        ]
+
+    def failed_urls(self) -> List[str]:
+        urls: List[str] = []
+        for (unit_urls,) in self._conn.execute(
+            "SELECT urls FROM units WHERE status = 'failed' ORDER BY unit_id"
+        ):
+            urls.extend(json.loads(unit_urls))
+        return urls
+
+    def close(self) -> None:
+        self._conn.close()
\ No newline at end of file
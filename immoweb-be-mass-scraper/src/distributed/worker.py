@@ -0,0 +1,134 @@
+import asyncio
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Callable, Optional, Set
+
+from outputs.exporter_jsonl import JsonLinesSink
+from scraper.crawler import ImmowebCrawler
+from scraper.utils import get_logger
+
+from .work_queue import WorkQueue, WorkUnit, default_worker_id
+
+def truncated_searches_path(result_path: Path) -> Path:
+    """Sidecar of a unit's result file listing the searches it did not crawl to their end."""
+    return result_path.with_suffix(".truncated.json")
+
+def read_truncated_searches(result_path: Path) -> Set[str]:
+    path = truncated_searches_path(result_path)
+    if not path.exists():
+        return set()
+    with path.open("r", encoding="utf-8") as f:
+        return set(json.load(f))
+
+async def run_worker(
+    queue: WorkQueue,
+    crawler_factory: Callable[[], ImmowebCrawler],
+    results_dir: Path,
+    *,
+    worker_id: Optional[str] = None,
+    poll_interval: float = 5.0,
+    logger: Optional[logging.Logger] = None,
+) -> int:
+    """
+    Lease work units from `queue` and crawl them until the queue's job is
+    finished. Returns the number of units this worker completed.
+
+    Each unit is crawled with a fresh crawler from `crawler_factory` and its
+    deduplicated listings are written to a JSON Lines file under
+    `results_dir`, named after the unit and attempt so that a worker that
+    lost its lease never overwrites the results of the one that took over.
+    Searches cut short by a failed page are listed next to it (see
+    `truncated_searches_path`), so the coordinator does not delist the
+    listings on their uncrawled pages. Deduplication across units, delta
+    annotation and export are left to the coordinator's merge step.
+    """
+    logger = logger or get_logger("immoweb_worker")
+    worker_id = worker_id or default_worker_id()
+    completed = 0
+    while True:
+        unit = queue.lease(worker_id)
+        if unit is None:
+            if queue.finished():
+                break
+            # No job submitted yet, or every remaining unit is leased
+            await asyncio.sleep(poll_interval)
+            continue
+
+        logger.info(
+            "Worker %s leased unit %d (%d search URL(s), attempt %d)",
+            worker_id,
+            unit.unit_id,
+            len(unit.urls),
+            unit.attempt,
+        )
+        job_dir = results_dir / (queue.job_id() or "job")[:16]
+        result_path = job_dir / f"unit-{unit.unit_id:05d}.{unit.attempt}.jsonl"
+        try:
+            kept = await _crawl_unit(
+                queue, unit, worker_id, crawler_factory(), result_path
+            )
+        except Exception as exc:
+            logger.exception("Unit %d failed: %s", unit.unit_id, exc)
+            queue.fail(unit, worker_id, repr(exc))
+            continue
+
+        if kept and queue.complete(unit, worker_id, str(result_path)):
+            completed += 1
+            logger.info("Completed unit %d", unit.unit_id)
+        else:
+            logger.warning(
+                "Lease on unit %d was lost; discarding its results", unit.unit_id
+            )
+            result_path.unlink(missing_ok=True)
+            truncated_searches_path(result_path).unlink(missing_ok=True)
+    logger.info("Worker %s done after %d unit(s)", worker_id, completed)
+    return completed
+
+async def _crawl_unit(
+    queue: WorkQueue,
+    unit: WorkUnit,
+    worker_id: str,
+    crawler: ImmowebCrawler,
+    result_path: Path,
+) -> bool:
+    """
+    Crawl `unit` into `result_path` while renewing its lease. Returns False,
+    without results, if the lease was lost along the way.
+    """
+    tmp_path = result_path.with_name(result_path.name + ".tmp")
+
+    async def crawl() -> None:
+        with JsonLinesSink(tmp_path) as sink:
+            async for item in crawler.iter_listings(unit.urls):
+                sink.write(item)
+        # Written before the results appear, so a result file always has it
+        with truncated_searches_path(result_path).open("w", encoding="utf-8") as f:
+            json.dump(sorted(crawler.truncated_searches), f)
+        os.replace(tmp_path, result_path)
+
+    async def keep_lease() -> None:
+        while True:
+            await asyncio.sleep(queue.lease_timeout / 3)
+            if not queue.heartbeat(unit, worker_id):
+                return
+
+    crawl_task = asyncio.create_task(crawl())
+    lease_task = asyncio.create_task(keep_lease())
+    try:
+        await asyncio.wait({crawl_task, lease_task}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        lease_task.cancel()
+        if not crawl_task.done():
+            crawl_task.cancel()
+        await asyncio.gather(crawl_task, lease_task, return_exceptions=True)
+
+    if crawl_task.cancelled():
+        tmp_path.unlink(missing_ok=True)
+        return False
+    exc = crawl_task.exception()
+    if exc is not None:
+        tmp_path.unlink(missing_ok=True)
+        raise exc
+    return True
\ No newline at end of file
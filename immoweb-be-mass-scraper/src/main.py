@@ -2,21 +2,52 @@ import argparse
 import asyncio
 import json
 import logging
+import signal
 import sys
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import (
+    AsyncIterator,
+    Collection,
+    Container,
+    Iterator,
+    List,
+    Dict,
+    Any,
+    Optional,
+    Tuple,
+    Union,
+)
 
 # Ensure local packages are importable when running as a script
 CURRENT_DIR = Path(__file__).resolve().parent
 if str(CURRENT_DIR) not in sys.path:
     sys.path.insert(0, str(CURRENT_DIR))
 
+from scraper.cache import DetailCache, PhotoIndex, ResponseCache
+from scraper.checkpoint import CrawlCheckpoint
 from scraper.crawler import ImmowebCrawler
-from monitoring.delta_mode import annotate_with_delta, summarize_delta
-from outputs.exporter_json import export_json
-from outputs.exporter_csv import export_csv
-from outputs.exporter_excel import export_excel
+from scraper.enrich import DetailEnricher
+from scraper.listing import Listing, as_dict
+from scraper.metrics import MetricsRegistry, start_metrics_server
+from scraper.normalize import normalize_batch
+from scraper.photos import PhotoDownloader
+from scraper.profiling import PROFILE_MODES, RunProfiler
+from scraper.transport import HttpTransport
+from monitoring.daemon import LiveDeltaIndex, run_monitor
+from monitoring.delta_mode import CHANGE_STATUSES, DeltaTracker
+from monitoring.query import ORDER_COLUMNS, ListingFilter, ListingIndex, import_snapshot
+from monitoring.scheduler import SearchSpec, parse_duration, parse_search_line
+from monitoring.state_store import ListingStateStore
+from outputs.sink import ListingSink
+from outputs.exporter_json import JsonArraySink
+from outputs.exporter_jsonl import JsonLinesSink
+from outputs.registry import EXPORTERS, open_sink
 from scraper.utils import get_logger
+from distributed.merge import iter_merged_listings, merged_truncated_searches
+from distributed.work_queue import SqliteWorkQueue, shard_urls
+from distributed.worker import run_worker
 
 ROOT_DIR = CURRENT_DIR.parent
 DATA_DIR = ROOT_DIR / "data"
@@ -36,22 +67,100 @@ def apply_defaults(config: Dict[str, Any]) -> Dict[str, Any]:
     cfg.setdefault("request_delay", 0.5)
     cfg.setdefault("user_agent", "ImmowebMassScraper/1.0 (+https://bitbash.dev)")
     cfg.setdefault("output_formats", ["json", "csv", "excel"])
+    cfg.setdefault("parquet_row_group_size", 50000)
     cfg.setdefault("delta_mode_enabled", True)
+    cfg.setdefault("delta_backend", "json")
+    cfg.setdefault("delta_state_path", None)
+    cfg.setdefault("delta_batch_size", 500)
+    cfg.setdefault("changed_only_output", False)
+    cfg.setdefault("parser_backend", "html.parser")
+    cfg.setdefault("parse_executor", "inline")
+    cfg.setdefault("parse_workers", None)
+    cfg.setdefault("target_rps", None)
+    cfg.setdefault("max_concurrency", None)
+    cfg.setdefault("max_pending_parses", None)
+    cfg.setdefault("adaptive_throttle", True)
+    cfg.setdefault("prefetch_pages", 2)
+    cfg.setdefault("incremental_crawl", False)
+    cfg.setdefault("incremental_stop_after_pages", 1)
+    cfg.setdefault("http_pool_size", 100)
+    cfg.setdefault("http_pool_per_host", 32)
+    cfg.setdefault("http_dns_cache_ttl", 300)
+    cfg.setdefault("http_keepalive_timeout", 30)
+    cfg.setdefault("http_compression", True)
+    cfg.setdefault("http_cache_enabled", False)
+    cfg.setdefault("http_cache_path", str(DATA_DIR / "http_cache.sqlite"))
+    cfg.setdefault("http_cache_ttl", 3600)
+    cfg.setdefault("http_cache_max_mb", 256)
+    cfg.setdefault("detail_enrichment_enabled", False)
+    cfg.setdefault("detail_concurrency", 4)
+    cfg.setdefault("detail_target_rps", None)
+    cfg.setdefault("detail_cache_path", str(DATA_DIR / "detail_cache.sqlite"))
+    cfg.setdefault("detail_cache_ttl", 7 * 24 * 3600)
+    cfg.setdefault("photo_download_enabled", False)
+    cfg.setdefault("photo_dir", str(DATA_DIR / "photos"))
+    cfg.setdefault("photo_index_path", None)
+    cfg.setdefault("photo_concurrency", 8)
+    cfg.setdefault("photo_target_rps", None)
+    cfg.setdefault("photo_max_mb", 20)
+    cfg.setdefault("checkpoint_enabled", True)
+    cfg.setdefault("checkpoint_path", None)
+    cfg.setdefault("distributed_queue_path", str(DATA_DIR / "work_queue.sqlite"))
+    cfg.setdefault("distributed_results_dir", str(DATA_DIR / "work_results"))
+    cfg.setdefault("distributed_shard_size", 25)
+    cfg.setdefault("distributed_lease_timeout", 300)
+    cfg.setdefault("distributed_max_attempts", 3)
+    cfg.setdefault("distributed_poll_interval", 5.0)
+    cfg.setdefault("monitor_interval", 900)
+    cfg.setdefault("monitor_priority", 0)
+    cfg.setdefault("monitor_full_crawl_every", 12)
+    cfg.setdefault("monitor_events_path", None)
+    cfg.setdefault("monitor_snapshot_interval", 600)
+    cfg.setdefault("metrics_file", None)
+    cfg.setdefault("metrics_host", "127.0.0.1")
+    cfg.setdefault("metrics_port", None)
+    cfg.setdefault("profile_modes", [])
+    cfg.setdefault("profile_dir", str(DATA_DIR / "profiles"))
+    cfg.setdefault("profile_sample_interval", 0.01)
+    cfg.setdefault("profile_loop_lag_interval", 0.1)
+    cfg.setdefault("profile_slow_callback", 0.1)
     return cfg
 
-def load_urls(urls_file: Path) -> List[str]:
+def _url_file_lines(urls_file: Path) -> List[str]:
     if not urls_file.exists():
         raise FileNotFoundError(f"URLs file not found: {urls_file}")
-    urls: List[str] = []
+    lines: List[str] = []
     with urls_file.open("r", encoding="utf-8") as f:
         for line in f:
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
-            urls.append(line)
-    if not urls:
+            lines.append(line)
+    if not lines:
         raise ValueError(f"No URLs found in {urls_file}")
-    return urls
+    return lines
+
+def load_searches(
+    urls_file: Path, default_interval: float = 900, default_priority: int = 0
+) -> List[SearchSpec]:
+    """
+    Search URLs from `urls_file`, one per line, each optionally followed by
+    its monitor interval and priority (see `parse_search_line`). Unknown
+    options are an error: the daemon would otherwise silently run a search
+    on the wrong schedule.
+    """
+    return [
+        parse_search_line(line, default_interval, default_priority)
+        for line in _url_file_lines(urls_file)
+    ]
+
+def load_urls(urls_file: Path) -> List[str]:
+    """
+    Search URLs from `urls_file` for a one-shot or distributed run: the
+    first word of each line. Anything after it (monitor options, notes) is
+    ignored.
+    """
+    return [line.split()[0] for line in _url_file_lines(urls_file)]
 
 def load_previous_snapshot(path: Path) -> List[Dict[str, Any]]:
     if not path.exists():
@@ -60,66 +169,612 @@ def load_previous_snapshot(path: Path) -> List[Dict[str, Any]]:
         with path.open("r", encoding="utf-8") as f:
             data = json.load(f)
         if isinstance(data, list):
+            # Swap each dict for a compact Listing in place, so the dicts can
+            # be freed one by one instead of both copies peaking together
+            for i, item in enumerate(data):
+                if isinstance(item, dict):
+                    data[i] = Listing.from_dict(item)
             return data
         return []
     except json.JSONDecodeError:
         return []
 
-async def run_scraper(
+def iter_snapshot(path: Path) -> Iterator[Dict[str, Any]]:
+    """Listings of an exported JSON (array) or JSON Lines snapshot."""
+    if not path.exists():
+        raise FileNotFoundError(f"Snapshot not found: {path}")
+    if path.suffix == ".jsonl":
+        with path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        yield from load_previous_snapshot(path)
+
+def state_store_path(config: Dict[str, Any], output_prefix: Path) -> Path:
+    return Path(config["delta_state_path"] or output_prefix.with_suffix(".state.sqlite"))
+
+def open_delta_tracker(
     config: Dict[str, Any],
-    urls_file: Path,
     output_prefix: Path,
-    delta_mode_enabled: bool,
     logger: logging.Logger,
+    resume: bool = False,
+) -> Union[DeltaTracker, ListingStateStore]:
+    backend = config["delta_backend"]
+    if backend == "json":
+        return DeltaTracker(load_previous_snapshot(output_prefix.with_suffix(".json")))
+    if backend == "sqlite":
+        state_path = state_store_path(config, output_prefix)
+        logger.info("Using delta state store at %s", state_path)
+        return ListingStateStore(state_path, resume=resume)
+    raise ValueError(f"Unknown delta backend: {backend!r}")
+
+def open_sinks(config: Dict[str, Any], output_prefix: Path) -> Dict[str, ListingSink]:
+    sinks: Dict[str, ListingSink] = {}
+    try:
+        for fmt in config["output_formats"]:
+            sinks[fmt] = open_sink(fmt, output_prefix, config)
+    except BaseException:
+        for sink in sinks.values():
+            sink.abort()
+        raise
+    return sinks
+
+def open_transport(
+    config: Dict[str, Any], metrics: Optional[MetricsRegistry] = None
+) -> HttpTransport:
+    return HttpTransport(
+        user_agent=config["user_agent"],
+        pool_size=config["http_pool_size"],
+        pool_per_host=config["http_pool_per_host"],
+        dns_cache_ttl=config["http_dns_cache_ttl"],
+        keepalive_timeout=config["http_keepalive_timeout"],
+        compression=config["http_compression"],
+        metrics=metrics,
+    )
+
+def open_response_cache(config: Dict[str, Any]) -> Optional[ResponseCache]:
+    if not config["http_cache_enabled"]:
+        return None
+    return ResponseCache(
+        Path(config["http_cache_path"]),
+        ttl=config["http_cache_ttl"],
+        max_bytes=int(config["http_cache_max_mb"] * 1024 * 1024),
+    )
+
+def close_response_cache(cache: Optional[ResponseCache], logger: logging.Logger) -> None:
+    if cache is None:
+        return
+    logger.info(
+        "HTTP cache — hits: %(hits)d, revalidated: %(revalidations)d, "
+        "misses: %(misses)d, evicted: %(evictions)d",
+        cache.stats(),
+    )
+    cache.close()
+
+def open_detail_enricher(
+    config: Dict[str, Any],
+    logger: logging.Logger,
+    metrics: Optional[MetricsRegistry] = None,
+    transport: Optional[HttpTransport] = None,
+) -> Optional[DetailEnricher]:
+    if not config["detail_enrichment_enabled"]:
+        return None
+    logger.info(
+        "Enriching new and changed listings from their detail pages "
+        "(concurrency %d, cache at %s)",
+        config["detail_concurrency"],
+        config["detail_cache_path"],
+    )
+    return DetailEnricher(
+        DetailCache(Path(config["detail_cache_path"]), ttl=config["detail_cache_ttl"]),
+        concurrency=config["detail_concurrency"],
+        target_rps=config["detail_target_rps"],
+        adaptive_throttle=config["adaptive_throttle"],
+        request_timeout=config["request_timeout"],
+        user_agent=config["user_agent"],
+        metrics=metrics,
+        transport=transport,
+        logger=logger,
+    )
+
+async def close_detail_enricher(
+    enricher: Optional[DetailEnricher], logger: logging.Logger
+) -> None:
+    if enricher is None:
+        return
+    logger.info(
+        "Detail enrichment — fetched: %(fetched)d, from cache: %(cached)d, "
+        "failed: %(failed)d",
+        enricher.stats(),
+    )
+    await enricher.close()
+    enricher.cache.close()
+
+def open_photo_downloader(
+    config: Dict[str, Any],
+    logger: logging.Logger,
+    metrics: Optional[MetricsRegistry] = None,
+    transport: Optional[HttpTransport] = None,
+) -> Optional[PhotoDownloader]:
+    if not config["photo_download_enabled"]:
+        return None
+    directory = Path(config["photo_dir"])
+    index_path = Path(config["photo_index_path"] or directory / "index.sqlite")
+    logger.info(
+        "Downloading listing photos to %s (concurrency %d, index at %s)",
+        directory,
+        config["photo_concurrency"],
+        index_path,
+    )
+    return PhotoDownloader(
+        PhotoIndex(index_path),
+        directory,
+        concurrency=config["photo_concurrency"],
+        target_rps=config["photo_target_rps"],
+        adaptive_throttle=config["adaptive_throttle"],
+        request_timeout=config["request_timeout"],
+        max_bytes=int(config["photo_max_mb"] * 1024 * 1024),
+        user_agent=config["user_agent"],
+        metrics=metrics,
+        transport=transport,
+        logger=logger,
+    )
+
+async def close_photo_downloader(
+    photos: Optional[PhotoDownloader], logger: logging.Logger
 ) -> None:
-    urls = load_urls(urls_file)
-    logger.info("Loaded %d search URL(s) from %s", len(urls), urls_file)
+    if photos is None:
+        return
+    logger.info(
+        "Photos — downloaded: %(downloaded)d, duplicates: %(duplicates)d, "
+        "already known: %(known)d, failed: %(failed)d",
+        photos.stats(),
+    )
+    await photos.close()
+    photos.index.close()
 
-    crawler = ImmowebCrawler(
+def build_crawler(
+    config: Dict[str, Any],
+    logger: logging.Logger,
+    *,
+    cache: Optional[ResponseCache] = None,
+    known_ids: Optional[Container[str]] = None,
+    checkpoint: Optional[CrawlCheckpoint] = None,
+    metrics: Optional[MetricsRegistry] = None,
+    transport: Optional[HttpTransport] = None,
+) -> ImmowebCrawler:
+    return ImmowebCrawler(
         max_pages=config["max_pages_to_scrape"],
         concurrency=config["concurrency"],
         request_timeout=config["request_timeout"],
         request_delay=config["request_delay"],
         user_agent=config["user_agent"],
+        parser_backend=config["parser_backend"],
+        parse_executor=config["parse_executor"],
+        parse_workers=config["parse_workers"],
+        target_rps=config["target_rps"],
+        max_concurrency=config["max_concurrency"],
+        max_pending_parses=config["max_pending_parses"],
+        adaptive_throttle=config["adaptive_throttle"],
+        prefetch_pages=config["prefetch_pages"],
+        known_ids=known_ids,
+        stop_after_known_pages=config["incremental_stop_after_pages"],
+        cache=cache,
+        checkpoint=checkpoint,
+        metrics=metrics,
+        transport=transport,
         logger=logger,
     )
 
-    listings = await crawler.crawl_search_urls(urls)
-    logger.info("Collected %d listing(s) before delta processing", len(listings))
+def log_stage_summary(metrics: MetricsRegistry, logger: logging.Logger, total: float) -> None:
+    stages = metrics.stage_summary()
+    if not stages or total <= 0:
+        return
+    logger.info(
+        "Stage timings — %s, total: %.2fs",
+        ", ".join(
+            f"{stage}: {seconds:.2f}s ({seconds / total:.0%})" for stage, seconds in stages
+        ),
+        total,
+    )
 
-    json_path = output_prefix.with_suffix(".json")
-    csv_path = output_prefix.with_suffix(".csv")
-    xlsx_path = output_prefix.with_suffix(".xlsx")
+async def write_listings(
+    config: Dict[str, Any],
+    listings: AsyncIterator[Dict[str, Any]],
+    output_prefix: Path,
+    tracker: Optional[Union[DeltaTracker, ListingStateStore]],
+    logger: logging.Logger,
+    changed_only: bool = False,
+    partial_searches: Collection[str] = (),
+    metrics: Optional[MetricsRegistry] = None,
+    enricher: Optional[DetailEnricher] = None,
+    photos: Optional[PhotoDownloader] = None,
+) -> None:
+    """
+    Annotate `listings` with their delta status as they arrive and stream
+    them, followed by the delisted ones, into every configured output format.
+    `partial_searches` is only read once `listings` is exhausted. With an
+    `enricher`, each batch gets its detail-page fields before annotation;
+    with `photos`, its photos are downloaded and listed in `photoFiles`.
+    Every batch is normalized (see `normalize_batch`) before annotation.
 
-    previous: List[Dict[str, Any]] = []
-    annotated: List[Dict[str, Any]] = listings
+    Time spent waiting for the crawl, in detail enrichment, photo downloads,
+    normalization, delta annotation and in each exporter is recorded as the
+    "crawl", "enrich", "photos", "normalize", "delta" and "export.<format>"
+    stages of `metrics`.
+    """
+    output_prefix.parent.mkdir(parents=True, exist_ok=True)
+    metrics = metrics or MetricsRegistry()
 
-    if delta_mode_enabled:
-        previous = load_previous_snapshot(json_path)
-        annotated = annotate_with_delta(previous, listings)
-        summary = summarize_delta(annotated)
+    sinks = open_sinks(config, output_prefix)
+    export_stages = {fmt: f"export.{fmt}" for fmt in sinks}
+    collected = 0
+    batch_size = config["delta_batch_size"]
+
+    # In changed-only mode most sinks only get new/changed/delisted rows. A
+    # JSON snapshot that is also the delta state must stay complete, though.
+    change_sinks: List[Tuple[str, ListingSink]] = []
+    full_sinks: List[Tuple[str, ListingSink]] = list(sinks.items())
+    if changed_only:
+        if tracker is None:
+            logger.warning("Changed-only output needs delta mode; writing all listings")
+        else:
+            keep_full = "json" if config["delta_backend"] == "json" else None
+            change_sinks = [(fmt, s) for fmt, s in sinks.items() if fmt != keep_full]
+            full_sinks = [(fmt, s) for fmt, s in sinks.items() if fmt == keep_full]
+            if keep_full in sinks:
+                logger.info(
+                    "Changed-only output: keeping %s complete as the delta snapshot",
+                    sinks[keep_full].path,
+                )
+
+    def write(item: Dict[str, Any]) -> None:
+        for fmt, sink in full_sinks:
+            with metrics.stage(export_stages[fmt]):
+                sink.write(item)
+        if change_sinks and item.get("apify_monitoring_status") in CHANGE_STATUSES:
+            for fmt, sink in change_sinks:
+                with metrics.stage(export_stages[fmt]):
+                    sink.write(item)
+
+    known_keys = tracker.known_keys() if tracker is not None else None
+
+    async def emit(batch: List[Dict[str, Any]]) -> None:
+        if enricher is not None:
+            with metrics.stage("enrich"):
+                await enricher.enrich_batch(batch, known_keys)
+        if photos is not None:
+            with metrics.stage("photos"):
+                await photos.download_batch(batch)
+        with metrics.stage("normalize"):
+            normalize_batch(batch, metrics)
+        if tracker is not None:
+            with metrics.stage("delta"):
+                tracker.annotate_batch(batch)
+        for item in batch:
+            write(item)
+
+    try:
+        batch: List[Dict[str, Any]] = []
+        async for item in metrics.timed_async(listings, "crawl"):
+            collected += 1
+            batch.append(item)
+            if len(batch) >= batch_size:
+                await emit(batch)
+                batch = []
+        await emit(batch)
+        logger.info("Collected %d listing(s) after deduplication", collected)
+
+        if tracker is not None:
+            for item in metrics.timed(tracker.unseen(partial_searches), "delta"):
+                if item.get("priceValue") is None:
+                    # Stored before price fields were derived
+                    with metrics.stage("normalize"):
+                        normalize_batch([item], metrics)
+                write(item)
+    except BaseException:
+        for sink in sinks.values():
+            sink.abort()
+        raise
+
+    if tracker is not None:
+        summary = tracker.summary()
         logger.info(
-            "Delta summary — total: %(total)d, new: %(new)d, delisted: %(delisted)d, active: %(active)d",
+            "Delta summary — total: %(total)d, new: %(new)d, changed: %(changed)d, "
+            "delisted: %(delisted)d, active: %(active)d",
             summary,
         )
+        listings_by_status = metrics.counter("listings_total", "Listings by delta status")
+        for status, count in summary.items():
+            if status != "total":
+                listings_by_status.inc(count, status=status)
+
+    written = metrics.counter("listings_written_total", "Listings written per output format")
+    for fmt, sink in sinks.items():
+        with metrics.stage(export_stages[fmt]):
+            sink.close()
+        written.inc(sink.count, format=fmt)
+        logger.info("Saved %s output to %s", EXPORTERS[fmt].label, sink.path)
+
+async def run_scraper(
+    config: Dict[str, Any],
+    urls_file: Path,
+    output_prefix: Path,
+    delta_mode_enabled: bool,
+    logger: logging.Logger,
+    incremental: bool = False,
+    changed_only: bool = False,
+    resume: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+    transport: Optional[HttpTransport] = None,
+) -> None:
+    urls = load_urls(urls_file)
+    logger.info("Loaded %d search URL(s) from %s", len(urls), urls_file)
+
+    cache = open_response_cache(config)
+    enricher = open_detail_enricher(config, logger, metrics, transport)
+    photos = open_photo_downloader(config, logger, metrics, transport)
+
+    tracker: Optional[Union[DeltaTracker, ListingStateStore]] = None
+    if delta_mode_enabled:
+        tracker = open_delta_tracker(config, output_prefix, logger, resume=resume)
     else:
         logger.info("Delta mode disabled; skipping delta annotation")
 
-    output_formats: List[str] = config["output_formats"]
+    known_ids = None
+    if incremental:
+        if tracker is None:
+            logger.warning("Incremental crawl needs delta mode; crawling all pages")
+        else:
+            known_ids = tracker.known_keys()
+            logger.info(
+                "Incremental crawl: stopping each search after %d page(s) of known listings",
+                config["incremental_stop_after_pages"],
+            )
 
-    output_prefix.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint: Optional[CrawlCheckpoint] = None
+    if config["checkpoint_enabled"]:
+        checkpoint = CrawlCheckpoint(
+            Path(
+                config["checkpoint_path"]
+                or output_prefix.with_suffix(".checkpoint.jsonl")
+            ),
+            resume=resume,
+            logger=logger,
+        )
+    elif resume:
+        logger.warning("Checkpointing is disabled; nothing to resume from")
 
-    if "json" in output_formats:
-        export_json(annotated, json_path)
-        logger.info("Saved JSON output to %s", json_path)
+    crawler = build_crawler(
+        config,
+        logger,
+        cache=cache,
+        known_ids=known_ids,
+        checkpoint=checkpoint,
+        metrics=metrics,
+        transport=transport,
+    )
 
-    if "csv" in output_formats:
-        export_csv(annotated, csv_path)
-        logger.info("Saved CSV output to %s", csv_path)
+    completed = False
+    try:
+        await write_listings(
+            config,
+            crawler.iter_listings(urls),
+            output_prefix,
+            tracker,
+            logger,
+            changed_only=changed_only,
+            partial_searches=crawler.truncated_searches,
+            metrics=metrics,
+            enricher=enricher,
+            photos=photos,
+        )
+        completed = True
+    finally:
+        logger.info(
+            "Throttle settled at concurrency %(concurrency)d, %(rate).2f req/s "
+            "(%(throttled)d throttled response(s))",
+            crawler.rate_limiter.stats(),
+        )
+        if checkpoint is not None:
+            checkpoint.close()
+            if not completed:
+                logger.warning(
+                    "Crawl interrupted; run again with --resume to continue from %s",
+                    checkpoint.path,
+                )
+        if tracker is not None:
+            tracker.close(completed=completed)
+        close_response_cache(cache, logger)
+        await close_detail_enricher(enricher, logger)
+        await close_photo_downloader(photos, logger)
 
-    if "excel" in output_formats:
-        export_excel(annotated, xlsx_path)
-        logger.info("Saved Excel output to %s", xlsx_path)
+    if checkpoint is not None:
+        checkpoint.discard()
+
+def open_work_queue(config: Dict[str, Any]) -> SqliteWorkQueue:
+    return SqliteWorkQueue(
+        Path(config["distributed_queue_path"]),
+        lease_timeout=config["distributed_lease_timeout"],
+        max_attempts=config["distributed_max_attempts"],
+    )
+
+async def run_coordinator(
+    config: Dict[str, Any],
+    urls_file: Path,
+    output_prefix: Path,
+    delta_mode_enabled: bool,
+    logger: logging.Logger,
+    changed_only: bool = False,
+    metrics: Optional[MetricsRegistry] = None,
+    transport: Optional[HttpTransport] = None,
+) -> None:
+    """
+    Shard the URL file into work units on the shared queue, wait for the
+    workers to finish them, then merge their results and run delta mode and
+    the exports exactly like a single-process run.
+    """
+    urls = load_urls(urls_file)
+    shards = shard_urls(urls, config["distributed_shard_size"])
+    queue = open_work_queue(config)
+    try:
+        if queue.submit(shards):
+            logger.info(
+                "Queued %d search URL(s) as %d work unit(s) in %s",
+                len(urls),
+                len(shards),
+                queue.path,
+            )
+        else:
+            logger.info("Resuming the job already queued in %s", queue.path)
+
+        poll_interval = config["distributed_poll_interval"]
+        while not queue.finished():
+            logger.info(
+                "Work units — pending: %(pending)d, leased: %(leased)d, "
+                "done: %(done)d, failed: %(failed)d",
+                queue.progress(),
+            )
+            await asyncio.sleep(poll_interval)
+
+        failed_urls = queue.failed_urls()
+        if failed_urls:
+            logger.warning(
+                "%d search URL(s) could not be crawled; their listings are not delisted",
+                len(failed_urls),
+            )
+        results = queue.results()
+        truncated = merged_truncated_searches(results)
+        if truncated:
+            logger.warning(
+                "%d search URL(s) were not crawled to their end; listings missing "
+                "from them are not delisted",
+                len(truncated),
+            )
+
+        tracker: Optional[Union[DeltaTracker, ListingStateStore]] = None
+        if delta_mode_enabled:
+            tracker = open_delta_tracker(config, output_prefix, logger)
+        enricher = open_detail_enricher(config, logger, metrics, transport)
+        photos = open_photo_downloader(config, logger, metrics, transport)
+        completed = False
+        try:
+            await write_listings(
+                config,
+                iter_merged_listings(results),
+                output_prefix,
+                tracker,
+                logger,
+                changed_only=changed_only,
+                partial_searches=set(failed_urls) | truncated,
+                metrics=metrics,
+                enricher=enricher,
+                photos=photos,
+            )
+            completed = True
+        finally:
+            if tracker is not None:
+                tracker.close(completed=completed)
+            await close_detail_enricher(enricher, logger)
+            await close_photo_downloader(photos, logger)
+    finally:
+        queue.close()
+
+async def run_crawl_worker(
+    config: Dict[str, Any],
+    logger: logging.Logger,
+    metrics: Optional[MetricsRegistry] = None,
+    transport: Optional[HttpTransport] = None,
+) -> None:
+    cache = open_response_cache(config)
+    queue = open_work_queue(config)
+    try:
+        await run_worker(
+            queue,
+            lambda: build_crawler(
+                config, logger, cache=cache, metrics=metrics, transport=transport
+            ),
+            Path(config["distributed_results_dir"]),
+            poll_interval=config["distributed_poll_interval"],
+            logger=logger,
+        )
+    finally:
+        queue.close()
+        close_response_cache(cache, logger)
+
+async def run_daemon(
+    config: Dict[str, Any],
+    urls_file: Path,
+    output_prefix: Path,
+    logger: logging.Logger,
+    metrics: Optional[MetricsRegistry] = None,
+    transport: Optional[HttpTransport] = None,
+) -> None:
+    """
+    Monitor the searches in the URL file until SIGINT/SIGTERM, re-crawling
+    each on its own interval with one crawler, connection pool and in-memory
+    delta index, and appending new, changed and delisted listings to the
+    events file as they are found. The previous JSON snapshot seeds the
+    index; the snapshot is rewritten periodically and on shutdown.
+    """
+    searches = load_searches(
+        urls_file, config["monitor_interval"], config["monitor_priority"]
+    )
+    unique: Dict[str, SearchSpec] = {}
+    for search in searches:
+        unique.setdefault(search.url, search)
+    searches = list(unique.values())
+    logger.info("Loaded %d search URL(s) from %s", len(searches), urls_file)
+
+    snapshot_path = output_prefix.with_suffix(".json")
+    index = LiveDeltaIndex(load_previous_snapshot(snapshot_path))
+    logger.info("Loaded %d live listing(s) from %s", len(index.listings), snapshot_path)
+
+    def write_snapshot() -> None:
+        with metrics.stage("export.json"):
+            with JsonArraySink(snapshot_path) as sink:
+                sink.write_many(index.listings.values())
+        logger.info("Saved snapshot of %d listing(s) to %s", sink.count, snapshot_path)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(signum, stop.set)
+        except (NotImplementedError, RuntimeError):  # e.g. on Windows
+            pass
+
+    cache = open_response_cache(config)
+    enricher = open_detail_enricher(config, logger, metrics, transport)
+    photos = open_photo_downloader(config, logger, metrics, transport)
+    crawler = build_crawler(config, logger, cache=cache, metrics=metrics, transport=transport)
+    events_path = Path(config["monitor_events_path"] or output_prefix.with_suffix(".events.jsonl"))
+    logger.info("Appending listing events to %s", events_path)
+    try:
+        with JsonLinesSink(events_path, append=True) as events:
+            await run_monitor(
+                crawler,
+                searches,
+                index,
+                events,
+                stop,
+                enricher=enricher,
+                photos=photos,
+                full_crawl_every=config["monitor_full_crawl_every"],
+                batch_size=config["delta_batch_size"],
+                snapshot=write_snapshot,
+                snapshot_interval=config["monitor_snapshot_interval"],
+                metrics=metrics,
+                logger=logger,
+            )
+    finally:
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.remove_signal_handler(signum)
+        close_response_cache(cache, logger)
+        await close_detail_enricher(enricher, logger)
+        await close_photo_downloader(photos, logger)
+    logger.info("Monitor stopped")
 
 def build_arg_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
@@ -152,14 +807,255 @@ def build_arg_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Disable delta mode (do not compute new/delisted listings)",
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Stop paginating a (newest-first) search once its pages only hold "
+            "listings from the previous snapshot (not with --role coordinator/worker)"
+        ),
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Only export new, changed and delisted listings (requires delta mode)",
+    )
+    parser.add_argument(
+        "--enrich-details",
+        action="store_true",
+        help=(
+            "Fetch the detail pages of new and changed listings for views, "
+            "contact details and publication date"
+        ),
+    )
+    parser.add_argument(
+        "--download-photos",
+        action="store_true",
+        help=(
+            "Download listing photos into a content-addressed directory, "
+            "skipping photos fetched in earlier runs"
+        ),
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint instead of starting over",
+    )
+    parser.add_argument(
+        "--role",
+        choices=("single", "coordinator", "worker", "daemon"),
+        default="single",
+        help=(
+            "single: crawl the URL file in this process (default); coordinator: "
+            "queue the URL file as work units, wait for workers, then merge and "
+            "export; worker: crawl queued work units; daemon: keep monitoring the "
+            "URL file's searches on their own intervals until stopped"
+        ),
+    )
+    parser.add_argument(
+        "--queue",
+        type=str,
+        default=None,
+        help="Work queue for --role coordinator/worker (overrides distributed_queue_path)",
+    )
+    parser.add_argument(
+        "--metrics-file",
+        type=str,
+        default=None,
+        help="Write Prometheus-format metrics to this file when the run ends",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Serve Prometheus metrics at http://<metrics_host>:PORT/metrics while running",
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        nargs="?",
+        const="cprofile",
+        choices=PROFILE_MODES,
+        default=None,
+        help=(
+            "Profile the run per stage (crawl, parse, delta, export.<format>); "
+            "repeatable. cprofile (default): cProfile per stage, parse workers "
+            "included; asyncio: event loop lag and slow callbacks; sample: "
+            "low-overhead stack sampling"
+        ),
+    )
+    parser.add_argument(
+        "--profile-dir",
+        type=str,
+        default=None,
+        help="Directory for profile outputs (overrides profile_dir)",
+    )
     parser.add_argument(
         "--log-level",
         type=str,
         default="INFO",
         help="Logging level (DEBUG, INFO, WARNING, ERROR)",
     )
+
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND")
+    add_query_arguments(
+        commands.add_parser(
+            "query",
+            help="Query the listings in the delta state store instead of crawling",
+            description=(
+                "Query the listings accumulated in the delta state store, optionally "
+                "importing exported snapshots into it first. Matches are printed as "
+                "JSON Lines."
+            ),
+        )
+    )
     return parser
 
+def _postcode_range(value: str) -> Tuple[int, int]:
+    low, _, high = value.partition("-")
+    try:
+        return int(low), int(high or low)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Expected a postcode or range like 1000-1050: {value!r}")
+
+def add_query_arguments(parser: argparse.ArgumentParser) -> None:
+    # Also accepted after the command; SUPPRESS keeps the values given
+    # before it (or the main parser's defaults) when they are not repeated
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="Path to JSON settings file",
+    )
+    parser.add_argument(
+        "--output-prefix",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="Output prefix of the runs whose state store to query",
+    )
+    parser.add_argument(
+        "--store",
+        type=str,
+        default=None,
+        help="State store to query (overrides delta_state_path and --output-prefix)",
+    )
+    parser.add_argument(
+        "--import",
+        dest="imports",
+        action="append",
+        default=[],
+        metavar="SNAPSHOT",
+        help="Add an exported .json or .jsonl snapshot to the store first; repeatable, oldest first",
+    )
+    parser.add_argument(
+        "--postcode",
+        type=_postcode_range,
+        default=None,
+        help="Postcode or inclusive range, e.g. 1000-1050",
+    )
+    parser.add_argument(
+        "--type",
+        dest="types",
+        action="append",
+        default=[],
+        help="Property type, e.g. apartment (case-insensitive); repeatable",
+    )
+    parser.add_argument("--min-price", type=int, default=None)
+    parser.add_argument("--max-price", type=int, default=None)
+    parser.add_argument("--min-bedrooms", type=int, default=None)
+    parser.add_argument("--max-bedrooms", type=int, default=None)
+    parser.add_argument(
+        "--status",
+        dest="statuses",
+        action="append",
+        default=[],
+        choices=("new", "changed", "active", "delisted"),
+        help="Current monitoring status; repeatable",
+    )
+    parser.add_argument(
+        "--first-seen-within",
+        type=parse_duration,
+        default=None,
+        metavar="DURATION",
+        help="Only listings first seen in the last DURATION, e.g. 7d or 12h",
+    )
+    parser.add_argument(
+        "--first-seen-since",
+        type=str,
+        default=None,
+        metavar="DATE",
+        help="Only listings first seen on or after DATE (YYYY-MM-DD, UTC)",
+    )
+    parser.add_argument("--order-by", choices=list(ORDER_COLUMNS), default=None)
+    parser.add_argument("--desc", action="store_true", help="Sort in descending order")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument(
+        "--count", action="store_true", help="Print the number of matches instead"
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str,
+        default=argparse.SUPPRESS,
+        help="Logging level (DEBUG, INFO, WARNING, ERROR)",
+    )
+
+def run_query(args: argparse.Namespace) -> None:
+    logger = configure_logging(args.log_level)
+    config = apply_defaults(load_config(Path(args.config)))
+    store_path = (
+        Path(args.store) if args.store else state_store_path(config, Path(args.output_prefix))
+    )
+
+    for snapshot in map(Path, args.imports):
+        started_at = datetime.fromtimestamp(
+            snapshot.stat().st_mtime, timezone.utc
+        ).strftime("%Y-%m-%dT%H:%M:%SZ")
+        summary = import_snapshot(store_path, iter_snapshot(snapshot), started_at)
+        logger.info(
+            "Imported %s into %s — total: %d, new: %d, changed: %d, delisted: %d",
+            snapshot,
+            store_path,
+            summary["total"],
+            summary["new"],
+            summary["changed"],
+            summary["delisted"],
+        )
+
+    since = args.first_seen_since
+    if args.first_seen_within is not None:
+        since = (
+            datetime.now(timezone.utc) - timedelta(seconds=args.first_seen_within)
+        ).strftime("%Y-%m-%dT%H:%M:%SZ")
+    postcode_min, postcode_max = args.postcode or (None, None)
+    flt = ListingFilter(
+        postcode_min=postcode_min,
+        postcode_max=postcode_max,
+        property_types=tuple(args.types),
+        price_min=args.min_price,
+        price_max=args.max_price,
+        bedrooms_min=args.min_bedrooms,
+        bedrooms_max=args.max_bedrooms,
+        first_seen_since=since,
+        statuses=tuple(args.statuses),
+    )
+
+    started = time.perf_counter()
+    with ListingIndex(store_path) as index:
+        if args.count:
+            print(index.count(flt))
+            matched = None
+        else:
+            matched = 0
+            for item in index.search(
+                flt, order_by=args.order_by, descending=args.desc, limit=args.limit
+            ):
+                sys.stdout.write(json.dumps(as_dict(item), ensure_ascii=False) + "\n")
+                matched += 1
+    if matched is not None:
+        logger.info(
+            "%d listing(s) matched in %.3fs", matched, time.perf_counter() - started
+        )
+
 def configure_logging(level: str) -> logging.Logger:
     logger = get_logger("immoweb_scraper")
     lvl = getattr(logging, level.upper(), logging.INFO)
@@ -169,6 +1065,9 @@ def configure_logging(level: str) -> logging.Logger:
 async def async_main(cli_args: Optional[List[str]] = None) -> None:
     parser = build_arg_parser()
     args = parser.parse_args(cli_args)
+    if args.command == "query":
+        run_query(args)
+        return
 
     logger = configure_logging(args.log_level)
 
@@ -179,21 +1078,111 @@ async def async_main(cli_args: Optional[List[str]] = None) -> None:
     urls_file = Path(args.urls_file)
     output_prefix = Path(args.output_prefix)
     delta_mode_enabled = config["delta_mode_enabled"] and not args.no_delta
+    incremental = config["incremental_crawl"] or args.incremental
+    changed_only = config["changed_only_output"] or args.changed_only
+    if incremental and args.role in ("coordinator", "worker"):
+        # Workers crawl without the delta state, so they could never stop early
+        parser.error(
+            "incremental crawling (--incremental / incremental_crawl) is not "
+            "supported with --role coordinator or worker; run without it"
+        )
+
+    if args.enrich_details:
+        config["detail_enrichment_enabled"] = True
+    if args.download_photos:
+        config["photo_download_enabled"] = True
+    if args.queue:
+        config["distributed_queue_path"] = args.queue
+    if args.metrics_file:
+        config["metrics_file"] = args.metrics_file
+    if args.metrics_port is not None:
+        config["metrics_port"] = args.metrics_port
+    if args.profile:
+        config["profile_modes"] = args.profile
+    if args.profile_dir:
+        config["profile_dir"] = args.profile_dir
 
     logger.info("Starting Immoweb scraper")
     logger.debug("Using configuration: %s", json.dumps(config, indent=2))
 
-    try:
-        await run_scraper(
-            config=config,
-            urls_file=urls_file,
-            output_prefix=output_prefix,
-            delta_mode_enabled=delta_mode_enabled,
-            logger=logger,
+    metrics = MetricsRegistry()
+    metrics_server = None
+    if config["metrics_port"] is not None:
+        metrics_server = await start_metrics_server(
+            metrics, config["metrics_host"], config["metrics_port"]
+        )
+        logger.info(
+            "Serving metrics at http://%s:%s/metrics",
+            config["metrics_host"],
+            config["metrics_port"],
         )
+    profiler: Optional[RunProfiler] = None
+    if config["profile_modes"]:
+        profiler = RunProfiler(
+            config["profile_modes"],
+            Path(config["profile_dir"]),
+            metrics,
+            sample_interval=config["profile_sample_interval"],
+            lag_interval=config["profile_loop_lag_interval"],
+            slow_callback=config["profile_slow_callback"],
+        )
+        await profiler.start()
+        logger.info("Profiling enabled: %s", ", ".join(config["profile_modes"]))
+    transport = open_transport(config, metrics)
+    started = time.perf_counter()
+
+    try:
+        if args.role == "worker":
+            await run_crawl_worker(config, logger, metrics=metrics, transport=transport)
+        elif args.role == "daemon":
+            await run_daemon(
+                config=config,
+                urls_file=urls_file,
+                output_prefix=output_prefix,
+                logger=logger,
+                metrics=metrics,
+                transport=transport,
+            )
+        elif args.role == "coordinator":
+            await run_coordinator(
+                config=config,
+                urls_file=urls_file,
+                output_prefix=output_prefix,
+                delta_mode_enabled=delta_mode_enabled,
+                logger=logger,
+                changed_only=changed_only,
+                metrics=metrics,
+                transport=transport,
+            )
+        else:
+            await run_scraper(
+                config=config,
+                urls_file=urls_file,
+                output_prefix=output_prefix,
+                delta_mode_enabled=delta_mode_enabled,
+                logger=logger,
+                incremental=incremental,
+                changed_only=changed_only,
+                resume=args.resume,
+                metrics=metrics,
+                transport=transport,
+            )
     except Exception as exc:
         logger.exception("Unexpected error during scraping: %s", exc)
         raise
+    finally:
+        await transport.close()
+        log_stage_summary(metrics, logger, time.perf_counter() - started)
+        if profiler is not None:
+            written = await profiler.stop()
+            logger.info(
+                "Wrote %d profile file(s) to %s", len(written), config["profile_dir"]
+            )
+        if config["metrics_file"]:
+            metrics.write(Path(config["metrics_file"]))
+            logger.info("Wrote metrics to %s", config["metrics_file"])
+        if metrics_server is not None:
+            await metrics_server.cleanup()
 
 if __name__ == "__main__":
     asyncio.run(async_main())
\ No newline at end of file
@@ -0,0 +1,270 @@
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from outputs.exporter_jsonl import JsonLinesSink
+from scraper.crawler import ImmowebCrawler
+from scraper.enrich import DetailEnricher
+from scraper.listing import Listing, as_dict
+from scraper.metrics import MetricsRegistry
+from scraper.normalize import normalize_batch
+from scraper.photos import PhotoDownloader
+from scraper.utils import get_logger
+
+from .delta_mode import CHANGE_STATUSES, detect_changes
+from .scheduler import SearchScheduler, SearchSpec
+
+# Upper bounds on how long a new listing was online before it was seen
+LAG_BUCKETS = (30, 60, 120, 300, 600, 900, 1800, 3600, 7200)
+
+def _listing_key(item: Dict[str, Any]) -> Optional[str]:
+    ident = item.get("id") or item.get("url")
+    return str(ident) if ident else None
+
+def _as_listing(item: Dict[str, Any]) -> Listing:
+    return item if isinstance(item, Listing) else Listing.from_dict(item)
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+class LiveDeltaIndex:
+    """
+    Delta state of a long-running monitor, kept in memory across crawls.
+
+    Holds the latest version of every live listing, keyed like delta mode
+    (str(id or url)), and which listings each search returned. `annotate`
+    classifies a freshly crawled listing as new, changed or active against
+    the index; `end_pass` then delists the listings a complete crawl of a
+    search no longer returned, unless another search still returns them.
+    """
+
+    def __init__(self, previous: Iterable[Dict[str, Any]] = ()) -> None:
+        self.listings: Dict[str, Listing] = {}
+        self._members: Dict[str, Set[str]] = {}
+        for item in previous:
+            key = _listing_key(item)
+            if not key or item.get("apify_monitoring_status") == "delisted":
+                continue
+            listing = _as_listing(item)
+            self.listings[key] = listing
+            if listing.searchUrl:
+                self._members.setdefault(listing.searchUrl, set()).add(key)
+
+    def keys(self):
+        """Live view of the known keys, for incremental crawling."""
+        return self.listings.keys()
+
+    def annotate(self, item: Dict[str, Any]) -> Optional[str]:
+        key = _listing_key(item)
+        status = "unknown"
+        if key:
+            previous = self.listings.get(key)
+            if previous is None:
+                status = "new"
+            else:
+                status = "active"
+                changed = detect_changes(previous, item)
+                if changed:
+                    status = "changed"
+                    item["changedFields"] = changed
+            self.listings[key] = _as_listing(item)
+        item["apify_monitoring_status"] = status
+        return key
+
+    def end_pass(self, search_url: str, seen: Set[str], complete: bool) -> List[Listing]:
+        """
+        Record the keys one crawl of `search_url` returned. After a complete
+        crawl, return its listings that are gone, marked "delisted".
+        """
+        members = self._members.setdefault(search_url, set())
+        if not complete:
+            members |= seen
+            return []
+        gone = members - seen
+        self._members[search_url] = set(seen)
+        delisted = []
+        for key in gone:
+            if any(key in keys for keys in self._members.values()):
+                continue
+            listing = self.listings.pop(key, None)
+            if listing is not None:
+                listing.apify_monitoring_status = "delisted"
+                delisted.append(listing)
+        return delisted
+
+class _KnownBefore:
+    """Keys the index held before the current crawl, as the crawler's known_ids."""
+
+    __slots__ = ("index", "added")
+
+    def __init__(self, index: LiveDeltaIndex, added: Set[str]) -> None:
+        self.index = index
+        self.added = added
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.index.listings and key not in self.added
+
+class _Pass:
+    """Bookkeeping for one crawl of one search."""
+
+    __slots__ = ("seen", "added", "counts")
+
+    def __init__(self) -> None:
+        self.seen: Set[str] = set()
+        # Keys this crawl added to the index
+        self.added: Set[str] = set()
+        self.counts: Dict[str, int] = {"total": 0, "new": 0, "changed": 0, "delisted": 0}
+
+async def run_monitor(
+    crawler: ImmowebCrawler,
+    specs: List[SearchSpec],
+    index: LiveDeltaIndex,
+    events: JsonLinesSink,
+    stop: asyncio.Event,
+    *,
+    enricher: Optional[DetailEnricher] = None,
+    photos: Optional[PhotoDownloader] = None,
+    full_crawl_every: int = 12,
+    batch_size: int = 500,
+    snapshot: Optional[Callable[[], None]] = None,
+    snapshot_interval: float = 600.0,
+    metrics: Optional[MetricsRegistry] = None,
+    logger: Optional[logging.Logger] = None,
+) -> None:
+    """
+    Re-crawl each search in `specs` on its own interval until `stop` is set,
+    with one crawler, connection pool and delta index for the whole run.
+
+    A `SearchScheduler` picks the next search, so crawls are spread over
+    time rather than started together. Most crawls are incremental: a
+    search stops paginating once its pages only hold listings already in
+    `index`. Every `full_crawl_every`-th crawl of a search (and the first)
+    goes to its end, so that listings gone from it can be delisted. New,
+    changed and delisted listings are appended to `events` as they are
+    detected, with their detection time in `detectedAt`. `snapshot` is
+    called every `snapshot_interval` seconds and when the monitor stops.
+    """
+    logger = logger or get_logger("immoweb_monitor")
+    metrics = metrics or MetricsRegistry()
+    scheduler = SearchScheduler(specs)
+    passes = [0] * len(specs)
+    last_crawled: List[Optional[float]] = [None] * len(specs)
+    full_crawl_every = max(1, full_crawl_every)
+    last_snapshot = time.monotonic()
+
+    logger.info(
+        "Monitoring %d search(es); full crawl every %d pass(es)", len(specs), full_crawl_every
+    )
+    try:
+        while not stop.is_set():
+            n = scheduler.pop_due()
+            if n is None:
+                wait = max(0.0, scheduler.next_due() - time.monotonic())
+                try:
+                    await asyncio.wait_for(stop.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            spec = specs[n]
+            full = passes[n] % full_crawl_every == 0
+            started = time.monotonic()
+            result = await _crawl_search(
+                crawler, spec, index, events, full, enricher, photos, batch_size, metrics
+            )
+            passes[n] += 1
+            if last_crawled[n] is not None and result.counts["new"]:
+                lag = metrics.histogram(
+                    "monitor_new_listing_lag_seconds",
+                    "Time since the previous crawl of the search a new listing was found in",
+                    LAG_BUCKETS,
+                )
+                for _ in range(result.counts["new"]):
+                    lag.observe(started - last_crawled[n])
+            last_crawled[n] = started
+            next_due = scheduler.reschedule(n)
+            logger.info(
+                "%s crawl of %s — listings: %d, new: %d, changed: %d, delisted: %d; "
+                "next in %.0fs",
+                "Full" if full else "Incremental",
+                spec.url,
+                result.counts["total"],
+                result.counts["new"],
+                result.counts["changed"],
+                result.counts["delisted"],
+                max(0.0, next_due - time.monotonic()),
+            )
+            metrics.counter("monitor_crawls_total", "Search crawls by the monitor").inc(
+                mode="full" if full else "incremental"
+            )
+            metrics.gauge("monitor_live_listings", "Listings in the live delta index").set(
+                len(index.listings)
+            )
+
+            if snapshot is not None and time.monotonic() - last_snapshot >= snapshot_interval:
+                snapshot()
+                last_snapshot = time.monotonic()
+    finally:
+        if snapshot is not None:
+            snapshot()
+
+async def _crawl_search(
+    crawler: ImmowebCrawler,
+    spec: SearchSpec,
+    index: LiveDeltaIndex,
+    events: JsonLinesSink,
+    full: bool,
+    enricher: Optional[DetailEnricher],
+    photos: Optional[PhotoDownloader],
+    batch_size: int,
+    metrics: MetricsRegistry,
+) -> _Pass:
+    result = _Pass()
+    event_counter = metrics.counter("monitor_events_total", "Listing events by type")
+
+    def emit(items: Iterable[Dict[str, Any]]) -> None:
+        detected_at = _utc_now()
+        for item in items:
+            status = item.get("apify_monitoring_status")
+            if status in result.counts:
+                result.counts[status] += 1
+            if status in CHANGE_STATUSES:
+                events.write(dict(as_dict(item), detectedAt=detected_at))
+                event_counter.inc(event=status)
+        events.flush()
+
+    async def process(batch: List[Dict[str, Any]]) -> None:
+        if enricher is not None:
+            with metrics.stage("enrich"):
+                await enricher.enrich_batch(batch, index.keys())
+        if photos is not None:
+            with metrics.stage("photos"):
+                await photos.download_batch(batch)
+        with metrics.stage("normalize"):
+            normalize_batch(batch, metrics)
+        with metrics.stage("delta"):
+            for item in batch:
+                key = index.annotate(item)
+                if key:
+                    result.seen.add(key)
+                    if item["apify_monitoring_status"] == "new":
+                        result.added.add(key)
+        result.counts["total"] += len(batch)
+        emit(batch)
+
+    crawler.known_ids = None if full else _KnownBefore(index, result.added)
+    batch: List[Dict[str, Any]] = []
+    async for item in metrics.timed_async(crawler.iter_listings([spec.url]), "crawl"):
+        batch.append(item)
+        if len(batch) >= batch_size:
+            await process(batch)
+            batch = []
+    await process(batch)
+
+    complete = full and spec.url not in crawler.truncated_searches
+    with metrics.stage("delta"):
+        delisted = index.end_pass(spec.url, result.seen, complete)
+    emit(delisted)
+    return result
\ No newline at end of file
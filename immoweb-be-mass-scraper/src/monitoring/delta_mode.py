@@ -1,57 +1,158 @@
-from typing import List, Dict, Any, Tuple, Optional
+from typing import Collection, Container, Iterator, List, Dict, Any, Set, Tuple, Optional
+
+from scraper.listing import Listing
+from scraper.utils import changed_content_fields, listing_digest
+
+# Statuses worth passing downstream in changed-only output
+CHANGE_STATUSES = ("new", "changed", "delisted")
+
+def _as_listing(item: Dict[str, Any]) -> Listing:
+    return item if isinstance(item, Listing) else Listing.from_dict(item)
 
 def _build_index(
     items: List[Dict[str, Any]],
-) -> Dict[str, Dict[str, Any]]:
-    index: Dict[str, Dict[str, Any]] = {}
+) -> Dict[str, Listing]:
+    index: Dict[str, Listing] = {}
     for item in items:
         ident = item.get("id") or item.get("url")
         if not ident:
             # Skip items that cannot be reliably identified between runs
             continue
-        index[str(ident)] = item
+        index[str(ident)] = _as_listing(item)
     return index
 
+def detect_changes(
+    previous: Dict[str, Any], current: Dict[str, Any]
+) -> List[str]:
+    """
+    Content fields that differ between two versions of a listing, or an
+    empty list when their digests match. Listings from snapshots written
+    before digests existed get theirs computed on the fly.
+    """
+    current_hash = current.get("contentHash") or listing_digest(current)
+    previous_hash = previous.get("contentHash") or listing_digest(previous)
+    if current_hash == previous_hash:
+        return []
+    return changed_content_fields(previous, current)
+
+class DeltaTracker:
+    """
+    Streaming counterpart of `annotate_with_delta`.
+
+    Current listings are passed to `annotate` one at a time as they are
+    crawled and have their `apify_monitoring_status` set in place; once the
+    crawl is over, `unseen` yields the previous listings that never showed
+    up. Only the previous snapshot index and the keys seen so far are kept in
+    memory.
+
+    Previous listings given as dicts are indexed as `Listing` records;
+    `Listing`s are indexed as they are, and `unseen` sets their status in
+    place rather than copying them.
+    """
+
+    def __init__(self, previous: List[Dict[str, Any]]) -> None:
+        self._prev_index = _build_index(previous)
+        self._seen: Set[str] = set()
+        self._counts: Dict[str, int] = {
+            "total": 0,
+            "new": 0,
+            "changed": 0,
+            "delisted": 0,
+            "active": 0,
+        }
+
+    def annotate(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        ident = item.get("id") or item.get("url")
+        status = "unknown"
+        if ident:
+            key = str(ident)
+            self._seen.add(key)
+            prev_item = self._prev_index.get(key)
+            if prev_item is None:
+                status = "new"
+            else:
+                status = "active"
+                changed = detect_changes(prev_item, item)
+                if changed:
+                    status = "changed"
+                    item["changedFields"] = changed
+        item["apify_monitoring_status"] = status
+        self._count(status)
+        return item
+
+    def annotate_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.annotate(item) for item in items]
+
+    def known_keys(self) -> Container[str]:
+        """Keys of the previous snapshot, for incremental crawling."""
+        return self._prev_index.keys()
+
+    def unseen(
+        self, partial_searches: Collection[str] = ()
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Yield previous listings missing from the current crawl, marked
+        "delisted". Listings belonging to a search in `partial_searches`
+        (one that was not crawled to its end, e.g. an incremental crawl that
+        stopped early) may simply sit on a page that was skipped; they are
+        carried over as "active" instead, unless the previous snapshot
+        already had them delisted.
+        """
+        for ident, prev_item in self._prev_index.items():
+            if ident in self._seen:
+                continue
+            status = "delisted"
+            if (
+                partial_searches
+                and prev_item.searchUrl in partial_searches
+                and prev_item.apify_monitoring_status != "delisted"
+            ):
+                status = "active"
+            prev_item.apify_monitoring_status = status
+            self._count(status)
+            yield prev_item
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+    def close(self, completed: bool = True) -> None:
+        pass
+
+    def _count(self, status: str) -> None:
+        self._counts["total"] += 1
+        if status in self._counts:
+            self._counts[status] += 1
+
 def annotate_with_delta(
     previous: List[Dict[str, Any]],
     current: List[Dict[str, Any]],
+    partial_searches: Collection[str] = (),
 ) -> List[Dict[str, Any]]:
     """
     Compare previous and current listing snapshots and annotate each listing with
     `apify_monitoring_status`:
 
     - "new": listing present now but not in previous snapshot
-    - "active": listing present in both snapshots
+    - "changed": listing present in both snapshots with different content;
+      `changedFields` lists what changed
+    - "active": listing present in both snapshots, unchanged
     - "delisted": listing present before but missing now
 
     Delisted items are appended to the output so a consumer can react to them
-    even though they no longer appear in the current crawl.
+    even though they no longer appear in the current crawl. Missing items from
+    searches listed in `partial_searches` are appended as "active" instead,
+    since their pages were not crawled (unless they were delisted already).
     """
-    prev_index = _build_index(previous)
-    curr_index = _build_index(current)
-
-    annotated: List[Dict[str, Any]] = []
+    tracker = DeltaTracker(previous)
 
     # First, annotate current listings as new or active
-    for item in current:
-        ident = item.get("id") or item.get("url")
-        status = "unknown"
-        if ident:
-            key = str(ident)
-            if key in prev_index:
-                status = "active"
-            else:
-                status = "new"
-        updated = dict(item)
-        updated["apify_monitoring_status"] = status
-        annotated.append(updated)
+    annotated: List[Dict[str, Any]] = [
+        tracker.annotate(item.copy() if isinstance(item, Listing) else Listing.from_dict(item))
+        for item in current
+    ]
 
     # Then, add delisted items based on previous snapshot
-    for ident, prev_item in prev_index.items():
-        if ident not in curr_index:
-            delisted = dict(prev_item)
-            delisted["apify_monitoring_status"] = "delisted"
-            annotated.append(delisted)
+    annotated.extend(tracker.unseen(partial_searches))
 
     return annotated
 
@@ -60,6 +161,9 @@ def summarize_delta(
 ) -> Dict[str, int]:
     total = len(annotated_listings)
     new = sum(1 for it in annotated_listings if it.get("apify_monitoring_status") == "new")
+    changed = sum(
+        1 for it in annotated_listings if it.get("apify_monitoring_status") == "changed"
+    )
     delisted = sum(
         1 for it in annotated_listings if it.get("apify_monitoring_status") == "delisted"
     )
@@ -69,6 +173,7 @@ def summarize_delta(
     return {
         "total": total,
         "new": new,
+        "changed": changed,
         "delisted": delisted,
         "active": active,
     }
\ No newline at end of file
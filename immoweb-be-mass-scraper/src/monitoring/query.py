@@ -0,0 +1,154 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from scraper.listing import Listing
+from scraper.normalize import normalize_batch
+
+from .state_store import ListingStateStore
+
+# Sort keys accepted by `ListingIndex.search`, by column
+ORDER_COLUMNS = {
+    "price": "price_value",
+    "bedrooms": "bedrooms",
+    "postcode": "postcode",
+    "first_seen": "first_seen",
+    "last_seen": "last_seen",
+}
+
+class ListingFilter(NamedTuple):
+    """
+    Conditions on stored listings; all given ones must hold. Bounds are
+    inclusive, and a listing without the value never matches a bound on it.
+    `first_seen_since` is a UTC timestamp ("2025-03-01T00:00:00Z") or date.
+    """
+
+    postcode_min: Optional[int] = None
+    postcode_max: Optional[int] = None
+    property_types: Tuple[str, ...] = ()
+    price_min: Optional[int] = None
+    price_max: Optional[int] = None
+    bedrooms_min: Optional[int] = None
+    bedrooms_max: Optional[int] = None
+    first_seen_since: Optional[str] = None
+    statuses: Tuple[str, ...] = ()
+
+def _where(flt: ListingFilter) -> Tuple[str, List[Any]]:
+    clauses: List[str] = []
+    params: List[Any] = []
+    for column, low, high in (
+        ("postcode", flt.postcode_min, flt.postcode_max),
+        ("price_value", flt.price_min, flt.price_max),
+        ("bedrooms", flt.bedrooms_min, flt.bedrooms_max),
+    ):
+        if low is not None:
+            clauses.append(f"{column} >= ?")
+            params.append(low)
+        if high is not None:
+            clauses.append(f"{column} <= ?")
+            params.append(high)
+    for column, values in (("property_type", flt.property_types), ("status", flt.statuses)):
+        if values:
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+    if flt.first_seen_since:
+        clauses.append("first_seen >= ?")
+        params.append(flt.first_seen_since)
+    return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+class ListingIndex:
+    """
+    Read-only queries over the listings in a delta state store (see
+    `ListingStateStore`), answered from its indexes on postcode, property
+    type, price, bedrooms, first_seen and status.
+
+    `search` streams matching listings from a cursor, so only the rows
+    asked for are decoded; `count` never decodes any. Results carry the
+    store's view of each listing: its current status in
+    `apify_monitoring_status`, plus `firstSeen` and `lastSeen`.
+    """
+
+    def __init__(self, path: Path) -> None:
+        if not path.exists():
+            raise FileNotFoundError(f"No listing state store at {path}")
+        self.path = path
+        self._conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+
+    def search(
+        self,
+        flt: ListingFilter = ListingFilter(),
+        *,
+        order_by: Optional[str] = None,
+        descending: bool = False,
+        limit: Optional[int] = None,
+    ) -> Iterator[Listing]:
+        where, params = _where(flt)
+        sql = f"SELECT status, first_seen, last_seen, data FROM listings{where}"
+        if order_by is not None:
+            column = ORDER_COLUMNS.get(order_by)
+            if column is None:
+                raise ValueError(
+                    f"Unknown sort key {order_by!r}; expected one of {sorted(ORDER_COLUMNS)}"
+                )
+            # Listings without the value go last either way; both orders
+            # still walk the column's index
+            sql += f" ORDER BY {column} {'DESC' if descending else 'NULLS LAST'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        for status, first_seen, last_seen, data in self._conn.execute(sql, params):
+            item = Listing.from_dict(json.loads(data))
+            item.apify_monitoring_status = status
+            item["firstSeen"] = first_seen
+            item["lastSeen"] = last_seen
+            yield item
+
+    def count(self, flt: ListingFilter = ListingFilter()) -> int:
+        where, params = _where(flt)
+        return self._conn.execute(f"SELECT COUNT(*) FROM listings{where}", params).fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ListingIndex":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def import_snapshot(
+    path: Path,
+    listings: Iterable[Dict[str, Any]],
+    started_at: Optional[str] = None,
+    batch_size: int = 500,
+) -> Dict[str, int]:
+    """
+    Add an exported snapshot to the state store at `path` as one more run,
+    so that snapshots accumulated over time (e.g. by the JSON delta
+    backend) can be queried. Listings are normalized and classified as in
+    a crawl; stored listings missing from the snapshot, or marked delisted
+    in it, are delisted. `started_at` dates the run, e.g. to the snapshot's
+    modification time. Returns the run's delta summary.
+    """
+    store = ListingStateStore(path, started_at=started_at)
+    try:
+        batch: List[Dict[str, Any]] = []
+        for item in listings:
+            if item.get("apify_monitoring_status") == "delisted":
+                continue
+            batch.append(item)
+            if len(batch) >= batch_size:
+                normalize_batch(batch)
+                store.annotate_batch(batch)
+                batch = []
+        normalize_batch(batch)
+        store.annotate_batch(batch)
+        for _ in store.unseen():
+            pass
+    except BaseException:
+        store.close(completed=False)
+        raise
+    summary = store.summary()
+    store.close()
+    return summary
\ No newline at end of file
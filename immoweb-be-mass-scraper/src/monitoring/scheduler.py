@@ -0,0 +1,88 @@
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+# Suffixes accepted in durations ("90", "90s", "15m", "2h", "7d")
+_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+class SearchSpec(NamedTuple):
+    url: str
+    # Seconds between two crawls of the search
+    interval: float
+    # Higher goes first when several searches are due at once
+    priority: int
+
+def parse_duration(value: str) -> float:
+    value = value.strip().lower()
+    unit = _DURATION_UNITS.get(value[-1:])
+    if unit is not None:
+        value = value[:-1]
+    seconds = float(value) * (unit or 1)
+    if seconds <= 0:
+        raise ValueError(f"Interval must be positive: {value!r}")
+    return seconds
+
+def parse_search_line(
+    line: str, default_interval: float, default_priority: int = 0
+) -> SearchSpec:
+    """
+    Parse one line of a URL file: the search URL, optionally followed by
+    `interval=<duration>` and `priority=<int>`, e.g.
+
+        https://www.immoweb.be/en/search/house/for-sale?page=1 interval=5m priority=2
+    """
+    url, *options = line.split()
+    interval = default_interval
+    priority = default_priority
+    for option in options:
+        key, _, value = option.partition("=")
+        if key == "interval":
+            interval = parse_duration(value)
+        elif key == "priority":
+            priority = int(value)
+        else:
+            raise ValueError(f"Unknown search option {option!r} for {url}")
+    return SearchSpec(url, interval, priority)
+
+class SearchScheduler:
+    """
+    Decides which search a long-running monitor crawls next.
+
+    Each search is due once per its `interval`. First due times are spread
+    evenly across the interval, so searches sharing an interval take turns
+    instead of all starting together, and a search keeps its phase from
+    then on: a crawl that runs late does not shift later ones, and slots
+    missed entirely are skipped rather than caught up in a burst. When
+    several searches are due, the one with the highest priority goes first,
+    then the one overdue the longest.
+
+    Times are `time.monotonic()` seconds.
+    """
+
+    def __init__(self, specs: List[SearchSpec], now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        self.specs = specs
+        count = len(specs)
+        self._due: Dict[int, float] = {
+            n: now + spec.interval * n / count for n, spec in enumerate(specs)
+        }
+
+    def next_due(self) -> float:
+        return min(self._due.values())
+
+    def pop_due(self, now: Optional[float] = None) -> Optional[int]:
+        """Index of the search to crawl now, or None if none is due yet."""
+        now = time.monotonic() if now is None else now
+        due = [n for n, when in self._due.items() if when <= now]
+        if not due:
+            return None
+        return max(due, key=lambda n: (self.specs[n].priority, -self._due[n]))
+
+    def reschedule(self, index: int, now: Optional[float] = None) -> float:
+        """Schedule the next crawl of search `index`, once it has been crawled."""
+        now = time.monotonic() if now is None else now
+        interval = self.specs[index].interval
+        when = self._due[index] + interval
+        if when <= now:
+            when += ((now - when) // interval + 1) * interval
+        self._due[index] = when
+        return when
\ No newline at end of file
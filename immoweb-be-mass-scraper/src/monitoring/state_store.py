@@ -0,0 +1,342 @@
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterator, List, Optional, Tuple
+
+from scraper.cache import select_in_chunks
+from scraper.listing import Listing, as_dict
+from scraper.normalize import extract_postcode, price_fields, to_int
+from scraper.utils import listing_digest
+
+from .delta_mode import detect_changes
+
+def _listing_key(item: Dict[str, Any]) -> Any:
+    ident = item.get("id") or item.get("url")
+    return str(ident) if ident else None
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+# Columns extracted from each listing's data for `monitoring.query`, with
+# their SQL types; every one has its own index
+INDEX_COLUMNS = (
+    ("postcode", "INTEGER"),
+    ("property_type", "TEXT COLLATE NOCASE"),
+    ("price_value", "INTEGER"),
+    ("bedrooms", "INTEGER"),
+)
+
+def _index_values(item: Dict[str, Any]) -> Tuple[Any, ...]:
+    price = item.get("priceValue")
+    if price is None and item.get("price"):
+        # Not normalized, e.g. data stored by an older version
+        price = price_fields(item)["priceValue"]
+    return (
+        extract_postcode(item.get("location")),
+        item.get("propertyType"),
+        price,
+        to_int(item.get("bedrooms")),
+    )
+
+class _StoredKeys:
+    """Container view over the keys in a state store (for `in` checks)."""
+
+    def __init__(self, conn: sqlite3.Connection, run_id: int) -> None:
+        self._conn = conn
+        self._run_id = run_id
+
+    def __contains__(self, key: object) -> bool:
+        # Listings first stored by the current (resumed) run are not known yet
+        row = self._conn.execute(
+            "SELECT 1 FROM listings WHERE key = ? AND NOT (last_run = ? AND status = 'new')",
+            (key, self._run_id),
+        ).fetchone()
+        return row is not None
+
+class ListingStateStore:
+    """
+    Persistent delta state backed by SQLite, as an alternative to reloading
+    the previous JSON snapshot.
+
+    Every listing ever seen has one row, keyed like the JSON delta mode
+    (str(id or url)) and indexed by id and url, holding its first_seen and
+    last_seen timestamps, its status and its latest data. Opening the store
+    starts a new run. `annotate_batch` classifies a batch of current listings
+    with one lookup and one batched upsert; stored content digests flag
+    changed listings without decoding unchanged ones. `unseen` then marks
+    every live listing the run did not touch as delisted with a single query
+    on a partial index over live rows. The cost of a run therefore follows the
+    size of the current crawl, not the size of the history.
+
+    Unlike the JSON snapshot, delisted listings are reported once, in the run
+    where they disappear, and listings of partially crawled searches stay in
+    the store without being re-emitted.
+
+    With `resume=True` an unfinished last run is continued instead of
+    starting a new one, so listings it already stored keep the status they
+    were given then. `started_at` overrides the timestamp of a new run
+    (and so the first_seen of the listings it adds), e.g. when importing an
+    older snapshot.
+
+    Postcode, property type, price and bedrooms are also kept in indexed
+    columns (`INDEX_COLUMNS`), next to first_seen and status, so that
+    `monitoring.query` can filter the stored listings without decoding them.
+
+    Implements the same interface as `DeltaTracker`.
+    """
+
+    def __init__(
+        self, path: Path, resume: bool = False, started_at: Optional[str] = None
+    ) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TEXT NOT NULL,
+                finished_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS listings (
+                key TEXT PRIMARY KEY,
+                id TEXT,
+                url TEXT,
+                search_url TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                last_run INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                content_hash TEXT,
+                data TEXT NOT NULL,
+                postcode INTEGER,
+                property_type TEXT COLLATE NOCASE,
+                price_value INTEGER,
+                bedrooms INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS listings_id ON listings (id);
+            CREATE INDEX IF NOT EXISTS listings_url ON listings (url);
+            CREATE INDEX IF NOT EXISTS listings_live_last_run
+                ON listings (last_run) WHERE status != 'delisted';
+            """
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(listings)")}
+        if "content_hash" not in columns:
+            # Stores created before content digests existed
+            self._conn.execute("ALTER TABLE listings ADD COLUMN content_hash TEXT")
+        missing = [(name, sql_type) for name, sql_type in INDEX_COLUMNS if name not in columns]
+        for name, sql_type in missing:
+            self._conn.execute(f"ALTER TABLE listings ADD COLUMN {name} {sql_type}")
+        if missing:
+            self._backfill_index_columns()
+        self._conn.executescript(
+            """
+            CREATE INDEX IF NOT EXISTS listings_postcode ON listings (postcode);
+            CREATE INDEX IF NOT EXISTS listings_property_type ON listings (property_type);
+            CREATE INDEX IF NOT EXISTS listings_price_value ON listings (price_value);
+            CREATE INDEX IF NOT EXISTS listings_bedrooms ON listings (bedrooms);
+            CREATE INDEX IF NOT EXISTS listings_first_seen ON listings (first_seen);
+            CREATE INDEX IF NOT EXISTS listings_status_first_seen
+                ON listings (status, first_seen);
+            """
+        )
+        last = self._conn.execute(
+            "SELECT run_id, started_at, finished_at FROM runs ORDER BY run_id DESC LIMIT 1"
+        ).fetchone()
+        if resume and last is not None and last[2] is None:
+            self.run_id: int = last[0]
+            self.started_at: str = last[1]
+        else:
+            self.started_at = started_at or _utc_now()
+            cur = self._conn.execute(
+                "INSERT INTO runs (started_at) VALUES (?)", (self.started_at,)
+            )
+            self.run_id = cur.lastrowid
+            self._conn.commit()
+        self._counts: Dict[str, int] = {
+            "total": 0,
+            "new": 0,
+            "changed": 0,
+            "delisted": 0,
+            "active": 0,
+        }
+
+    def known_keys(self) -> _StoredKeys:
+        return _StoredKeys(self._conn, self.run_id)
+
+    def annotate(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return self.annotate_batch([item])[0]
+
+    def annotate_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        keys = [_listing_key(item) for item in items]
+        previous = self._previous_versions([k for k in keys if k])
+        rows = []
+        unchanged = []
+        for item, key in zip(items, keys):
+            if not key:
+                status = "unknown"
+            elif key not in previous:
+                status = "new"
+            else:
+                prev_run, prev_status, prev_hash, prev_data = previous[key]
+                if prev_run == self.run_id:
+                    # Already classified by the interrupted run being resumed
+                    status = prev_status
+                    if status == "changed":
+                        item["changedFields"] = json.loads(prev_data).get("changedFields")
+                else:
+                    status = "active"
+                    content_hash = item.get("contentHash") or listing_digest(item)
+                    if prev_hash != content_hash:
+                        changed = detect_changes(json.loads(prev_data), item)
+                        if changed:
+                            status = "changed"
+                            item["changedFields"] = changed
+            item["apify_monitoring_status"] = status
+            self._count(status)
+            if not key:
+                continue
+            content_hash = item.get("contentHash") or listing_digest(item)
+            fields = (
+                item.get("id"),
+                item.get("url"),
+                item.get("searchUrl"),
+                self.started_at,
+                self.run_id,
+                status,
+                json.dumps(as_dict(item), ensure_ascii=False),
+            )
+            if key in previous and previous[key][2] == content_hash:
+                # Same content, so the same index column values: leaving
+                # those columns alone spares SQLite the index updates
+                unchanged.append((*fields, key))
+            else:
+                rows.append((key, self.started_at, *fields, content_hash, *_index_values(item)))
+        with self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO listings
+                    (key, first_seen, id, url, search_url, last_seen, last_run, status,
+                     data, content_hash, postcode, property_type, price_value, bedrooms)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (key) DO UPDATE SET
+                    id = excluded.id,
+                    url = excluded.url,
+                    search_url = excluded.search_url,
+                    last_seen = excluded.last_seen,
+                    last_run = excluded.last_run,
+                    status = excluded.status,
+                    data = excluded.data,
+                    content_hash = excluded.content_hash,
+                    postcode = excluded.postcode,
+                    property_type = excluded.property_type,
+                    price_value = excluded.price_value,
+                    bedrooms = excluded.bedrooms
+                """,
+                rows,
+            )
+            self._conn.executemany(
+                """
+                UPDATE listings SET
+                    id = ?, url = ?, search_url = ?, last_seen = ?, last_run = ?,
+                    status = ?, data = ?
+                WHERE key = ?
+                """,
+                unchanged,
+            )
+        return items
+
+    def unseen(
+        self, partial_searches: Collection[str] = ()
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Mark live listings that this run did not see as delisted and yield
+        them. Listings of searches in `partial_searches` are left untouched.
+        """
+        exclude = ""
+        if partial_searches:
+            # Any number of searches, without one bound parameter each
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TEMP TABLE IF NOT EXISTS partial_searches (url TEXT PRIMARY KEY)"
+                )
+                self._conn.execute("DELETE FROM partial_searches")
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO partial_searches (url) VALUES (?)",
+                    [(url,) for url in partial_searches],
+                )
+            exclude = (
+                " AND (search_url IS NULL OR "
+                "search_url NOT IN (SELECT url FROM partial_searches))"
+            )
+        where = f"status != 'delisted' AND last_run < ?{exclude}"
+        params = [self.run_id]
+
+        rows = self._conn.execute(
+            f"SELECT data FROM listings WHERE {where}", params
+        ).fetchall()
+        with self._conn:
+            self._conn.execute(
+                f"UPDATE listings SET status = 'delisted' WHERE {where}", params
+            )
+        for (data,) in rows:
+            item = Listing.from_dict(json.loads(data))
+            item.apify_monitoring_status = "delisted"
+            self._count("delisted")
+            yield item
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self._counts)
+
+    def close(self, completed: bool = True) -> None:
+        """
+        Close the store. An incomplete run stays unfinished so that a resumed
+        run can pick it up.
+        """
+        if completed:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE runs SET finished_at = ? WHERE run_id = ?",
+                    (_utc_now(), self.run_id),
+                )
+            # Refresh the planner statistics the query indexes rely on
+            self._conn.execute("PRAGMA optimize")
+        self._conn.close()
+
+    def _backfill_index_columns(self) -> None:
+        """Fill the index columns of a store created before they existed."""
+        last = 0
+        while True:
+            rows = self._conn.execute(
+                "SELECT rowid, data FROM listings WHERE rowid > ? ORDER BY rowid LIMIT 1000",
+                (last,),
+            ).fetchall()
+            if not rows:
+                break
+            last = rows[-1][0]
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE listings SET postcode = ?, property_type = ?, price_value = ?, "
+                    "bedrooms = ? WHERE rowid = ?",
+                    [(*_index_values(json.loads(data)), rowid) for rowid, data in rows],
+                )
+
+    def _previous_versions(
+        self, keys: List[str]
+    ) -> Dict[str, Tuple[int, str, str, str]]:
+        found: Dict[str, Tuple[int, str, str, str]] = {}
+        for key, last_run, status, content_hash, data in select_in_chunks(
+            self._conn,
+            "SELECT key, last_run, status, content_hash, data FROM listings "
+            "WHERE key IN ({placeholders})",
+            keys,
+        ):
+            found[key] = (last_run, status, content_hash, data)
+        return found
+
+    def _count(self, status: str) -> None:
+        self._counts["total"] += 1
+        if status in self._counts:
+            self._counts[status] += 1
\ No newline at end of file
@@ -1,24 +1,51 @@
 import csv
 from pathlib import Path
-from typing import List, Dict, Any
-
-def export_csv(listings: List[Dict[str, Any]], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    if not listings:
-        # Create an empty file with just a header row for visibility
-        with path.open("w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["no_data"])
-        return
-
-    # Collect all keys across items for a stable header
-    fieldnames = set()
-    for item in listings:
-        fieldnames.update(item.keys())
-    ordered_fieldnames = sorted(fieldnames)
-
-    with path.open("w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=ordered_fieldnames)
-        writer.writeheader()
-        for item in listings:
-            writer.writerow(item)
\ No newline at end of file
+from typing import Iterable, Dict, Any, Sequence
+
+from scraper.schema import CSV_FIELDS
+
+from .sink import ListingSink
+
+def export_csv(
+    listings: Iterable[Dict[str, Any]],
+    path: Path,
+    fieldnames: Sequence[str] = CSV_FIELDS,
+) -> None:
+    """
+    Write `listings` as CSV in a single pass. The header is the declared
+    listing schema (sorted), so rows never need to be scanned up front;
+    keys outside `fieldnames` are ignored. An empty input produces a file
+    with just a "no_data" row.
+    """
+    with CsvSink(path, fieldnames) as sink:
+        sink.write_many(listings)
+
+class CsvSink(ListingSink):
+    """
+    Incremental CSV writer for a header that is known up front.
+
+    Keys outside `fieldnames` are ignored. The header is written with the
+    first row; a run without any rows produces a file with just a "no_data"
+    row, for visibility.
+    """
+
+    def __init__(self, path: Path, fieldnames: Sequence[str] = CSV_FIELDS) -> None:
+        super().__init__(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = path.open("w", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(
+            self._file, fieldnames=list(fieldnames), extrasaction="ignore"
+        )
+
+    def write(self, listing: Dict[str, Any]) -> None:
+        if self.count == 0:
+            self._writer.writeheader()
+        self._writer.writerow(listing)
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        if self.count == 0:
+            csv.writer(self._file).writerow(["no_data"])
+        self._file.close()
\ No newline at end of file
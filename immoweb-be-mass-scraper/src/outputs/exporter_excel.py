@@ -1,12 +1,63 @@
+import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Any, Dict, Iterable, Optional, Sequence
 
-import pandas as pd
+from openpyxl import Workbook
 
-def export_excel(listings: List[Dict[str, Any]], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    if not listings:
-        df = pd.DataFrame()
-    else:
-        df = pd.DataFrame(listings)
-    df.to_excel(path, index=False)
\ No newline at end of file
+from scraper.schema import LISTING_FIELDS
+
+from .sink import ListingSink
+
+def _cell_value(value: Any) -> Any:
+    # Cells hold scalars only; lists such as photos are written as their
+    # Python repr, which is what the DataFrame-based export produced
+    if isinstance(value, (list, tuple, dict, set)):
+        return str(value)
+    return value
+
+def export_excel(
+    listings: Iterable[Dict[str, Any]],
+    path: Path,
+    fieldnames: Sequence[str] = LISTING_FIELDS,
+) -> None:
+    with ExcelSink(path, fieldnames) as sink:
+        sink.write_many(listings)
+
+class ExcelSink(ListingSink):
+    """
+    Streams listings into an .xlsx file through a write-only openpyxl
+    workbook: each row is serialised as it is appended instead of building
+    the whole sheet (or a DataFrame) in memory, so memory use does not grow
+    with the number of rows.
+
+    Columns follow the declared listing schema. The header is written with
+    the first row, so an empty run produces an empty sheet. The workbook is
+    saved to a temporary file that only replaces `path` on `close`.
+    """
+
+    def __init__(self, path: Path, fieldnames: Sequence[str] = LISTING_FIELDS) -> None:
+        super().__init__(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.fieldnames = list(fieldnames)
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._workbook: Optional[Workbook] = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("Sheet1")
+
+    def write(self, listing: Dict[str, Any]) -> None:
+        if self.count == 0:
+            self._sheet.append(self.fieldnames)
+        self._sheet.append([_cell_value(listing.get(name)) for name in self.fieldnames])
+        self.count += 1
+
+    def close(self) -> None:
+        if self._workbook is None:
+            return
+        workbook, self._workbook = self._workbook, None
+        workbook.save(str(self._tmp_path))
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        if self._workbook is None:
+            return
+        self._workbook = None
+        self._tmp_path.unlink(missing_ok=True)
\ No newline at end of file
@@ -1,8 +1,48 @@
 import json
+import os
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import Iterable, Dict, Any
 
-def export_json(listings: List[Dict[str, Any]], path: Path) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(listings, f, ensure_ascii=False, indent=2)
\ No newline at end of file
+from scraper.listing import as_dict
+
+from .sink import ListingSink
+
+def export_json(listings: Iterable[Dict[str, Any]], path: Path) -> None:
+    with JsonArraySink(path) as sink:
+        sink.write_many(listings)
+
+class JsonArraySink(ListingSink):
+    """
+    Writes the same document as `json.dump(listings, f, indent=2)`, one
+    listing at a time.
+
+    The array is written to a temporary file that only replaces `path` on
+    `close`; since the JSON output doubles as the previous snapshot for delta
+    mode, an interrupted run leaves the last complete snapshot in place.
+    """
+
+    def __init__(self, path: Path) -> None:
+        super().__init__(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._file = self._tmp_path.open("w", encoding="utf-8")
+        self._file.write("[")
+
+    def write(self, listing: Dict[str, Any]) -> None:
+        # Matches json.dump(..., indent=2): each item is indented one level.
+        # Encoded strings never contain raw newlines, so this is safe.
+        body = json.dumps(as_dict(listing), ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        self._file.write(("\n  " if self.count == 0 else ",\n  ") + body)
+        self.count += 1
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.write("\n]" if self.count else "]")
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
\ No newline at end of file
@@ -0,0 +1,40 @@
+import json
+from pathlib import Path
+from typing import Iterable, Dict, Any
+
+from scraper.listing import as_dict
+
+from .sink import ListingSink
+
+def export_jsonl(listings: Iterable[Dict[str, Any]], path: Path) -> None:
+    with JsonLinesSink(path) as sink:
+        sink.write_many(listings)
+
+class JsonLinesSink(ListingSink):
+    """
+    Writes one JSON object per line. With `append`, rows are added to an
+    existing file instead of replacing it and each row is flushed as it is
+    written, so a tailing consumer (e.g. of the monitor's events file) sees
+    every row at once and a crash loses none. Otherwise rows are buffered
+    and reach the file in blocks, or on `flush` and `close`.
+    """
+
+    def __init__(self, path: Path, append: bool = False) -> None:
+        super().__init__(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.append = append
+        self._file = path.open("a" if append else "w", encoding="utf-8")
+
+    def write(self, listing: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(as_dict(listing), ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+        if self.append:
+            self._file.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
\ No newline at end of file
@@ -0,0 +1,149 @@
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency, only needed for Parquet output
+    pa = None
+    pq = None
+
+from scraper.normalize import PRICE_FIELDS, price_fields, to_int
+
+from .sink import ListingSink
+
+def _schema() -> "pa.Schema":
+    return pa.schema(
+        [
+            ("id", pa.string()),
+            ("url", pa.string()),
+            ("title", pa.string()),
+            ("description", pa.string()),
+            ("price", pa.string()),
+            ("priceValue", pa.int64()),
+            ("priceCurrency", pa.string()),
+            ("pricePeriod", pa.string()),
+            ("pricePerM2", pa.float64()),
+            ("photos", pa.list_(pa.string())),
+            ("photoFiles", pa.list_(pa.string())),
+            ("location", pa.string()),
+            ("propertyType", pa.string()),
+            ("bedrooms", pa.int32()),
+            ("bathrooms", pa.int32()),
+            ("area", pa.int32()),
+            ("energyClass", pa.string()),
+            ("publisher", pa.string()),
+            ("contact", pa.string()),
+            ("views", pa.int64()),
+            ("datePosted", pa.string()),
+            ("apify_monitoring_status", pa.string()),
+            ("searchUrl", pa.string()),
+            ("contentHash", pa.string()),
+            ("changedFields", pa.list_(pa.string())),
+        ]
+    )
+
+# Listing fields copied into the schema's columns, by column type. The
+# PRICE_FIELDS columns are derived from "price" and "area".
+_STRING_COLUMNS = (
+    "id",
+    "url",
+    "title",
+    "description",
+    "price",
+    "location",
+    "propertyType",
+    "energyClass",
+    "publisher",
+    "contact",
+    "datePosted",
+    "apify_monitoring_status",
+    "searchUrl",
+    "contentHash",
+)
+_INT_COLUMNS = ("bedrooms", "bathrooms", "area", "views")
+_LIST_COLUMNS = ("photos", "photoFiles", "changedFields")
+
+def _str_or_none(value: Any) -> Any:
+    return None if value is None else str(value)
+
+def export_parquet(listings: Iterable[Dict[str, Any]], path: Path) -> None:
+    with ParquetSink(path) as sink:
+        sink.write_many(listings)
+
+class ParquetSink(ListingSink):
+    """
+    Writes listings to a Parquet file with a fixed, typed schema.
+
+    The raw `price` string is kept next to its parsed amount, currency,
+    period and amount per m² (see `scraper.normalize.price_fields`); counts
+    and area are integers and photos a list of strings. Rows are buffered column-wise
+    and flushed every `row_group_size` listings as one row group, so memory
+    stays bounded however many listings stream through. Like the JSON
+    output, the file only replaces `path` once the run completes.
+
+    Needs the optional `pyarrow` package.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        row_group_size: int = 50_000,
+        compression: str = "zstd",
+    ) -> None:
+        if pa is None:
+            raise ImportError("Parquet output requires the 'pyarrow' package")
+        super().__init__(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.schema = _schema()
+        self.row_group_size = max(1, row_group_size)
+        self._tmp_path = path.with_name(path.name + ".tmp")
+        self._writer = pq.ParquetWriter(
+            str(self._tmp_path), self.schema, compression=compression
+        )
+        self._columns: Dict[str, List[Any]] = {name: [] for name in self.schema.names}
+        self._buffered = 0
+
+    def write(self, listing: Dict[str, Any]) -> None:
+        columns = self._columns
+        price = price_fields(listing)
+        for name in PRICE_FIELDS:
+            columns[name].append(price[name])
+        for name in _INT_COLUMNS:
+            columns[name].append(to_int(listing.get(name)))
+        for name in _LIST_COLUMNS:
+            value = listing.get(name)
+            columns[name].append(
+                [_str_or_none(v) for v in value] if isinstance(value, (list, tuple)) else None
+            )
+        for name in _STRING_COLUMNS:
+            columns[name].append(_str_or_none(listing.get(name)))
+        self._buffered += 1
+        self.count += 1
+        if self._buffered >= self.row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffered:
+            return
+        table = pa.Table.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_table(table)
+        for values in self._columns.values():
+            values.clear()
+        self._buffered = 0
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._tmp_path.unlink(missing_ok=True)
\ No newline at end of file
@@ -0,0 +1,66 @@
+import importlib
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional, Tuple, Type
+
+from .sink import ListingSink
+
+class Exporter(NamedTuple):
+    # Shown in logs, e.g. "Saved Excel output to ..."
+    label: str
+    # "package.module:SinkClass", imported only when the format is used
+    target: str
+    # File suffix appended to the output prefix
+    suffix: str
+    # Sink keyword arguments read from the config, as (argument, config key)
+    options: Tuple[Tuple[str, str], ...] = ()
+
+# Output formats by the name used in `output_formats`. Exporter modules (and
+# their dependencies: openpyxl, pyarrow) are not imported until a run asks
+# for their format, so a JSON-only run or `--help` never pays for them.
+EXPORTERS: Dict[str, Exporter] = {
+    "json": Exporter("JSON", "outputs.exporter_json:JsonArraySink", ".json"),
+    "jsonl": Exporter("JSON Lines", "outputs.exporter_jsonl:JsonLinesSink", ".jsonl"),
+    "csv": Exporter("CSV", "outputs.exporter_csv:CsvSink", ".csv"),
+    "excel": Exporter("Excel", "outputs.exporter_excel:ExcelSink", ".xlsx"),
+    "parquet": Exporter(
+        "Parquet",
+        "outputs.exporter_parquet:ParquetSink",
+        ".parquet",
+        options=(("row_group_size", "parquet_row_group_size"),),
+    ),
+}
+
+def register_exporter(
+    name: str,
+    target: str,
+    suffix: str,
+    label: Optional[str] = None,
+    options: Tuple[Tuple[str, str], ...] = (),
+) -> None:
+    """
+    Make `name` usable in `output_formats`. `target` names a `ListingSink`
+    subclass as "module:Class"; it is constructed with the output path and
+    any `options` found in the config.
+    """
+    EXPORTERS[name] = Exporter(label or name, target, suffix, tuple(options))
+
+def get_exporter(name: str) -> Exporter:
+    exporter = EXPORTERS.get(name)
+    if exporter is None:
+        raise ValueError(
+            f"Unknown output format {name!r}; expected one of {sorted(EXPORTERS)}"
+        )
+    return exporter
+
+def load_sink_class(name: str) -> Type[ListingSink]:
+    module_name, _, class_name = get_exporter(name).target.partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+def open_sink(name: str, output_prefix: Path, config: Dict[str, Any]) -> ListingSink:
+    """Open the sink for format `name`, writing to `output_prefix` + its suffix."""
+    exporter = get_exporter(name)
+    sink_class = load_sink_class(name)
+    kwargs = {
+        argument: config[key] for argument, key in exporter.options if key in config
+    }
+    return sink_class(output_prefix.with_suffix(exporter.suffix), **kwargs)
\ No newline at end of file
@@ -0,0 +1,38 @@
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+class ListingSink:
+    """
+    Base class for exporters that receive listings one at a time while the
+    crawl is still running, instead of a complete list at the end.
+
+    Use as a context manager: the output is finalised by `close` when the
+    block exits normally and discarded (where possible) by `abort` when it
+    raises.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.count = 0
+
+    def write(self, listing: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def write_many(self, listings: Iterable[Dict[str, Any]]) -> None:
+        for listing in listings:
+            self.write(listing)
+
+    def close(self) -> None:
+        pass
+
+    def abort(self) -> None:
+        self.close()
+
+    def __enter__(self) -> "ListingSink":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
\ No newline at end of file
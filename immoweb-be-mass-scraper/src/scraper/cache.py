@@ -0,0 +1,328 @@
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Keys bound per query by `select_in_chunks`, well below SQLite's
+# bound-parameter limit
+SELECT_CHUNK_SIZE = 500
+
+def select_in_chunks(
+    conn: sqlite3.Connection,
+    sql: str,
+    keys: List[Any],
+    chunk_size: int = SELECT_CHUNK_SIZE,
+) -> Iterator[Tuple[Any, ...]]:
+    """
+    Rows of `sql` for all of `keys`, running it once per chunk of keys.
+    `sql` marks where the chunk's parameters go with "{placeholders}", as
+    in "SELECT ... WHERE id IN ({placeholders})".
+    """
+    for start in range(0, len(keys), chunk_size):
+        chunk = keys[start : start + chunk_size]
+        yield from conn.execute(sql.format(placeholders=", ".join("?" * len(chunk))), chunk)
+
+class CacheEntry(NamedTuple):
+    body: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+class DetailEntry(NamedTuple):
+    # Digest of the search card the details were fetched for
+    card_hash: Optional[str]
+    # None when the details were never fetched or the fetch failed
+    details: Optional[Dict[str, Any]]
+    fetched_at: float
+
+class PhotoEntry(NamedTuple):
+    # Content digest (SHA-256); None when the URL is known to be gone
+    digest: Optional[str]
+    # Path of the stored file, relative to the photo directory
+    path: Optional[str]
+    size: int
+    fetched_at: float
+
+class ResponseCache:
+    """
+    Persistent, size-bounded cache of search page responses, stored in a
+    single SQLite file and keyed by the exact (paged) URL that was fetched.
+
+    Bodies are kept zlib-compressed together with their ETag, Last-Modified
+    and fetch time. Entries younger than `ttl` seconds are served without
+    touching the network; older ones are revalidated with a conditional
+    request. When the compressed bodies exceed `max_bytes`, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        ttl: float = 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        # Lookups that found no entry or a stale one; those of the stale
+        # ones that the server confirmed with a 304 are also revalidations
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+        )
+        self._conn.commit()
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()
+        self._total_bytes: int = row[0]
+
+    def lookup(self, url: str) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        Return the cached entry for `url` (or None) and whether it is still
+        fresh enough to be used without revalidation.
+        """
+        row = self._conn.execute(
+            "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None, False
+        now = time.time()
+        self._conn.execute(
+            "UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url)
+        )
+        self._conn.commit()
+        entry = CacheEntry(
+            body=zlib.decompress(row[0]).decode("utf-8"),
+            etag=row[1],
+            last_modified=row[2],
+            fetched_at=row[3],
+        )
+        fresh = now - entry.fetched_at < self.ttl
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return entry, fresh
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers: Dict[str, str] = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidated(self, url: str, entry: CacheEntry) -> str:
+        """Record a 304 for `url`: the cached body is fresh again."""
+        self.revalidations += 1
+        now = time.time()
+        self._conn.execute(
+            "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+            (now, now, url),
+        )
+        self._conn.commit()
+        return entry.body
+
+    def store(
+        self,
+        url: str,
+        body: str,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        blob = zlib.compress(body.encode("utf-8"), 6)
+        if len(blob) > self.max_bytes:
+            return
+        now = time.time()
+        old = self._conn.execute(
+            "SELECT size FROM responses WHERE url = ?", (url,)
+        ).fetchone()
+        if old is not None:
+            self._total_bytes -= old[0]
+        self._conn.execute(
+            """
+            INSERT OR REPLACE INTO responses
+                (url, body, etag, last_modified, fetched_at, accessed_at, size)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            (url, blob, etag, last_modified, now, now, len(blob)),
+        )
+        self._total_bytes += len(blob)
+        if self._total_bytes > self.max_bytes:
+            self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        # Evict down to 90% of the budget so we don't evict on every store
+        target = int(self.max_bytes * 0.9)
+        rows = self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        )
+        doomed = []
+        for url, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((url,))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM responses WHERE url = ?", doomed)
+        self.evictions += len(doomed)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "bytes": self._total_bytes,
+        }
+
+    def close(self) -> None:
+        self._conn.close()
+
+class DetailCache:
+    """
+    Fields scraped from classified detail pages, stored in a single SQLite
+    file and keyed by listing id.
+
+    Each entry remembers the content digest of the search card it was
+    fetched for, so a listing whose card has not changed keeps its details
+    without another request. Entries younger than `ttl` seconds are reused
+    even when the card has changed.
+    """
+
+    def __init__(self, path: Path, *, ttl: float = 7 * 24 * 3600) -> None:
+        self.path = path
+        self.ttl = ttl
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS details (
+                id TEXT PRIMARY KEY,
+                card_hash TEXT,
+                data TEXT,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def lookup_many(self, ids: List[str]) -> Dict[str, DetailEntry]:
+        found: Dict[str, DetailEntry] = {}
+        for ident, card_hash, data, fetched_at in select_in_chunks(
+            self._conn,
+            "SELECT id, card_hash, data, fetched_at FROM details WHERE id IN ({placeholders})",
+            ids,
+        ):
+            found[ident] = DetailEntry(
+                card_hash, json.loads(data) if data is not None else None, fetched_at
+            )
+        return found
+
+    def is_fresh(self, entry: DetailEntry) -> bool:
+        return entry.details is not None and time.time() - entry.fetched_at < self.ttl
+
+    def store_many(self, entries: Iterable[Tuple[str, DetailEntry]]) -> None:
+        rows = [
+            (
+                ident,
+                entry.card_hash,
+                json.dumps(entry.details, ensure_ascii=False)
+                if entry.details is not None
+                else None,
+                entry.fetched_at,
+            )
+            for ident, entry in entries
+        ]
+        if not rows:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO details (id, card_hash, data, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+class PhotoIndex:
+    """
+    Which photo URLs have been downloaded and where their bytes are, stored
+    in a single SQLite file and keyed by URL.
+
+    Several URLs can point to the same stored file when they served the
+    same bytes. A URL that answered with a client error is recorded without
+    a file so that it is not requested again.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS photos (
+                url TEXT PRIMARY KEY,
+                digest TEXT,
+                path TEXT,
+                size INTEGER NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def lookup_many(self, urls: List[str]) -> Dict[str, PhotoEntry]:
+        found: Dict[str, PhotoEntry] = {}
+        for url, digest, path, size, fetched_at in select_in_chunks(
+            self._conn,
+            "SELECT url, digest, path, size, fetched_at FROM photos "
+            "WHERE url IN ({placeholders})",
+            urls,
+        ):
+            found[url] = PhotoEntry(digest, path, size, fetched_at)
+        return found
+
+    def store_many(self, entries: Iterable[Tuple[str, PhotoEntry]]) -> None:
+        rows = [(url, *entry) for url, entry in entries]
+        if not rows:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO photos (url, digest, path, size, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def close(self) -> None:
+        self._conn.close()
\ No newline at end of file
@@ -0,0 +1,108 @@
+import json
+import logging
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+from .listing import Listing, as_dict
+from .utils import get_logger
+
+class CrawlCheckpoint:
+    """
+    Append-only journal of the search pages a crawl has completed, one JSON
+    line per page: {"search": base URL, "page": n, "listings": [...]}.
+
+    Each page is appended and flushed as soon as it has been parsed, so an
+    interrupted run leaves every finished page on disk. Opening the journal
+    with `resume=True` indexes the existing journal by line offset; `page`
+    then reads back the recorded listings of a page (an empty list for a page
+    past the end of results), or returns None when the page still has to be
+    fetched. Only the index is kept in memory, however large the journal.
+    Failed fetches are never recorded, so a resumed crawl retries them.
+
+    A truncated last line, as left by a crash mid-write, is ignored.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        resume: bool = False,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.path = path
+        self.logger = logger or get_logger(self.__class__.__name__)
+        # (search URL, page) -> offset of its line in the journal
+        self._offsets: Dict[Tuple[str, int], int] = {}
+        self._reader: Optional[BinaryIO] = None
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if resume and path.exists():
+            self._load()
+        if resume:
+            if self._offsets:
+                self.logger.info(
+                    "Resuming from %s: %d page(s) of %d search URL(s) already done",
+                    path,
+                    len(self._offsets),
+                    len({search for search, _ in self._offsets}),
+                )
+            else:
+                self.logger.info("No checkpoint found at %s; starting from scratch", path)
+        # Without resume any earlier journal is stale and gets truncated
+        self._file = path.open("ab" if resume else "wb")
+
+    def _load(self) -> None:
+        self._reader = self.path.open("rb")
+        end = 0
+        while True:
+            offset = self._reader.tell()
+            line = self._reader.readline()
+            if not line.endswith(b"\n"):
+                # EOF, or a record cut short by a crash
+                break
+            end = self._reader.tell()
+            try:
+                record = json.loads(line)
+                key = (record["search"], int(record["page"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+            if isinstance(record.get("listings"), list):
+                self._offsets[key] = offset
+        if end < self.path.stat().st_size:
+            # Drop the partial line so new records start on a line of their own
+            with self.path.open("r+b") as f:
+                f.truncate(end)
+
+    def page(self, search_url: str, page: int) -> Optional[List[Listing]]:
+        offset = self._offsets.get((search_url, page))
+        if offset is None or self._reader is None:
+            return None
+        self._reader.seek(offset)
+        listings = json.loads(self._reader.readline())["listings"]
+        return [Listing.from_dict(item) for item in listings]
+
+    def record(
+        self, search_url: str, page: int, listings: List[Dict[str, Any]]
+    ) -> None:
+        if (search_url, page) in self._offsets:
+            return
+        record = {
+            "search": search_url,
+            "page": page,
+            "listings": [as_dict(item) for item in listings],
+        }
+        self._file.write(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+        self._file.write(b"\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+        if not self._file.closed:
+            self._file.close()
+
+    def discard(self) -> None:
+        """Close and delete the journal once the run has completed."""
+        self.close()
+        self.path.unlink(missing_ok=True)
\ No newline at end of file
@@ -1,12 +1,62 @@
 import asyncio
+import functools
 import logging
-from typing import List, Dict, Any, Optional
+import os
+import time
+from contextlib import nullcontext
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncIterator, Container, Iterator, List, Dict, Any, Optional, Set, Tuple
 
 import aiohttp
 
-from .parser import extract_listings_from_search_page
+from .cache import ResponseCache
+from .checkpoint import CrawlCheckpoint
+from .metrics import CARD_BUCKETS, PARSE_BUCKETS, MetricsRegistry
+from .parser import extract_listings_from_search_page, DEFAULT_PARSER_BACKEND
+from .profiling import profile_call
+from .throttle import AdaptiveRateLimiter
+from .transport import HttpTransport
 from .utils import fetch, build_paged_url, get_logger
 
+PARSE_EXECUTORS = ("inline", "thread", "process")
+
+def _parse_timed(
+    html: str, search_url: str, backend: str
+) -> Tuple[List[Dict[str, Any]], float]:
+    # Timed where the parse runs, so pool queueing is not counted
+    started = time.perf_counter()
+    listings = extract_listings_from_search_page(
+        html, search_url=search_url, backend=backend
+    )
+    return listings, time.perf_counter() - started
+
+class ListingDeduplicator:
+    """
+    Incremental form of the crawler's id/url deduplication: `add` returns
+    True the first time a listing is seen and False for any later listing
+    sharing its id or url. Listings with neither are always kept.
+    """
+
+    def __init__(self) -> None:
+        self.seen_ids = set()
+        self.seen_urls = set()
+
+    def add(self, item: Dict[str, Any]) -> bool:
+        ident = item.get("id")
+        url = item.get("url")
+        key = ident or url
+        if not key:
+            return True
+        if ident and ident in self.seen_ids:
+            return False
+        if url and url in self.seen_urls:
+            return False
+        if ident:
+            self.seen_ids.add(ident)
+        if url:
+            self.seen_urls.add(url)
+        return True
+
 class ImmowebCrawler:
     def __init__(
         self,
@@ -16,98 +66,344 @@ class ImmowebCrawler:
         request_timeout: int = 30,
         request_delay: float = 0.5,
         user_agent: str = "ImmowebMassScraper/1.0",
+        parser_backend: str = DEFAULT_PARSER_BACKEND,
+        parse_executor: str = "inline",
+        parse_workers: Optional[int] = None,
+        max_pending_parses: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        target_rps: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        adaptive_throttle: bool = True,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        prefetch_pages: int = 2,
+        known_ids: Optional[Container[str]] = None,
+        stop_after_known_pages: int = 1,
+        checkpoint: Optional[CrawlCheckpoint] = None,
+        metrics: Optional[MetricsRegistry] = None,
+        transport: Optional[HttpTransport] = None,
         logger: Optional[logging.Logger] = None,
     ) -> None:
+        if parse_executor not in PARSE_EXECUTORS:
+            raise ValueError(
+                f"Unknown parse executor {parse_executor!r}; expected one of {PARSE_EXECUTORS}"
+            )
         self.max_pages = max_pages
         self.concurrency = concurrency
         self.request_timeout = request_timeout
         self.request_delay = request_delay
         self.user_agent = user_agent
+        self.parser_backend = parser_backend
+        self.parse_executor = parse_executor
+        self.parse_workers = parse_workers or os.cpu_count() or 1
+        self.max_pending_parses = max_pending_parses or self.parse_workers * 2
+        self.cache = cache
+        # All requests go through one shared limiter. `concurrency` is where
+        # AIMD starts; without an explicit target_rps, the rate ceiling is the
+        # one concurrency and request_delay used to imply.
+        if rate_limiter is None:
+            if target_rps is None and request_delay > 0:
+                target_rps = concurrency / request_delay
+            rate_limiter = AdaptiveRateLimiter(
+                rate=target_rps,
+                concurrency=concurrency,
+                max_concurrency=max_concurrency or concurrency * 4,
+                adaptive=adaptive_throttle,
+            )
+        self.rate_limiter = rate_limiter
+        self.prefetch_pages = max(0, prefetch_pages)
+        # Incremental crawling: with `known_ids` set (keys as in delta mode,
+        # str(id or url)), a newest-first search stops after
+        # `stop_after_known_pages` consecutive pages of already known listings.
+        self.known_ids = known_ids
+        self.stop_after_known_pages = max(1, stop_after_known_pages)
+        # Searches the last iter_listings call stopped before their end
+        self.truncated_searches: Set[str] = set()
+        # Pages found in the checkpoint are replayed instead of fetched, and
+        # every newly parsed page is recorded in it.
+        self.checkpoint = checkpoint
+        # Request and parse metrics are recorded here when given
+        self.metrics = metrics
+        # Connection pool shared with the rest of the process (its
+        # User-Agent applies); without one, each crawl opens its own
+        self.transport = transport
         self.logger = logger or get_logger(self.__class__.__name__)
 
+    def _create_parse_executor(self) -> Optional[Executor]:
+        if self.parse_executor == "thread":
+            return ThreadPoolExecutor(
+                max_workers=self.parse_workers, thread_name_prefix="immoweb-parse"
+            )
+        if self.parse_executor == "process":
+            return ProcessPoolExecutor(max_workers=self.parse_workers)
+        return None
+
     async def crawl_search_urls(self, urls: List[str]) -> List[Dict[str, Any]]:
-        semaphore = asyncio.Semaphore(self.concurrency)
-        listings: List[Dict[str, Any]] = []
-
-        async with aiohttp.ClientSession(
-            headers={"User-Agent": self.user_agent}
-        ) as session:
-            tasks = [
-                self._crawl_single_search(
-                    session=session,
-                    base_url=url.strip(),
-                    semaphore=semaphore,
-                )
-                for url in urls
+        listings = [item async for item in self.iter_listings(urls)]
+        self.logger.info("After deduplication: %d listing(s)", len(listings))
+        return listings
+
+    async def iter_listings(self, urls: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Crawl the given search URLs and yield deduplicated listings as soon as
+        their page has been parsed.
+
+        Pages of every search go through one shared work queue served by a
+        pool of workers, so a deep search can use many connections at once.
+        Up to `prefetch_pages` pages beyond the last confirmed page of a
+        search are fetched speculatively. Listings are still released in
+        page order, and the first empty page ends the search exactly as in a
+        sequential crawl: pages after it are cancelled or discarded.
+
+        Parsed pages pass through a bounded queue, so a slow consumer holds
+        back the crawl instead of letting results accumulate in memory.
+        """
+        if self.max_pages < 1:
+            return
+
+        jobs: asyncio.Queue = asyncio.Queue()
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.rate_limiter.max_concurrency * 2)
+        dedup = ListingDeduplicator()
+
+        executor = self._create_parse_executor()
+        # Each worker holds at most one page, so the worker count bounds the
+        # HTML in memory. With a parse pool, extra workers keep requests
+        # going while others wait for their page to be parsed.
+        n_workers = self.rate_limiter.max_concurrency
+        if executor is not None:
+            n_workers += self.max_pending_parses
+            self.logger.info(
+                "Parsing pages in a %s pool with %d worker(s)",
+                self.parse_executor,
+                self.parse_workers,
+            )
+
+        self.truncated_searches.clear()
+        searches = [_SearchState(url.strip()) for url in urls]
+        workers: List[asyncio.Task] = []
+        transport = self.transport or HttpTransport(
+            user_agent=self.user_agent, metrics=self.metrics
+        )
+        try:
+            session = transport.session
+            workers = [
+                asyncio.create_task(self._page_worker(session, jobs, results, executor))
+                for _ in range(n_workers)
             ]
-            for coro in asyncio.as_completed(tasks):
-                result = await coro
-                listings.extend(result)
-
-        # Deduplicate by id or url
-        seen_ids = set()
-        seen_urls = set()
-        deduped: List[Dict[str, Any]] = []
-        for item in listings:
-            ident = item.get("id")
-            url = item.get("url")
-            key = ident or url
-            if not key:
-                deduped.append(item)
-                continue
-            if ident and ident in seen_ids:
-                continue
-            if url and url in seen_urls:
-                continue
-            if ident:
-                seen_ids.add(ident)
-            if url:
-                seen_urls.add(url)
-            deduped.append(item)
+            for search in searches:
+                self.logger.info("Crawling search URL: %s", search.base_url)
+                self._schedule(search, jobs)
 
-        self.logger.info("After deduplication: %d listing(s)", len(deduped))
-        return deduped
+            remaining = len(searches)
+            while remaining:
+                search, page, outcome = await results.get()
+                if isinstance(outcome, BaseException):
+                    raise outcome
+                if search.done:
+                    continue
+                if self.checkpoint is not None and outcome is not None:
+                    self.checkpoint.record(search.base_url, page, outcome)
+                search.results[page] = outcome
 
-    async def _crawl_single_search(
-        self,
-        session: aiohttp.ClientSession,
-        base_url: str,
-        semaphore: asyncio.Semaphore,
-    ) -> List[Dict[str, Any]]:
-        listings: List[Dict[str, Any]] = []
-        self.logger.info("Crawling search URL: %s", base_url)
-
-        for page in range(1, self.max_pages + 1):
-            page_url = build_paged_url(base_url, page)
-            async with semaphore:
-                html = await fetch(
-                    session,
-                    page_url,
-                    timeout=self.request_timeout,
-                    logger=self.logger,
-                )
-            if not html:
+                for page_listings in self._release_pages(search):
+                    for item in page_listings:
+                        if dedup.add(item):
+                            yield item
+
+                if search.done:
+                    remaining -= 1
+                else:
+                    self._schedule(search, jobs)
+        finally:
+            for task in workers:
+                task.cancel()
+            if workers:
+                await asyncio.gather(*workers, return_exceptions=True)
+            if transport is not self.transport:
+                await transport.close()
+            if executor is not None:
+                executor.shutdown(wait=True)
+
+    def _schedule(self, search: "_SearchState", jobs: asyncio.Queue) -> None:
+        last = min(self.max_pages, search.next_emit + self.prefetch_pages)
+        while search.next_page <= last:
+            jobs.put_nowait((search, search.next_page))
+            search.next_page += 1
+
+    def _release_pages(self, search: "_SearchState") -> Iterator[List[Dict[str, Any]]]:
+        """
+        Hand out the pages of `search` that are now contiguous from the last
+        one released, finishing the search at the first empty page or at
+        max_pages.
+        """
+        while search.next_emit in search.results:
+            page = search.next_emit
+            page_listings = search.results.pop(page)
+            page_url = build_paged_url(search.base_url, page)
+            if page_listings is None:
                 self.logger.warning(
                     "Empty response for %s; stopping pagination for this search URL",
                     page_url,
                 )
-                break
-
-            page_listings = extract_listings_from_search_page(html, search_url=base_url)
+                # Listings on the pages not crawled are not gone
+                self.truncated_searches.add(search.base_url)
+                self._finish(search)
+                return
             self.logger.info(
                 "Page %s for %s returned %d listing(s)",
                 page,
-                base_url,
+                search.base_url,
                 len(page_listings),
             )
-
             if not page_listings:
                 # Assume we've reached the end of results
-                break
+                self._finish(search)
+                return
+            search.next_emit += 1
+            yield page_listings
+            if search.next_emit > self.max_pages:
+                self._finish(search)
+                return
+            if self.known_ids is not None and self._all_known(page_listings):
+                search.known_streak += 1
+                if search.known_streak >= self.stop_after_known_pages:
+                    self.logger.info(
+                        "Only known listings on the last %d page(s) of %s; "
+                        "stopping incremental crawl after page %s",
+                        search.known_streak,
+                        search.base_url,
+                        page,
+                    )
+                    self.truncated_searches.add(search.base_url)
+                    self._finish(search)
+                    return
+            else:
+                search.known_streak = 0
+
+    def _all_known(self, page_listings: List[Dict[str, Any]]) -> bool:
+        for item in page_listings:
+            ident = item.get("id") or item.get("url")
+            if not ident or str(ident) not in self.known_ids:
+                return False
+        return True
+
+    def _finish(self, search: "_SearchState") -> None:
+        search.done = True
+        search.results.clear()
+        # Speculative requests for pages past the end are no longer needed
+        for task in search.in_flight.values():
+            task.cancel()
+
+    async def _page_worker(
+        self,
+        session: aiohttp.ClientSession,
+        jobs: asyncio.Queue,
+        results: asyncio.Queue,
+        executor: Optional[Executor],
+    ) -> None:
+        while True:
+            search, page = await jobs.get()
+            if search.done:
+                continue
+            if self.checkpoint is not None:
+                done = self.checkpoint.page(search.base_url, page)
+                if done is not None:
+                    if self.metrics is not None:
+                        self.metrics.counter(
+                            "checkpoint_pages_replayed_total", "Pages replayed from the checkpoint"
+                        ).inc()
+                    await results.put((search, page, done))
+                    continue
+            task = asyncio.create_task(
+                self._fetch_page(session, search.base_url, page, executor)
+            )
+            search.in_flight[page] = task
+            try:
+                # wait() leaves `task` alone if only it gets cancelled, which
+                # is how _finish drops a speculative page.
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            finally:
+                search.in_flight.pop(page, None)
+            if task.cancelled():
+                continue
+            exc = task.exception()
+            await results.put((search, page, exc if exc is not None else task.result()))
+
+    async def _fetch_page(
+        self,
+        session: aiohttp.ClientSession,
+        base_url: str,
+        page: int,
+        executor: Optional[Executor],
+    ) -> Optional[List[Dict[str, Any]]]:
+        html = await fetch(
+            session,
+            build_paged_url(base_url, page),
+            timeout=self.request_timeout,
+            logger=self.logger,
+            cache=self.cache,
+            limiter=self.rate_limiter,
+            metrics=self.metrics,
+        )
+        if not html:
+            return None
+        return await self._parse_page(html, base_url, executor)
+
+    async def _parse_page(
+        self,
+        html: str,
+        base_url: str,
+        executor: Optional[Executor],
+    ) -> List[Dict[str, Any]]:
+        metrics = self.metrics
+        if executor is None:
+            with metrics.stage("parse") if metrics is not None else nullcontext():
+                listings, seconds = _parse_timed(html, base_url, self.parser_backend)
+        else:
+            loop = asyncio.get_running_loop()
+            parse = functools.partial(_parse_timed, html, base_url, self.parser_backend)
+            profiler = metrics.profiler if metrics is not None else None
+            if profiler is not None and profiler.profiles_workers:
+                # The main process profiler cannot see into the pool
+                (listings, seconds), stats = await loop.run_in_executor(
+                    executor, functools.partial(profile_call, parse)
+                )
+                profiler.add_worker_stats("parse", stats)
+            else:
+                listings, seconds = await loop.run_in_executor(executor, parse)
+        if metrics is not None:
+            metrics.histogram(
+                "parse_duration_seconds", "Time to parse one search page", PARSE_BUCKETS
+            ).observe(seconds)
+            metrics.histogram(
+                "parse_cards", "Listing cards found per search page", CARD_BUCKETS
+            ).observe(len(listings))
+        return listings
 
-            listings.extend(page_listings)
+class _SearchState:
+    """Pagination bookkeeping for one search URL inside iter_listings."""
 
-            # Polite delay between page requests to the same search
-            await asyncio.sleep(self.request_delay)
+    __slots__ = (
+        "base_url",
+        "next_page",
+        "next_emit",
+        "results",
+        "in_flight",
+        "known_streak",
+        "done",
+    )
 
-        return listings
\ No newline at end of file
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+        # Next page to put on the work queue
+        self.next_page = 1
+        # Next page whose listings may be released, in order
+        self.next_emit = 1
+        # Parsed pages waiting for earlier ones; None marks a failed fetch
+        self.results: Dict[int, Optional[List[Dict[str, Any]]]] = {}
+        self.in_flight: Dict[int, asyncio.Task] = {}
+        # Consecutive released pages holding only known listings
+        self.known_streak = 0
+        self.done = False
\ No newline at end of file
@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from typing import Any, Container, Dict, List, Optional, Tuple
+
+from .cache import DetailCache, DetailEntry
+from .metrics import MetricsRegistry
+from .parser import extract_listing_details
+from .throttle import AdaptiveRateLimiter
+from .transport import HttpTransport
+from .utils import CONTENT_FIELDS, fetch, get_logger, listing_digest
+
+# Listing fields filled in from detail pages; search cards rarely have them
+DETAIL_FIELDS = ("views", "contact", "datePosted", "publisher")
+
+class DetailEnricher:
+    """
+    Fills in the fields only classified detail pages carry (`DETAIL_FIELDS`)
+    for a stream of crawled listings, fetching as few detail pages as
+    possible.
+
+    Details are cached by listing id in a `DetailCache` together with the
+    digest of the search card they were fetched for. A listing is only
+    fetched when it is new (not among `known_keys`, the delta state's keys,
+    and not cached) or its card changed since its details were fetched and
+    the cached ones are older than the cache's TTL; every other listing gets
+    its cached details, or none, without a request. Listings that delta
+    already knew before enrichment was turned on are recorded without being
+    fetched and get their details the next time they change.
+
+    Detail requests have their own rate limiter, so they neither eat into
+    nor wait behind the search crawl's concurrency. Fields already set on a
+    listing are never overwritten, and the content digest is recomputed
+    whenever a content field is filled in.
+
+    Requests go through `transport`, normally the pool shared with the
+    crawl; without one the enricher opens its own. `close` it when done.
+    """
+
+    def __init__(
+        self,
+        cache: DetailCache,
+        *,
+        concurrency: int = 4,
+        target_rps: Optional[float] = None,
+        adaptive_throttle: bool = True,
+        request_timeout: int = 30,
+        user_agent: str = "ImmowebMassScraper/1.0",
+        metrics: Optional[MetricsRegistry] = None,
+        transport: Optional[HttpTransport] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.cache = cache
+        self.request_timeout = request_timeout
+        self.user_agent = user_agent
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=target_rps,
+            concurrency=concurrency,
+            max_concurrency=concurrency,
+            adaptive=adaptive_throttle,
+        )
+        self.metrics = metrics
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.fetched = 0
+        self.cached = 0
+        self.failed = 0
+        self._owns_transport = transport is None
+        self.transport = transport or HttpTransport(user_agent=user_agent, metrics=metrics)
+
+    async def enrich_batch(
+        self,
+        items: List[Dict[str, Any]],
+        known_keys: Optional[Container[str]] = None,
+    ) -> None:
+        """Enrich `items` in place, before delta annotation."""
+        idents = list({str(item["id"]) for item in items if item.get("id")})
+        entries = self.cache.lookup_many(idents) if idents else {}
+        now = time.time()
+        updates: List[Tuple[str, DetailEntry]] = []
+        pending: List[Tuple[str, Dict[str, Any], str, Optional[DetailEntry]]] = []
+        cached_before = self.cached
+
+        for item in items:
+            if not item.get("id") or not item.get("url"):
+                continue
+            ident = str(item["id"])
+            card_hash = item.get("contentHash") or listing_digest(item)
+            entry = entries.get(ident)
+            if entry is None:
+                if known_keys is not None and ident in known_keys:
+                    # Seen by delta before details were collected
+                    updates.append((ident, DetailEntry(card_hash, None, 0.0)))
+                    continue
+            elif entry.card_hash == card_hash or self.cache.is_fresh(entry):
+                if entry.details is not None:
+                    self._apply(item, entry.details)
+                    self.cached += 1
+                    if entry.card_hash != card_hash:
+                        updates.append((ident, entry._replace(card_hash=card_hash)))
+                    continue
+                if entry.card_hash == card_hash:
+                    continue
+            pending.append((ident, item, card_hash, entry))
+
+        if self.metrics is not None and self.cached > cached_before:
+            self.metrics.counter(
+                "detail_cache_hits_total", "Listings enriched from cached details"
+            ).inc(self.cached - cached_before)
+        if pending:
+            results = await asyncio.gather(
+                *(self._fetch_details(item["url"]) for _, item, _, _ in pending)
+            )
+            for (ident, item, card_hash, entry), details in zip(pending, results):
+                if details:
+                    self._apply(item, details)
+                    updates.append((ident, DetailEntry(card_hash, details, now)))
+                    continue
+                if entry is None:
+                    # Not marked as seen, so the next run tries again
+                    updates.append((ident, DetailEntry(None, None, now)))
+                elif entry.details is not None:
+                    # Stale details beat none
+                    self._apply(item, entry.details)
+        self.cache.store_many(updates)
+
+    async def _fetch_details(self, url: str) -> Optional[Dict[str, Any]]:
+        html = await fetch(
+            self.transport.session,
+            url,
+            timeout=self.request_timeout,
+            logger=self.logger,
+            limiter=self.rate_limiter,
+        )
+        details = extract_listing_details(html) if html else None
+        if details:
+            self.fetched += 1
+            result = "fetched"
+        else:
+            self.failed += 1
+            result = "failed"
+        if self.metrics is not None:
+            self.metrics.counter(
+                "detail_pages_total", "Detail pages requested for enrichment"
+            ).inc(result=result)
+        return details
+
+    def _apply(self, item: Dict[str, Any], details: Dict[str, Any]) -> None:
+        content_changed = False
+        for field in DETAIL_FIELDS:
+            value = details.get(field)
+            if value is not None and item.get(field) is None:
+                item[field] = value
+                content_changed = content_changed or field in CONTENT_FIELDS
+        if content_changed:
+            item["contentHash"] = listing_digest(item)
+
+    def stats(self) -> Dict[str, int]:
+        return {"fetched": self.fetched, "cached": self.cached, "failed": self.failed}
+
+    async def close(self) -> None:
+        if self._owns_transport:
+            await self.transport.close()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import sys
+from typing import Any, Dict, Iterator, Mapping, Optional, Tuple
+
+from .schema import LISTING_FIELDS
+
+_FIELD_SET = frozenset(LISTING_FIELDS)
+
+# Low-cardinality fields repeated across many listings; interning makes all
+# listings share one copy of each distinct value
+INTERNED_FIELDS = (
+    "location",
+    "propertyType",
+    "energyClass",
+    "publisher",
+    "apify_monitoring_status",
+    "searchUrl",
+)
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if type(value) is str else value
+
+class Listing:
+    """
+    One scraped listing, stored in slots instead of a per-listing dict.
+
+    Supports the mapping operations the pipeline uses on listings (`get`,
+    `[]`, `in`, `keys`, `items`), so code written against listing dicts
+    keeps working, and converts to a plain dict with `to_dict` only where
+    one is needed (JSON, SQLite). Values of `INTERNED_FIELDS` are interned.
+    Keys outside the declared schema (e.g. from an older snapshot) are kept
+    in a small side dict so nothing is lost on a round trip.
+    """
+
+    __slots__ = LISTING_FIELDS + ("_extra",)
+
+    def __init__(self, **fields: Any) -> None:
+        for name in LISTING_FIELDS:
+            setattr(self, name, fields.pop(name, None))
+        for name in INTERNED_FIELDS:
+            setattr(self, name, _intern(getattr(self, name)))
+        self._extra: Optional[Dict[str, Any]] = fields or None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "Listing":
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in LISTING_FIELDS}
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def copy(self) -> "Listing":
+        clone = Listing.__new__(Listing)
+        clone.__setstate__(self.__getstate__())
+        if clone._extra is not None:
+            clone._extra = dict(clone._extra)
+        return clone
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __contains__(self, key: object) -> bool:
+        return key in _FIELD_SET or (self._extra is not None and key in self._extra)
+
+    def keys(self) -> Tuple[str, ...]:
+        if self._extra:
+            return LISTING_FIELDS + tuple(self._extra)
+        return LISTING_FIELDS
+
+    def items(self) -> Iterator[Tuple[str, Any]]:
+        for key in self.keys():
+            yield key, self[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Listing):
+            return self.__getstate__() == other.__getstate__()
+        if isinstance(other, Mapping):
+            return self.to_dict() == dict(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Listing({self.to_dict()!r})"
+
+    # Compact pickling for process-pool parsing: a tuple of values
+    def __getstate__(self) -> Tuple[Any, ...]:
+        return tuple(getattr(self, name) for name in LISTING_FIELDS) + (self._extra,)
+
+    def __setstate__(self, state: Tuple[Any, ...]) -> None:
+        for name, value in zip(LISTING_FIELDS, state):
+            setattr(self, name, value)
+        self._extra = state[-1]
+        for name in INTERNED_FIELDS:
+            setattr(self, name, _intern(getattr(self, name)))
+
+def as_dict(item: Mapping[str, Any]) -> Dict[str, Any]:
+    """Plain dict for a listing, for exporters that serialise whole records."""
+    if isinstance(item, Listing):
+        return item.to_dict()
+    return item
\ No newline at end of file
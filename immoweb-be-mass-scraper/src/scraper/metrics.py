@@ -0,0 +1,287 @@
+import os
+import time
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+if TYPE_CHECKING:
+    from aiohttp import web
+
+# Label values of one sample, as sorted (name, value) pairs
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Request latencies, in seconds
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Per-page parse times, in seconds
+PARSE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Listing cards found on a search page
+CARD_BUCKETS = (0, 1, 5, 10, 20, 30, 40, 60)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: object) -> None:
+        key = _label_key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self.values.get(_label_key(labels), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self.values.items()):
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        self.values[_label_key(labels)] = value
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: bucket counts (non-cumulative), sum, count
+        self.values: Dict[LabelKey, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = _label_key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            entry = self.values[key] = ([0] * (len(self.buckets) + 1), [0.0, 0.0])
+        counts, totals = entry
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        else:
+            counts[-1] += 1
+        totals[0] += value
+        totals[1] += 1
+
+    def count(self, **labels: object) -> int:
+        entry = self.values.get(_label_key(labels))
+        return int(entry[1][1]) if entry else 0
+
+    def total(self, **labels: object) -> float:
+        entry = self.values.get(_label_key(labels))
+        return entry[1][0] if entry else 0.0
+
+    def samples(self) -> Iterator[str]:
+        for key, (counts, (total, count)) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                labels = _format_labels(key, ("le", _format_value(bound)))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(key)} {_format_value(count)}"
+
+class _StageTimer:
+    __slots__ = ("registry", "name")
+
+    def __init__(self, registry: "MetricsRegistry", name: str) -> None:
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.registry._enter_stage(self.name)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.registry._exit_stage()
+
+class MetricsRegistry:
+    """
+    In-process metrics for one scraper process, rendered in the Prometheus
+    text exposition format.
+
+    Components that are handed a registry record into named counters,
+    gauges and histograms (created on first use, so every call site can ask
+    for its metric by name). Wall time spent in each pipeline stage (crawl,
+    parse, delta, each export format, ...) is accumulated separately with
+    `stage` and `timed` and summarised by `stage_summary` at the end of a
+    run; it is also exposed as the `<namespace>_stage_seconds_total` counter.
+
+    Stages nest: time spent in an inner stage (e.g. parsing a page while
+    the main loop waits on the crawl) counts for the inner stage only, so
+    stage times add up to the time spent inside any stage. A `profiler`,
+    when set, is told about every stage switch.
+    """
+
+    def __init__(self, namespace: str = "immoweb") -> None:
+        self.namespace = namespace
+        self.profiler = None
+        self._metrics: Dict[str, object] = {}
+        self._stages: Dict[str, float] = {}
+        # Open stages, innermost last, with the time each last resumed
+        self._stack: List[List] = []
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get(name, lambda full: Counter(full, help_text))
+
+    def gauge(self, name: str, help_text: str = "") -> Gauge:
+        return self._get(name, lambda full: Gauge(full, help_text))
+
+    def histogram(
+        self, name: str, help_text: str = "", buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._get(name, lambda full: Histogram(full, help_text, buckets))
+
+    def _get(self, name: str, factory):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = factory(f"{self.namespace}_{name}")
+        return metric
+
+    def stage(self, name: str) -> _StageTimer:
+        """Context manager timing the enclosed block as stage `name`."""
+        return _StageTimer(self, name)
+
+    def current_stage(self) -> Optional[str]:
+        # Also read from the sampling profiler's thread, hence no emptiness
+        # check ahead of the lookup
+        try:
+            return self._stack[-1][0]
+        except IndexError:
+            return None
+
+    def _enter_stage(self, name: str) -> None:
+        now = time.perf_counter()
+        stack = self._stack
+        if stack:
+            outer = stack[-1]
+            self._stages[outer[0]] = self._stages.get(outer[0], 0.0) + now - outer[1]
+        stack.append([name, now])
+        if self.profiler is not None:
+            self.profiler.switch(name)
+
+    def _exit_stage(self) -> None:
+        now = time.perf_counter()
+        stack = self._stack
+        name, resumed = stack.pop()
+        self._stages[name] = self._stages.get(name, 0.0) + now - resumed
+        if stack:
+            stack[-1][1] = now
+        if self.profiler is not None:
+            self.profiler.switch(self.current_stage())
+
+    def timed(self, iterable: Iterable, stage: str) -> Iterator:
+        """Yield from `iterable`, counting the time spent producing each item."""
+        iterator = iter(iterable)
+        while True:
+            with self.stage(stage):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    async def timed_async(self, iterable: AsyncIterable, stage: str) -> AsyncIterator:
+        """
+        Async counterpart of `timed`. Other tasks run while the next item is
+        awaited; their own stages are nested inside this one.
+        """
+        iterator = iterable.__aiter__()
+        while True:
+            with self.stage(stage):
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+            yield item
+
+    def stage_summary(self) -> List[Tuple[str, float]]:
+        """(stage, seconds) pairs in the order the stages first ran."""
+        return list(self._stages.items())
+
+    def render(self) -> str:
+        lines: List[str] = []
+        metrics = list(self._metrics.values())
+        if self._stages:
+            stages = Counter(
+                f"{self.namespace}_stage_seconds_total",
+                "Wall time spent in each pipeline stage",
+            )
+            for stage, seconds in self._stages.items():
+                stages.inc(seconds, stage=stage)
+            metrics.append(stages)
+        for metric in metrics:
+            if not metric.values:
+                continue
+            if metric.help_text:
+                lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: Path) -> None:
+        """
+        Write the current metrics to `path` (e.g. for node_exporter's textfile
+        collector), replacing it atomically.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(self.render(), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+async def start_metrics_server(
+    registry: MetricsRegistry, host: str = "127.0.0.1", port: int = 9108
+) -> "web.AppRunner":
+    """
+    Serve `registry` at http://host:port/metrics until the returned runner
+    is cleaned up.
+    """
+    # The server half of aiohttp is only loaded when metrics are served
+    from aiohttp import web
+
+    async def handle(request: "web.Request") -> "web.Response":
+        return web.Response(
+            body=registry.render().encode("utf-8"),
+            headers={"Content-Type": PROMETHEUS_CONTENT_TYPE},
+        )
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
\ No newline at end of file
@@ -0,0 +1,185 @@
+import functools
+import re
+from typing import Any, Dict, MutableMapping, NamedTuple, Optional, Sequence
+
+from .metrics import MetricsRegistry
+from .utils import listing_digest
+
+# Currency markers as they appear in scraped prices, checked in order
+_CURRENCIES = (
+    ("€", "EUR"),
+    ("EUR", "EUR"),
+    ("$", "USD"),
+    ("USD", "USD"),
+    ("£", "GBP"),
+    ("GBP", "GBP"),
+)
+
+# Rent periods in English, French and Dutch
+_PERIODS = (
+    ("month", ("month", "mois", "maand", "mnd")),
+    ("week", ("week", "semaine")),
+    ("year", ("year", "/an", "annee", "année", "jaar")),
+    ("day", ("day", "night", "jour", "nuit", "dag", "nacht")),
+)
+
+# First number in the text, with thousands/decimal separators and the
+# (narrow) no-break spaces Immoweb uses as thousands separators
+_NUMBER_RE = re.compile(r"\d[\d.,\u00a0\u202f ]*")
+
+# Plausible bounds (inclusive) for counts and the living area in m². Values
+# outside them are extraction errors, e.g. a postcode or a plot size read as
+# the living area, and are dropped by `normalize_batch`.
+VALID_RANGES: Dict[str, Any] = {
+    "bedrooms": (0, 50),
+    "bathrooms": (0, 50),
+    "area": (5, 100_000),
+}
+
+# Belgian postcodes are four digits, 1000-9999
+_POSTCODE_RE = re.compile(r"\b([1-9]\d{3})\b")
+
+# Listing fields `normalize_batch` derives from "price" and "area"
+PRICE_FIELDS = ("priceValue", "priceCurrency", "pricePeriod", "pricePerM2")
+
+class PriceParts(NamedTuple):
+    value: Optional[int]
+    currency: Optional[str]
+    period: Optional[str]
+
+def _parse_number(raw: str) -> Optional[int]:
+    digits = re.sub(r"[\u00a0\u202f ]", "", raw).rstrip(".,")
+    if not digits:
+        return None
+    last_comma = digits.rfind(",")
+    last_dot = digits.rfind(".")
+    if last_comma != -1 and last_dot != -1:
+        # Both present: whichever comes last is the decimal separator
+        decimal = "," if last_comma > last_dot else "."
+    elif last_comma != -1 or last_dot != -1:
+        sep = "," if last_comma != -1 else "."
+        groups = digits.split(sep)
+        # "1,200" / "350.000" group thousands; "12,5" is a decimal
+        decimal = None if all(len(g) == 3 for g in groups[1:]) else sep
+    else:
+        decimal = None
+    if decimal is None:
+        number = digits.replace(",", "").replace(".", "")
+    else:
+        whole, _, fraction = digits.rpartition(decimal)
+        number = whole.replace(",", "").replace(".", "") + "." + fraction
+    try:
+        return int(round(float(number)))
+    except ValueError:
+        return None
+
+def parse_price(text: Optional[str]) -> PriceParts:
+    """
+    Split a scraped price such as "€1,200/month" or "€ 350.000" into an
+    integer amount, an ISO currency code and a rent period ("month", "week",
+    "year", "day"; None for sale prices). Parts that cannot be recognised
+    are None. Only the first amount of a range is kept.
+    """
+    if not text:
+        return PriceParts(None, None, None)
+    match = _NUMBER_RE.search(text)
+    value = _parse_number(match.group()) if match else None
+
+    currency = None
+    for marker, code in _CURRENCIES:
+        if marker in text:
+            currency = code
+            break
+
+    period = None
+    lowered = text.lower()
+    for name, markers in _PERIODS:
+        if any(marker in lowered for marker in markers):
+            period = name
+            break
+    return PriceParts(value, currency, period)
+
+# Asking prices repeat heavily across listings (round amounts, the same
+# project prices on every unit), so each distinct text is only parsed once
+_parse_price_cached = functools.lru_cache(maxsize=65536)(parse_price)
+
+_NO_PRICE = PriceParts(None, None, None)
+
+def _as_int(value: Any) -> Optional[int]:
+    # to_int, without the call for values that already are ints
+    return value if type(value) is int else to_int(value)
+
+def price_fields(listing: MutableMapping[str, Any]) -> Dict[str, Any]:
+    """
+    `PRICE_FIELDS` of one listing: the parts of its `price` and the amount
+    per m² of its `area`, rounded to cents (None without both).
+    """
+    text = listing.get("price")
+    value, currency, period = _parse_price_cached(text) if type(text) is str else _NO_PRICE
+    area = _as_int(listing.get("area"))
+    return {
+        "priceValue": value,
+        "priceCurrency": currency,
+        "pricePeriod": period,
+        "pricePerM2": round(value / area, 2) if value is not None and area else None,
+    }
+
+def normalize_batch(
+    items: Sequence[MutableMapping[str, Any]],
+    metrics: Optional[MetricsRegistry] = None,
+) -> Dict[str, int]:
+    """
+    Normalize a batch of listings in place, before delta annotation.
+
+    Counts and areas outside `VALID_RANGES` are set to None, and the
+    content digest of a listing that lost one is recomputed; the numeric
+    `PRICE_FIELDS` are then filled in (see `price_fields`). Returns how many
+    values were dropped, by field, also counted in `metrics` as
+    `listing_values_dropped_total`.
+
+    This runs on every listing of every run, so the range checks skip
+    coercion for ints and price texts hit the parse cache.
+    """
+    ranges = [(field, low, high) for field, (low, high) in VALID_RANGES.items()]
+    dropped = dict.fromkeys(VALID_RANGES, 0)
+    for item in items:
+        get = item.get
+        invalid = False
+        for field, low, high in ranges:
+            value = _as_int(get(field))
+            if value is not None and not low <= value <= high:
+                item[field] = None
+                dropped[field] += 1
+                invalid = True
+        if invalid:
+            item["contentHash"] = listing_digest(item)
+        for name, value in price_fields(item).items():
+            item[name] = value
+    if metrics is not None:
+        counter = metrics.counter(
+            "listing_values_dropped_total", "Out-of-range counts and areas dropped"
+        )
+        for field, count in dropped.items():
+            if count:
+                counter.inc(count, field=field)
+    return dropped
+
+def extract_postcode(location: Any) -> Optional[int]:
+    """The postcode in a scraped location such as "1050 Ixelles", or None."""
+    if not isinstance(location, str):
+        return None
+    match = _POSTCODE_RE.search(location)
+    return int(match.group(1)) if match else None
+
+def to_int(value: Any) -> Optional[int]:
+    """Coerce a scraped count or area to int, or None if it is not one."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else None
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        return None
\ No newline at end of file
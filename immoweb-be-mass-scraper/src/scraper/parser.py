@@ -1,54 +1,142 @@
-from typing import List, Dict, Any, Optional
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin
+import html as html_lib
+import json
+import re
+import unicodedata
+from typing import TYPE_CHECKING, List, Dict, Any, Optional
+from urllib.parse import urljoin, urlparse
 
-from .utils import extract_listing_id_from_url
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup, Tag
+
+from .listing import Listing
+from .utils import extract_listing_id_from_url, listing_digest
 
 IMMOWEB_BASE_URL = "https://www.immoweb.be"
 
+# Tree builders BeautifulSoup can sit on top of. "html.parser" is pure Python
+# and always available; "lxml" and "html5lib" need their packages installed.
+# bs4 and the builder are only imported once a page needs the DOM fallback.
+PARSER_BACKENDS: Dict[str, str] = {
+    "html.parser": "html.parser",
+    "lxml": "lxml",
+    "html5lib": "html5lib",
+}
+DEFAULT_PARSER_BACKEND = "html.parser"
+
+# Immoweb's search page hands its results to a front-end component as JSON,
+# either HTML-escaped in a `:results` attribute or in a JSON script tag
+_RESULTS_ATTR_RE = re.compile(r"""\s:results=(?:"([^"]*)"|'([^']*)')""")
+_JSON_SCRIPT_RE = re.compile(
+    r"""<script[^>]*type=["']application/json["'][^>]*>(.*?)</script>""",
+    re.DOTALL | re.IGNORECASE,
+)
+_SITE_LANGUAGES = ("en", "fr", "nl", "de")
+_ISO_DATE_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+# Classified detail pages assign their data to a global before rendering
+_CLASSIFIED_RE = re.compile(r"window\.classified\s*=\s*")
+_TEL_RE = re.compile(r"""href=["']tel:([^"']+)["']""")
+_MAILTO_RE = re.compile(r"""href=["']mailto:([^"'?]+)""")
+
+class _CardIndex:
+    """
+    Everything the field extractors need from a listing card, collected in a
+    single walk over its subtree.
+
+    Each lookup mirrors what the equivalent `card.find(...)` call would have
+    returned (first match in document order), so the extracted fields are
+    identical to walking the card once per field.
+    """
+
+    __slots__ = (
+        "by_class",
+        "by_tag",
+        "anchors",
+        "images",
+        "strings",
+        "text",
+        "text_lower",
+    )
+
+    def __init__(self, card: "Tag") -> None:
+        from bs4 import NavigableString, Tag
+
+        self.by_class: Dict[str, Tag] = {}
+        self.by_tag: Dict[str, Tag] = {}
+        self.anchors: List[Tag] = []
+        self.images: List[Tag] = []
+        self.strings: List[str] = []
+
+        for node in card.descendants:
+            if isinstance(node, NavigableString):
+                self.strings.append(node)
+                continue
+            if not isinstance(node, Tag):
+                continue
+            name = node.name
+            if name not in self.by_tag:
+                self.by_tag[name] = node
+            if name == "a" and node.get("href") is not None:
+                self.anchors.append(node)
+            elif name == "img":
+                self.images.append(node)
+            classes = node.get("class")
+            if classes:
+                if isinstance(classes, str):
+                    classes = classes.split()
+                for cls in classes:
+                    if cls not in self.by_class:
+                        self.by_class[cls] = node
+
+        self.text: str = card.get_text(" ", strip=True)
+        self.text_lower: str = self.text.lower()
+
+    def first_with_class(self, classes: List[str]) -> Optional["Tag"]:
+        for cls in classes:
+            el = self.by_class.get(cls)
+            if el is not None:
+                return el
+        return None
+
 def _get_text_or_none(element) -> Optional[str]:
     if not element:
         return None
     text = element.get_text(strip=True)
     return text or None
 
-def _find_price(card) -> Optional[str]:
-    for cls in ["price", "result-xl-price", "classified__price"]:
-        el = card.find(class_=lambda c: c and cls in c.split())
-        if el:
-            return _get_text_or_none(el)
+def _find_price(index: _CardIndex) -> Optional[str]:
+    el = index.first_with_class(["price", "result-xl-price", "classified__price"])
+    if el:
+        return _get_text_or_none(el)
     # Fallback: any element that looks like a price
-    candidates = card.find_all(text=True)
-    for text in candidates:
+    for text in index.strings:
         t = text.strip()
         if t.startswith("€") or "EUR" in t:
             return t
     return None
 
-def _find_location(card) -> Optional[str]:
-    for cls in ["locality", "result-xl-locality", "classified__information--address"]:
-        el = card.find(class_=lambda c: c and cls in c.split())
-        if el:
-            return _get_text_or_none(el)
+def _find_location(index: _CardIndex) -> Optional[str]:
+    el = index.first_with_class(
+        ["locality", "result-xl-locality", "classified__information--address"]
+    )
+    if el:
+        return _get_text_or_none(el)
     # Fallback
-    small = card.find("small")
-    return _get_text_or_none(small)
+    return _get_text_or_none(index.by_tag.get("small"))
 
-def _find_link(card) -> Optional[str]:
+def _find_link(index: _CardIndex) -> Optional[str]:
     # Prefer main anchors that point to classified pages
-    for a in card.find_all("a", href=True):
+    for a in index.anchors:
         href = a["href"]
         if "/en/classified" in href or "/fr/classified" in href or "/nl/classified" in href:
             return href
     # Fallback: first anchor
-    a = card.find("a", href=True)
-    if a:
-        return a["href"]
+    if index.anchors:
+        return index.anchors[0]["href"]
     return None
 
-def _find_photos(card) -> List[str]:
+def _find_photos(index: _CardIndex) -> List[str]:
     photos: List[str] = []
-    for img in card.find_all("img"):
+    for img in index.images:
         src = img.get("data-src") or img.get("src")
         if not src:
             continue
@@ -64,16 +152,16 @@ def _find_photos(card) -> List[str]:
             unique_photos.append(p)
     return unique_photos
 
-def _find_property_type(card) -> Optional[str]:
+def _find_property_type(index: _CardIndex) -> Optional[str]:
     # Immoweb often shows type in a badge or meta section
-    for cls in ["property-type", "result-xl-property-type", "classified__type"]:
-        el = card.find(class_=lambda c: c and cls in c.split())
-        if el:
-            return _get_text_or_none(el)
+    el = index.first_with_class(
+        ["property-type", "result-xl-property-type", "classified__type"]
+    )
+    if el:
+        return _get_text_or_none(el)
     # Fallback: look for "Apartment", "House", etc. in the card
-    text = card.get_text(" ", strip=True)
     for word in ["Apartment", "House", "Studio", "Villa", "Loft"]:
-        if word.lower() in text.lower():
+        if word.lower() in index.text_lower:
             return word
     return None
 
@@ -89,39 +177,37 @@ def _extract_int_from_text(source: Optional[str]) -> Optional[int]:
     except ValueError:
         return None
 
-def _find_bedrooms(card) -> Optional[int]:
-    # Common icons or labels
-    for cls in ["bedrooms", "bedroom-count"]:
-        el = card.find(class_=lambda c: c and cls in c.split())
-        if el:
-            return _extract_int_from_text(el.get_text())
-    text = card.get_text(" ", strip=True)
-    for label in ["bedroom", "bedrooms", "chambre", "chambres", "slaapkamer", "slaapkamers"]:
-        idx = text.lower().find(label)
+def _find_count_near_label(index: _CardIndex, labels: List[str]) -> Optional[int]:
+    for label in labels:
+        idx = index.text_lower.find(label)
         if idx != -1:
-            snippet = text[max(0, idx - 6) : idx]
+            snippet = index.text[max(0, idx - 6) : idx]
             val = _extract_int_from_text(snippet)
             if val is not None:
                 return val
     return None
 
-def _find_bathrooms(card) -> Optional[int]:
-    for cls in ["bathrooms", "bathroom-count"]:
-        el = card.find(class_=lambda c: c and cls in c.split())
-        if el:
-            return _extract_int_from_text(el.get_text())
-    text = card.get_text(" ", strip=True)
-    for label in ["bathroom", "bathrooms", "sdb", "salle de bain", "badkamer", "badkamers"]:
-        idx = text.lower().find(label)
-        if idx != -1:
-            snippet = text[max(0, idx - 6) : idx]
-            val = _extract_int_from_text(snippet)
-            if val is not None:
-                return val
-    return None
+def _find_bedrooms(index: _CardIndex) -> Optional[int]:
+    # Common icons or labels
+    el = index.first_with_class(["bedrooms", "bedroom-count"])
+    if el:
+        return _extract_int_from_text(el.get_text())
+    return _find_count_near_label(
+        index,
+        ["bedroom", "bedrooms", "chambre", "chambres", "slaapkamer", "slaapkamers"],
+    )
+
+def _find_bathrooms(index: _CardIndex) -> Optional[int]:
+    el = index.first_with_class(["bathrooms", "bathroom-count"])
+    if el:
+        return _extract_int_from_text(el.get_text())
+    return _find_count_near_label(
+        index,
+        ["bathroom", "bathrooms", "sdb", "salle de bain", "badkamer", "badkamers"],
+    )
 
-def _find_area(card) -> Optional[int]:
-    text = card.get_text(" ", strip=True)
+def _find_area(index: _CardIndex) -> Optional[int]:
+    text = index.text
     # Look for something like "120 m²"
     for marker in ["m²", "m2"]:
         idx = text.find(marker)
@@ -132,17 +218,20 @@ def _find_area(card) -> Optional[int]:
                 return val
     return None
 
-def _find_energy_class(card) -> Optional[str]:
-    for cls in ["epc", "energy-class"]:
-        el = card.find(class_=lambda c: c and cls in c.split())
-        if el:
-            txt = _get_text_or_none(el)
-            if txt:
-                return txt
+def _find_energy_class(index: _CardIndex) -> Optional[str]:
+    el = index.first_with_class(["epc"])
+    txt = _get_text_or_none(el)
+    if txt:
+        return txt
+    el = index.first_with_class(["energy-class"])
+    txt = _get_text_or_none(el)
+    if txt:
+        return txt
     # Fallback: search for "PEB" or "EPC" and a grade
-    text = card.get_text(" ", strip=True)
+    text = index.text
+    text_upper = text.upper()
     for label in ["PEB", "EPC"]:
-        idx = text.upper().find(label)
+        idx = text_upper.find(label)
         if idx != -1 and idx + 4 < len(text):
             snippet = text[idx : idx + 8]
             for grade in ["A", "B", "C", "D", "E", "F", "G"]:
@@ -150,40 +239,276 @@ def _find_energy_class(card) -> Optional[str]:
                     return f"{label} {grade}"
     return None
 
-def _find_publisher(card) -> Optional[str]:
-    for cls in ["agency-name", "publisher", "classified__information--agency"]:
-        el = card.find(class_=lambda c: c and cls in c.split())
-        if el:
-            return _get_text_or_none(el)
+def _find_publisher(index: _CardIndex) -> Optional[str]:
+    el = index.first_with_class(
+        ["agency-name", "publisher", "classified__information--agency"]
+    )
+    if el:
+        return _get_text_or_none(el)
     return None
 
-def _find_contact(card) -> Optional[str]:
+def _find_contact(index: _CardIndex) -> Optional[str]:
     # Often contact details are not fully present on listing cards; try to pick any obvious phone fragment
-    text = card.get_text(" ", strip=True)
-    digits = "".join(ch if ch.isdigit() or ch in "+ -" else " " for ch in text)
+    digits = "".join(ch if ch.isdigit() or ch in "+ -" else " " for ch in index.text)
     parts = [p for p in digits.split() if len(p.replace("+", "").replace("-", "")) >= 8]
     if parts:
         return parts[0]
     return None
 
-def _find_date_posted(card) -> Optional[str]:
-    for cls in ["date", "posted-date", "classified__publish-date"]:
-        el = card.find(class_=lambda c: c and cls in c.split())
-        if el:
-            return _get_text_or_none(el)
+def _find_date_posted(index: _CardIndex) -> Optional[str]:
+    el = index.first_with_class(["date", "posted-date", "classified__publish-date"])
+    if el:
+        return _get_text_or_none(el)
     return None
 
-def extract_listings_from_search_page(
+def _is_result_list(value: Any) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(item, dict) and "id" in item and "property" in item for item in value
+    )
+
+def _find_result_list(data: Any, depth: int = 0) -> Optional[List[Dict[str, Any]]]:
+    """The first `results` list of search results inside decoded page state."""
+    if depth > 6:
+        return None
+    if isinstance(data, dict):
+        results = data.get("results")
+        if _is_result_list(results):
+            return results
+        children = data.values()
+    elif isinstance(data, list):
+        children = data
+    else:
+        return None
+    for child in children:
+        if isinstance(child, (dict, list)):
+            found = _find_result_list(child, depth + 1)
+            if found is not None:
+                return found
+    return None
+
+def _find_embedded_results(html: str) -> Optional[List[Dict[str, Any]]]:
+    """
+    Search results embedded in the page as JSON, or None when the page has
+    no (decodable) payload. An empty list is a page without results.
+    """
+    for match in _RESULTS_ATTR_RE.finditer(html):
+        raw = match.group(1) if match.group(1) is not None else match.group(2)
+        try:
+            data = json.loads(html_lib.unescape(raw))
+        except ValueError:
+            continue
+        if isinstance(data, list) and (not data or _is_result_list(data)):
+            return data
+    for match in _JSON_SCRIPT_RE.finditer(html):
+        body = match.group(1)
+        if '"results"' not in body:
+            continue
+        try:
+            data = json.loads(html_lib.unescape(body) if "&quot;" in body else body)
+        except ValueError:
+            continue
+        found = _find_result_list(data)
+        if found is not None:
+            return found
+    return None
+
+def _slug(text: str) -> str:
+    ascii_text = (
+        unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    )
+    return re.sub(r"[^a-z0-9]+", "-", ascii_text.lower()).strip("-")
+
+def _site_language(search_url: Optional[str]) -> str:
+    if search_url:
+        first = urlparse(search_url).path.strip("/").split("/")[0]
+        if first in _SITE_LANGUAGES:
+            return first
+    return "en"
+
+def _format_amount(value: Any) -> Optional[str]:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return f"€{int(round(value)):,}"
+
+def _result_price(price: Dict[str, Any], for_rent: bool) -> Optional[str]:
+    # Formatted so that scraper.normalize.parse_price recovers the exact
+    # amounts; the site's own display string is used when it has one
+    display = price.get("mainDisplayPrice")
+    if isinstance(display, str) and display.strip():
+        return " ".join(html_lib.unescape(display).split())
+    low = _format_amount(price.get("minRangeValue"))
+    high = _format_amount(price.get("maxRangeValue"))
+    if low and high:
+        return f"{low} - {high}"
+    main = _format_amount(price.get("mainValue"))
+    if main and for_rent:
+        return f"{main}/month"
+    return main
+
+def _result_date(value: Any) -> Optional[str]:
+    # "2024-02-17T10:00:00.000+0000" -> "17/02/2024", as the cards show it
+    if not isinstance(value, str):
+        return None
+    match = _ISO_DATE_RE.match(value)
+    if not match:
+        return value or None
+    year, month, day = match.groups()
+    return f"{day}/{month}/{year}"
+
+def _int_or_none(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return None
+
+def _listing_from_result(
+    result: Dict[str, Any], search_url: Optional[str], language: str
+) -> Optional[Listing]:
+    """Map one embedded search result onto the listing schema."""
+    ident = result.get("id")
+    if ident is None or isinstance(ident, bool):
+        return None
+    ident = str(ident)
+    prop = result.get("property") or {}
+    location = prop.get("location") or {}
+    transaction = result.get("transaction") or {}
+    price = result.get("price") or {}
+    media = result.get("media") or {}
+    customers = result.get("customers") or []
+    publication = result.get("publication") or {}
+
+    transaction_type = str(transaction.get("type") or "").lower()
+    for_rent = "rent" in transaction_type or "rent" in str(price.get("type") or "").lower()
+    kind = str(prop.get("subtype") or prop.get("type") or "")
+    property_type = kind.replace("_", " ").capitalize() or None
+
+    locality = location.get("locality")
+    postal_code = location.get("postalCode")
+    location_text = " ".join(str(p) for p in (postal_code, locality) if p) or None
+
+    url = None
+    if kind:
+        url = "/".join(
+            [
+                IMMOWEB_BASE_URL,
+                language,
+                "classified",
+                _slug(kind),
+                "for-rent" if for_rent else "for-sale",
+                _slug(str(locality or "belgium")) or "belgium",
+                _slug(str(postal_code or "")) or "0",
+                ident,
+            ]
+        )
+
+    photos: List[str] = []
+    for picture in media.get("pictures") or []:
+        if not isinstance(picture, dict):
+            continue
+        src = picture.get("largeUrl") or picture.get("mediumUrl") or picture.get("smallUrl")
+        if src and src not in photos:
+            photos.append(src)
+
+    certificates = transaction.get("certificates") or {}
+    energy_class = certificates.get("epcScore") or transaction.get("certificate")
+    if energy_class and len(str(energy_class)) <= 3:
+        # Bare grade ("B", "A++"); the cards label it
+        energy_class = f"EPC {energy_class}"
+    publisher = None
+    contact = None
+    if customers and isinstance(customers[0], dict):
+        publisher = customers[0].get("name")
+        contact = customers[0].get("phoneNumber")
+    description = prop.get("description")
+
+    return Listing(
+        id=ident,
+        url=url,
+        title=prop.get("title")
+        or (property_type and f"{property_type} {'for rent' if for_rent else 'for sale'}"),
+        description=" ".join(description.split()) if isinstance(description, str) else None,
+        price=_result_price(price, for_rent),
+        photos=photos,
+        location=location_text,
+        propertyType=property_type,
+        bedrooms=_int_or_none(prop.get("bedroomCount")),
+        bathrooms=_int_or_none(prop.get("bathroomCount")),
+        area=_int_or_none(prop.get("netHabitableSurface")),
+        energyClass=str(energy_class) if energy_class else None,
+        publisher=publisher,
+        contact=contact,
+        views=_int_or_none(publication.get("viewCount")),
+        datePosted=_result_date(publication.get("creationDate")),
+        apify_monitoring_status="unknown",
+        searchUrl=search_url,
+        contentHash=None,
+        changedFields=None,
+    )
+
+def extract_listings_from_embedded_json(
     html: str, search_url: Optional[str] = None
-) -> List[Dict[str, Any]]:
+) -> Optional[List[Listing]]:
+    """
+    Listings from the JSON search results Immoweb embeds in its search
+    pages, or None when the page carries no such payload.
+
+    Fields come straight from the structured data (numeric ids, room
+    counts, surface and price, the EPC score, the advertiser), so no DOM is
+    built and nothing is guessed from text. Titles, EPC labels and dates are
+    formatted the way the result cards show them.
+    """
+    results = _find_embedded_results(html)
+    if results is None:
+        return None
+    language = _site_language(search_url)
+    listings: List[Listing] = []
+    for result in results:
+        listing = _listing_from_result(result, search_url, language)
+        if listing is None:
+            continue
+        listing.contentHash = listing_digest(listing)
+        listings.append(listing)
+    return listings
+
+def _make_soup(html: str, backend: str) -> "BeautifulSoup":
+    features = PARSER_BACKENDS.get(backend)
+    if features is None:
+        raise ValueError(
+            f"Unknown parser backend {backend!r}; expected one of {sorted(PARSER_BACKENDS)}"
+        )
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, features)
+
+def extract_listings_from_search_page(
+    html: str,
+    search_url: Optional[str] = None,
+    backend: str = DEFAULT_PARSER_BACKEND,
+) -> List[Listing]:
     """
     Attempt to extract listing data from an Immoweb search results HTML page.
 
+    Pages carrying their results as embedded JSON are decoded directly (see
+    `extract_listings_from_embedded_json`); the DOM heuristics below are
+    only the fallback for pages without that payload.
+
     The parser is intentionally defensive: when a field cannot be extracted,
     it falls back to None instead of raising.
+
+    Each card is walked once to build a `_CardIndex`; every field is then
+    derived from that index. `backend` selects the tree builder (see
+    `PARSER_BACKENDS`); the default "html.parser" needs no extra packages,
+    while "lxml" is considerably faster on large pages.
     """
-    soup = BeautifulSoup(html, "html.parser")
-    listings: List[Dict[str, Any]] = []
+    embedded = extract_listings_from_embedded_json(html, search_url)
+    if embedded is not None:
+        return embedded
+
+    soup = _make_soup(html, backend)
+    listings: List[Listing] = []
 
     # Try a few generic selectors that typically match listing cards
     cards = soup.select("article, .search-result, .result-xl")
@@ -192,60 +517,104 @@ def extract_listings_from_search_page(
         cards = soup.select("[data-id]")
 
     for card in cards:
+        index = _CardIndex(card)
+
         title_el = (
-            card.find("h2")
-            or card.find("h3")
-            or card.find("h1")
+            index.by_tag.get("h2")
+            or index.by_tag.get("h3")
+            or index.by_tag.get("h1")
         )
         title = _get_text_or_none(title_el)
 
-        description_el = card.find("p")
-        description = _get_text_or_none(description_el)
-
-        price = _find_price(card)
-        location = _find_location(card)
-        property_type = _find_property_type(card)
-        bedrooms = _find_bedrooms(card)
-        bathrooms = _find_bathrooms(card)
-        area = _find_area(card)
-        energy_class = _find_energy_class(card)
-        publisher = _find_publisher(card)
-        contact = _find_contact(card)
-        date_posted = _find_date_posted(card)
-
-        rel_url = _find_link(card)
+        rel_url = _find_link(index)
         full_url = (
             urljoin(IMMOWEB_BASE_URL, rel_url) if rel_url else None
         )
-        listing_id = extract_listing_id_from_url(full_url) if full_url else None
-
-        photos = _find_photos(card)
 
         # Skip cards that don't look like real listings
         if not title and not full_url:
             continue
 
-        listing: Dict[str, Any] = {
-            "id": listing_id,
-            "url": full_url,
-            "title": title,
-            "description": description,
-            "price": price,
-            "photos": photos,
-            "location": location,
-            "propertyType": property_type,
-            "bedrooms": bedrooms,
-            "bathrooms": bathrooms,
-            "area": area,
-            "energyClass": energy_class,
-            "publisher": publisher,
-            "contact": contact,
-            "views": None,
-            "datePosted": date_posted,
-            "apify_monitoring_status": "unknown",
-            "searchUrl": search_url,
-        }
+        description = _get_text_or_none(index.by_tag.get("p"))
+        listing_id = extract_listing_id_from_url(full_url) if full_url else None
+
+        listing = Listing(
+            id=listing_id,
+            url=full_url,
+            title=title,
+            description=description,
+            price=_find_price(index),
+            photos=_find_photos(index),
+            location=_find_location(index),
+            propertyType=_find_property_type(index),
+            bedrooms=_find_bedrooms(index),
+            bathrooms=_find_bathrooms(index),
+            area=_find_area(index),
+            energyClass=_find_energy_class(index),
+            publisher=_find_publisher(index),
+            contact=_find_contact(index),
+            views=None,
+            datePosted=_find_date_posted(index),
+            apify_monitoring_status="unknown",
+            searchUrl=search_url,
+            contentHash=None,
+            changedFields=None,
+        )
+        listing.contentHash = listing_digest(listing)
 
         listings.append(listing)
 
-    return listings
\ No newline at end of file
+    return listings
+
+def _classified_contact(customer: Dict[str, Any]) -> Optional[str]:
+    parts = []
+    for key in ("phoneNumber", "mobileNumber", "email"):
+        value = customer.get(key)
+        if isinstance(value, str) and value.strip() and value.strip() not in parts:
+            parts.append(value.strip())
+    return ", ".join(parts) or None
+
+def extract_listing_details(html: str) -> Dict[str, Any]:
+    """
+    Fields only a classified's detail page carries: view count, the
+    advertiser's full contact details and the publication date, plus the
+    advertiser's name. Read from the page's `window.classified` data, or
+    from tel:/mailto: links when that is missing. Fields that cannot be
+    found are left out of the returned dict.
+    """
+    details: Dict[str, Any] = {}
+    classified = None
+    match = _CLASSIFIED_RE.search(html)
+    if match:
+        try:
+            classified, _ = json.JSONDecoder().raw_decode(html, match.end())
+        except ValueError:
+            classified = None
+    if isinstance(classified, dict):
+        publication = classified.get("publication") or {}
+        statistics = classified.get("statistics") or {}
+        views = _int_or_none(statistics.get("viewCount"))
+        if views is None:
+            views = _int_or_none(publication.get("viewCount"))
+        if views is not None:
+            details["views"] = views
+        posted = _result_date(publication.get("creationDate"))
+        if posted:
+            details["datePosted"] = posted
+        customers = classified.get("customers") or []
+        if customers and isinstance(customers[0], dict):
+            if customers[0].get("name"):
+                details["publisher"] = customers[0]["name"]
+            contact = _classified_contact(customers[0])
+            if contact:
+                details["contact"] = contact
+    if "contact" not in details:
+        found = []
+        for pattern in (_TEL_RE, _MAILTO_RE):
+            for raw in pattern.findall(html):
+                value = html_lib.unescape(raw).strip()
+                if value and value not in found:
+                    found.append(value)
+        if found:
+            details["contact"] = ", ".join(found)
+    return details
\ No newline at end of file
@@ -0,0 +1,240 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import time
+import uuid
+from pathlib import Path, PurePosixPath
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+from .cache import PhotoEntry, PhotoIndex
+from .metrics import MetricsRegistry
+from .throttle import THROTTLE_STATUSES, AdaptiveRateLimiter, parse_retry_after
+from .transport import HttpTransport, discard_body
+from .utils import get_logger
+
+# Bodies are hashed and written in chunks of this size
+CHUNK_SIZE = 64 * 1024
+
+_IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp", ".gif", ".avif")
+
+def _suffix(url: str, content_type: Optional[str]) -> str:
+    suffix = PurePosixPath(urlparse(url).path).suffix.lower()
+    if suffix in _IMAGE_SUFFIXES:
+        return suffix
+    if content_type:
+        guessed = mimetypes.guess_extension(content_type.split(";")[0].strip())
+        if guessed:
+            return guessed
+    return ""
+
+class _TooLarge(Exception):
+    pass
+
+class PhotoDownloader:
+    """
+    Downloads the photos of a stream of crawled listings into a
+    content-addressed directory, fetching every photo URL at most once.
+
+    A body is streamed to a temporary file in `CHUNK_SIZE` pieces while it
+    is hashed, then moved to `<directory>/<sha256[:2]>/<sha256><suffix>`; a
+    body already stored under that digest is dropped instead, so identical
+    photos behind different URLs (the same project photos on every unit,
+    re-uploads) are kept once. A `PhotoIndex` maps each URL to its file and
+    is consulted before any request, so photos seen in an earlier batch,
+    search or run are never downloaded again. Each listing gets the stored
+    files in `photoFiles`, relative to `directory` and in the order of its
+    `photos` (None for photos that could not be downloaded).
+
+    Photo requests have their own rate limiter, like detail enrichment, and
+    go through `transport`, normally the pool shared with the crawl; without
+    one the downloader opens its own. `close` it when done.
+    """
+
+    def __init__(
+        self,
+        index: PhotoIndex,
+        directory: Path,
+        *,
+        concurrency: int = 8,
+        target_rps: Optional[float] = None,
+        adaptive_throttle: bool = True,
+        request_timeout: int = 30,
+        max_bytes: int = 20 * 1024 * 1024,
+        max_retries: int = 3,
+        user_agent: str = "ImmowebMassScraper/1.0",
+        metrics: Optional[MetricsRegistry] = None,
+        transport: Optional[HttpTransport] = None,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        self.index = index
+        self.directory = directory
+        self.request_timeout = request_timeout
+        self.max_bytes = max_bytes
+        self.max_retries = max_retries
+        self.rate_limiter = AdaptiveRateLimiter(
+            rate=target_rps,
+            concurrency=concurrency,
+            max_concurrency=concurrency,
+            adaptive=adaptive_throttle,
+        )
+        self.metrics = metrics
+        self.logger = logger or get_logger(self.__class__.__name__)
+        self.downloaded = 0
+        self.duplicates = 0
+        self.known = 0
+        self.failed = 0
+        self._owns_transport = transport is None
+        self.transport = transport or HttpTransport(user_agent=user_agent, metrics=metrics)
+        self._tmp_dir = directory / ".partial"
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    async def download_batch(self, items: List[Dict[str, Any]]) -> None:
+        """Download the photos of `items` not fetched yet and set their `photoFiles`."""
+        urls = list(
+            {
+                url
+                for item in items
+                for url in item.get("photos") or ()
+                if isinstance(url, str) and url.startswith(("http://", "https://"))
+            }
+        )
+        entries = self.index.lookup_many(urls) if urls else {}
+        pending = [url for url in urls if url not in entries]
+        self.known += len(entries)
+        if self.metrics is not None and entries:
+            self.metrics.counter(
+                "photo_index_hits_total", "Photo URLs skipped as already downloaded"
+            ).inc(len(entries))
+
+        if pending:
+            results = await asyncio.gather(*(self._download(url) for url in pending))
+            fetched = [(url, entry) for url, entry in zip(pending, results) if entry]
+            self.index.store_many(fetched)
+            entries.update(fetched)
+
+        for item in items:
+            photos = item.get("photos")
+            if not isinstance(photos, list):
+                continue
+            files = []
+            for url in photos:
+                entry = entries.get(url)
+                files.append(entry.path if entry is not None else None)
+            item["photoFiles"] = files
+
+    async def _download(self, url: str) -> Optional[PhotoEntry]:
+        """
+        Fetch one photo, retrying server errors and throttling. Returns its
+        index entry, an entry without a file for a client error, or None
+        when it should be tried again in a later run.
+        """
+        for attempt in range(1, self.max_retries + 1):
+            await self.rate_limiter.acquire()
+            started = time.monotonic()
+            status: Optional[int] = None
+            retry_after: Optional[float] = None
+            cancelled = False
+            try:
+                async with self.transport.session.get(
+                    url, timeout=self.request_timeout
+                ) as resp:
+                    status = resp.status
+                    if status == 200:
+                        entry, result = await self._store(url, resp)
+                        self._record(result)
+                        return entry
+                    if status in THROTTLE_STATUSES:
+                        retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    await discard_body(resp)
+                    if status < 500 and status not in THROTTLE_STATUSES:
+                        self.logger.warning("Photo %s answered %s; not retrying", url, status)
+                        self._record("gone")
+                        return PhotoEntry(None, None, 0, time.time())
+            except _TooLarge:
+                self.logger.warning("Photo %s exceeds %d bytes; skipped", url, self.max_bytes)
+                self._record("too_large")
+                return PhotoEntry(None, None, 0, time.time())
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as e:
+                self.logger.warning(
+                    "Photo request error for %s on attempt %s/%s: %s",
+                    url,
+                    attempt,
+                    self.max_retries,
+                    e,
+                )
+            except asyncio.CancelledError:
+                cancelled = True
+                raise
+            finally:
+                self.rate_limiter.release(
+                    status=status,
+                    latency=time.monotonic() - started,
+                    retry_after=retry_after,
+                    cancelled=cancelled,
+                )
+            if attempt < self.max_retries and retry_after is None:
+                await asyncio.sleep(1.5 ** (attempt - 1))
+        self._record("failed")
+        return None
+
+    async def _store(
+        self, url: str, resp: aiohttp.ClientResponse
+    ) -> Tuple[PhotoEntry, str]:
+        digest = hashlib.sha256()
+        size = 0
+        tmp_path = self._tmp_dir / uuid.uuid4().hex
+        try:
+            with tmp_path.open("wb") as f:
+                async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise _TooLarge()
+                    digest.update(chunk)
+                    f.write(chunk)
+            hexdigest = digest.hexdigest()
+            relative = f"{hexdigest[:2]}/{hexdigest}{_suffix(url, resp.content_type)}"
+            target = self.directory / relative
+            if target.exists():
+                tmp_path.unlink()
+                result = "duplicate"
+            else:
+                target.parent.mkdir(exist_ok=True)
+                os.replace(tmp_path, target)
+                result = "downloaded"
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.counter(
+                "photo_bytes_total", "Photo bytes downloaded, including duplicates"
+            ).inc(size)
+        return PhotoEntry(hexdigest, relative, size, time.time()), result
+
+    def _record(self, result: str) -> None:
+        if result == "downloaded":
+            self.downloaded += 1
+        elif result == "duplicate":
+            self.duplicates += 1
+        else:
+            self.failed += 1
+        if self.metrics is not None:
+            self.metrics.counter("photo_downloads_total", "Photo requests by outcome").inc(
+                result=result
+            )
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "downloaded": self.downloaded,
+            "duplicates": self.duplicates,
+            "known": self.known,
+            "failed": self.failed,
+        }
+
+    async def close(self) -> None:
+        if self._owns_transport:
+            await self.transport.close()
\ No newline at end of file
@@ -0,0 +1,370 @@
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+from collections import Counter as FrameCounter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .metrics import MetricsRegistry
+
+PROFILE_MODES = ("cprofile", "asyncio", "sample")
+
+# Stage name for profiled time outside any pipeline stage (setup, snapshot
+# loading, the worker loop, ...)
+UNSTAGED = "other"
+
+# Event loop lag, in seconds
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+def _stage_file_name(stage: str) -> str:
+    return "".join(ch if ch.isalnum() or ch in "-_." else "_" for ch in stage)
+
+class _RawStats:
+    """Adapter letting `pstats.Stats` load a stats dict shipped from a worker."""
+
+    def __init__(self, stats: Dict[Any, Any]) -> None:
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+def profile_call(func, *args, **kwargs):
+    """
+    Run `func` under its own cProfile and return `(result, stats)`, where
+    `stats` is the raw, picklable stats dict. Used inside parse workers
+    (threads or processes), which the main process profiler cannot see.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active cProfile per interpreter; calls in a
+        # worker thread are then recorded by the main profile instead
+        return func(*args, **kwargs), None
+    try:
+        result = func(*args, **kwargs)
+    finally:
+        profiler.disable()
+    profiler.create_stats()
+    return result, profiler.stats
+
+class StageProfiler:
+    """
+    One cProfile per pipeline stage in the main thread. The registry it is
+    attached to calls `switch` on every stage change, which pauses the
+    profile of the stage being left and resumes the one being entered, so
+    each `<stage>.prof` only holds the calls made while that stage ran.
+
+    Profiles recorded inside parse workers are merged in with
+    `add_worker_stats`.
+    """
+
+    def __init__(self) -> None:
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._worker_stats: Dict[str, pstats.Stats] = {}
+        self._active: Optional[cProfile.Profile] = None
+
+    def switch(self, stage: Optional[str]) -> None:
+        if self._active is not None:
+            self._active.disable()
+        name = stage or UNSTAGED
+        profile = self._profiles.get(name)
+        if profile is None:
+            profile = self._profiles[name] = cProfile.Profile()
+        self._active = profile
+        profile.enable()
+
+    def stop(self) -> None:
+        if self._active is not None:
+            self._active.disable()
+            self._active = None
+
+    def add_worker_stats(self, stage: str, stats: Optional[Dict[Any, Any]]) -> None:
+        if not stats:
+            return
+        merged = self._worker_stats.get(stage)
+        if merged is None:
+            self._worker_stats[stage] = pstats.Stats(_RawStats(stats))
+        else:
+            merged.add(_RawStats(stats))
+
+    def dump(self, directory: Path) -> List[Path]:
+        """
+        Write `<stage>.prof` (for pstats, snakeviz, ...) and a `<stage>.txt`
+        summary of the top functions by cumulative time for every stage.
+        """
+        written: List[Path] = []
+        for stage in sorted(set(self._profiles) | set(self._worker_stats)):
+            parts = []
+            if stage in self._profiles:
+                profile = self._profiles[stage]
+                profile.create_stats()
+                if profile.stats:
+                    parts.append(pstats.Stats(profile))
+            if stage in self._worker_stats:
+                parts.append(self._worker_stats[stage])
+            if not parts:
+                continue
+            stats = parts[0]
+            for extra in parts[1:]:
+                stats.add(extra)
+            prof_path = directory / f"{_stage_file_name(stage)}.prof"
+            txt_path = prof_path.with_suffix(".txt")
+            stats.dump_stats(str(prof_path))
+            with txt_path.open("w", encoding="utf-8") as f:
+                stats.stream = f
+                stats.sort_stats("cumulative").print_stats(40)
+            written += [prof_path, txt_path]
+        return written
+
+class StackSampler:
+    """
+    Statistical profiler: a daemon thread samples the Python stacks of all
+    threads every `interval` seconds and counts them per stage. Its cost is
+    a stack walk per sample, independent of how much code runs, so it can
+    stay on in production runs.
+
+    Main-thread samples are attributed to the registry's current stage,
+    samples from the parse thread pool to "parse" and other threads to
+    "threads". Parse workers in separate processes are not sampled.
+    """
+
+    def __init__(self, metrics: MetricsRegistry, interval: float = 0.01) -> None:
+        self.metrics = metrics
+        self.interval = interval
+        self.samples: Dict[str, FrameCounter] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._main_ident = threading.main_thread().ident
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self._run, name="immoweb-sampler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                if ident == self._main_ident:
+                    stage = self.metrics.current_stage() or UNSTAGED
+                elif names.get(ident, "").startswith("immoweb-parse"):
+                    stage = "parse"
+                else:
+                    stage = "threads"
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                counter = self.samples.get(stage)
+                if counter is None:
+                    counter = self.samples[stage] = FrameCounter()
+                counter[";".join(reversed(stack))] += 1
+
+    def dump(self, directory: Path) -> List[Path]:
+        """
+        Write one `<stage>.folded` file per stage in the collapsed-stack
+        format read by flamegraph.pl, speedscope and similar tools.
+        """
+        written: List[Path] = []
+        for stage, counter in sorted(self.samples.items()):
+            path = directory / f"{_stage_file_name(stage)}.folded"
+            with path.open("w", encoding="utf-8") as f:
+                for stack, count in counter.most_common():
+                    f.write(f"{stack} {count}\n")
+            written.append(path)
+        return written
+
+class _SlowCallbackHandler(logging.Handler):
+    """Collects the slow-callback warnings asyncio logs in debug mode."""
+
+    def __init__(self, monitor: "LoopMonitor") -> None:
+        super().__init__(logging.WARNING)
+        self.monitor = monitor
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if isinstance(record.msg, str) and record.msg.startswith("Executing "):
+            self.monitor.record_slow_callback(record.getMessage())
+
+class LoopMonitor:
+    """
+    Asyncio health while the pipeline runs: event loop lag (how late a
+    timer that should fire every `interval` seconds actually fires) and
+    callbacks or task steps that block the loop for longer than
+    `slow_callback` seconds, reported through asyncio's debug mode.
+
+    Lag is observed into the `event_loop_lag_seconds` histogram of
+    `metrics`; slow callbacks are counted per stage in
+    `slow_callbacks_total`.
+    """
+
+    def __init__(
+        self,
+        metrics: MetricsRegistry,
+        interval: float = 0.1,
+        slow_callback: float = 0.1,
+    ) -> None:
+        self.metrics = metrics
+        self.interval = interval
+        self.slow_callback = slow_callback
+        self.lags: List[float] = []
+        self.slow_callbacks: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self._handler = _SlowCallbackHandler(self)
+        self._loop_debug = False
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._loop_debug = loop.get_debug()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback
+        logging.getLogger("asyncio").addHandler(self._handler)
+        self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        logging.getLogger("asyncio").removeHandler(self._handler)
+        asyncio.get_running_loop().set_debug(self._loop_debug)
+
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        lag_histogram = self.metrics.histogram(
+            "event_loop_lag_seconds", "Delay of a periodic event loop timer", LAG_BUCKETS
+        )
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self.lags.append(lag)
+            lag_histogram.observe(lag)
+
+    def record_slow_callback(self, message: str) -> None:
+        stage = self.metrics.current_stage() or UNSTAGED
+        self.metrics.counter(
+            "slow_callbacks_total", "Event loop callbacks slower than the threshold"
+        ).inc(stage=stage)
+        self.slow_callbacks.append(f"[{stage}] {message}")
+
+    def dump(self, directory: Path) -> List[Path]:
+        """Write `loop_lag.json` (lag percentiles) and `slow_callbacks.log`."""
+        lags = sorted(self.lags)
+
+        def percentile(q: float) -> Optional[float]:
+            if not lags:
+                return None
+            return round(lags[min(len(lags) - 1, int(q * len(lags)))], 6)
+
+        summary = {
+            "interval": self.interval,
+            "samples": len(lags),
+            "mean": round(sum(lags) / len(lags), 6) if lags else None,
+            "p50": percentile(0.50),
+            "p95": percentile(0.95),
+            "p99": percentile(0.99),
+            "max": round(lags[-1], 6) if lags else None,
+            "slow_callback_threshold": self.slow_callback,
+            "slow_callbacks": len(self.slow_callbacks),
+        }
+        lag_path = directory / "loop_lag.json"
+        lag_path.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+        slow_path = directory / "slow_callbacks.log"
+        slow_path.write_text(
+            "".join(line + "\n" for line in self.slow_callbacks), encoding="utf-8"
+        )
+        return [lag_path, slow_path]
+
+class RunProfiler:
+    """
+    Profiling for one run, in any combination of `PROFILE_MODES`:
+
+    - "cprofile": deterministic profile of every stage (`StageProfiler`),
+      including the parse workers of a thread or process pool;
+    - "asyncio": event loop lag and slow callbacks (`LoopMonitor`);
+    - "sample": low-overhead stack sampling per stage (`StackSampler`).
+
+    `start` attaches the profiler to `metrics`, whose stage boundaries
+    (crawl, parse, delta, export.<format>) scope the profiles; `stop`
+    writes every output to `directory` and returns the paths.
+    """
+
+    def __init__(
+        self,
+        modes: Sequence[str],
+        directory: Path,
+        metrics: MetricsRegistry,
+        *,
+        sample_interval: float = 0.01,
+        lag_interval: float = 0.1,
+        slow_callback: float = 0.1,
+    ) -> None:
+        unknown = set(modes) - set(PROFILE_MODES)
+        if unknown:
+            raise ValueError(
+                f"Unknown profile mode(s) {sorted(unknown)}; expected some of {PROFILE_MODES}"
+            )
+        self.directory = directory
+        self.metrics = metrics
+        self.stage_profiler = StageProfiler() if "cprofile" in modes else None
+        self.sampler = StackSampler(metrics, sample_interval) if "sample" in modes else None
+        self.loop_monitor = (
+            LoopMonitor(metrics, lag_interval, slow_callback) if "asyncio" in modes else None
+        )
+
+    @property
+    def profiles_workers(self) -> bool:
+        """Whether parse workers should profile themselves (`profile_call`)."""
+        return self.stage_profiler is not None
+
+    def switch(self, stage: Optional[str]) -> None:
+        if self.stage_profiler is not None:
+            self.stage_profiler.switch(stage)
+
+    def add_worker_stats(self, stage: str, stats: Optional[Dict[Any, Any]]) -> None:
+        if self.stage_profiler is not None:
+            self.stage_profiler.add_worker_stats(stage, stats)
+
+    async def start(self) -> None:
+        self.metrics.profiler = self
+        if self.stage_profiler is not None:
+            self.stage_profiler.switch(self.metrics.current_stage())
+        if self.sampler is not None:
+            self.sampler.start()
+        if self.loop_monitor is not None:
+            self.loop_monitor.start()
+
+    async def stop(self) -> List[Path]:
+        self.metrics.profiler = None
+        if self.loop_monitor is not None:
+            await self.loop_monitor.stop()
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.stage_profiler is not None:
+            self.stage_profiler.stop()
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        written: List[Path] = []
+        for part in (self.stage_profiler, self.sampler, self.loop_monitor):
+            if part is not None:
+                written += part.dump(self.directory)
+        return written
\ No newline at end of file
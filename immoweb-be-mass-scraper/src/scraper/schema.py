@@ -0,0 +1,36 @@
+# Declared listing schema shared by the parser and the exporters. Every
+# listing dict has exactly these keys, so exporters can write their header
+# before seeing any rows.
+
+# Keys of every listing dict, in output order (also the Excel column order)
+LISTING_FIELDS = (
+    "id",
+    "url",
+    "title",
+    "description",
+    "price",
+    "priceValue",
+    "priceCurrency",
+    "pricePeriod",
+    "pricePerM2",
+    "photos",
+    "photoFiles",
+    "location",
+    "propertyType",
+    "bedrooms",
+    "bathrooms",
+    "area",
+    "energyClass",
+    "publisher",
+    "contact",
+    "views",
+    "datePosted",
+    "apify_monitoring_status",
+    "searchUrl",
+    "contentHash",
+    "changedFields",
+)
+
+# CSV columns: sorted, like the header export_csv used to derive by
+# scanning every row for the union of their keys
+CSV_FIELDS = tuple(sorted(LISTING_FIELDS))
\ No newline at end of file
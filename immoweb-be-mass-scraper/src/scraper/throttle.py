@@ -0,0 +1,189 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, Optional
+
+# Statuses that mean "you are going too fast" rather than "this page is bad"
+THROTTLE_STATUSES = (429, 503)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (delta-seconds or HTTP-date) into a number of
+    seconds to wait, or None when absent or malformed.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class AdaptiveRateLimiter:
+    """
+    Shared throttle for all requests to the site: a token bucket caps the
+    request rate at `rate` requests per second, and an AIMD controller adjusts
+    how many requests may be in flight at once.
+
+    Every request calls `acquire` before it is sent and `release` with its
+    outcome afterwards. Healthy responses (2xx/3xx within `latency_target`
+    seconds) grow the concurrency limit by roughly one per round trip and
+    let the rate recover towards `rate`. A 429/503 or a transport error
+    multiplies both by `decrease_factor` (at most once per `cooldown`), and a
+    Retry-After header pauses all requests until it has passed.
+
+    With `adaptive=False` the limits stay fixed at their initial values.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        concurrency: int = 5,
+        min_concurrency: int = 1,
+        max_concurrency: int = 20,
+        min_rate: float = 0.2,
+        latency_target: float = 2.0,
+        decrease_factor: float = 0.5,
+        cooldown: float = 1.0,
+        adaptive: bool = True,
+    ) -> None:
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate or 1.0)
+        self.min_rate = min(min_rate, rate) if rate else min_rate
+        self.min_concurrency = max(1, min_concurrency)
+        self.max_concurrency = max(self.min_concurrency, max_concurrency)
+        self.limit = float(min(max(concurrency, self.min_concurrency), self.max_concurrency))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.cooldown = cooldown
+        self.adaptive = adaptive
+
+        self.in_flight = 0
+        self.throttled = 0
+        self._tokens = self.burst
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._token_lock = asyncio.Lock()
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> None:
+        await self._acquire_slot()
+        try:
+            await self._acquire_token()
+        except BaseException:
+            self._release_slot()
+            raise
+
+    def release(
+        self,
+        *,
+        status: Optional[int],
+        latency: float,
+        retry_after: Optional[float] = None,
+        cancelled: bool = False,
+    ) -> None:
+        """
+        Report the outcome of a request started with `acquire`. `status` is
+        None when the request failed without a response. A `cancelled`
+        request (e.g. a prefetch dropped at the end of a search) only frees
+        its slot: it says nothing about the server's health.
+        """
+        if cancelled:
+            self._release_slot()
+            return
+        now = time.monotonic()
+        if retry_after:
+            self._paused_until = max(self._paused_until, now + retry_after)
+
+        if self.adaptive:
+            if status is None or status in THROTTLE_STATUSES:
+                if status is not None:
+                    self.throttled += 1
+                self._decrease(now)
+            elif status < 400 and latency <= self.latency_target:
+                self._increase()
+
+        self._release_slot()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "concurrency": int(self.limit),
+            "rate": self.rate if self.rate is not None else float("inf"),
+            "throttled": self.throttled,
+        }
+
+    def _increase(self) -> None:
+        # Additive increase: about +1 slot per window of `limit` good responses
+        self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+        if self.rate is not None and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + 1.0 / max(self.rate, 1.0))
+        self._wake()
+
+    def _decrease(self, now: float) -> None:
+        if now - self._last_decrease < self.cooldown:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+        if self.rate is not None:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+
+    async def _acquire_slot(self) -> None:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # We were handed a slot just as we got cancelled
+                self._release_slot()
+            else:
+                try:
+                    self._waiters.remove(fut)
+                except ValueError:
+                    pass
+            raise
+
+    def _release_slot(self) -> None:
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_flight < int(self.limit):
+            fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self.in_flight += 1
+            fut.set_result(None)
+
+    async def _acquire_token(self) -> None:
+        # The lock makes waiters queue up in order instead of racing for tokens
+        async with self._token_lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                if self.rate is None:
+                    return
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._last_refill) * self.rate
+                )
+                self._last_refill = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
\ No newline at end of file
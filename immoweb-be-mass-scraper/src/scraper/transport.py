@@ -0,0 +1,120 @@
+import importlib.util
+from types import SimpleNamespace
+from typing import Optional
+
+import aiohttp
+
+from .metrics import MetricsRegistry
+
+# Error bodies up to this size are read and dropped so their connection can
+# go back to the pool; larger ones are abandoned with their connection
+DRAIN_LIMIT = 64 * 1024
+
+def accept_encoding() -> str:
+    """
+    Content codings the session can decode: gzip and deflate always, Brotli
+    when the optional `Brotli` (or `brotlicffi`) package is installed.
+    """
+    encodings = ["gzip", "deflate"]
+    if importlib.util.find_spec("brotli") or importlib.util.find_spec("brotlicffi"):
+        encodings.append("br")
+    return ", ".join(encodings)
+
+async def discard_body(resp: aiohttp.ClientResponse) -> None:
+    """Skip the body of a response that will not be used."""
+    length = resp.content_length
+    if length is not None and length <= DRAIN_LIMIT:
+        await resp.read()
+    resp.release()
+
+class HttpTransport:
+    """
+    The HTTP connection pool shared by everything that talks to the site in
+    one process: the search crawl, detail enrichment and long-running
+    modes all send their requests through `session`.
+
+    One `TCPConnector` keeps up to `pool_size` connections alive (at most
+    `pool_per_host` to one host, 0 for no limit) for `keepalive_timeout`
+    seconds between requests and caches DNS lookups for `dns_cache_ttl`
+    seconds, so consecutive requests reuse warm TLS connections instead of
+    handshaking again. With `compression`, responses are requested
+    compressed (see `accept_encoding`) and decoded transparently.
+
+    The session is created on first use, inside the running event loop;
+    `close` releases the pool. With `metrics`, new and reused connections
+    are counted as `http_connections_opened_total` and
+    `http_connections_reused_total`.
+    """
+
+    def __init__(
+        self,
+        *,
+        user_agent: str = "ImmowebMassScraper/1.0",
+        pool_size: int = 100,
+        pool_per_host: int = 32,
+        dns_cache_ttl: Optional[int] = 300,
+        keepalive_timeout: float = 30.0,
+        compression: bool = True,
+        metrics: Optional[MetricsRegistry] = None,
+    ) -> None:
+        self.user_agent = user_agent
+        self.pool_size = pool_size
+        self.pool_per_host = pool_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.compression = compression
+        self.metrics = metrics
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.pool_size,
+            limit_per_host=self.pool_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            use_dns_cache=self.dns_cache_ttl is not None,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        headers = {
+            "User-Agent": self.user_agent,
+            "Accept-Encoding": accept_encoding() if self.compression else "identity",
+        }
+        trace_configs = []
+        if self.metrics is not None:
+            trace_configs.append(self._trace_config(self.metrics))
+        return aiohttp.ClientSession(
+            connector=connector,
+            headers=headers,
+            auto_decompress=self.compression,
+            trace_configs=trace_configs,
+        )
+
+    @staticmethod
+    def _trace_config(metrics: MetricsRegistry) -> aiohttp.TraceConfig:
+        opened = metrics.counter(
+            "http_connections_opened_total", "New connections (TCP and TLS handshakes)"
+        )
+        reused = metrics.counter(
+            "http_connections_reused_total", "Requests sent on a pooled keep-alive connection"
+        )
+
+        async def on_create(session, context: SimpleNamespace, params) -> None:
+            opened.inc()
+
+        async def on_reuse(session, context: SimpleNamespace, params) -> None:
+            reused.inc()
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(on_create)
+        trace.on_connection_reuseconn.append(on_reuse)
+        return trace
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
\ No newline at end of file
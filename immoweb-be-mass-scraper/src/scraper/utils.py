@@ -1,10 +1,37 @@
 import asyncio
+import hashlib
+import json
 import logging
-from typing import Optional
+import time
+from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse, parse_qs, urlencode, urlunparse
 
 import aiohttp
 
+from .cache import CacheEntry, ResponseCache
+from .metrics import MetricsRegistry
+from .throttle import THROTTLE_STATUSES, AdaptiveRateLimiter, parse_retry_after
+from .transport import discard_body
+
+# Listing fields that describe the property itself. Changes to any of them
+# change the listing's content digest; bookkeeping fields (id, url, status,
+# searchUrl, views, ...) do not.
+CONTENT_FIELDS = (
+    "title",
+    "description",
+    "price",
+    "photos",
+    "location",
+    "propertyType",
+    "bedrooms",
+    "bathrooms",
+    "area",
+    "energyClass",
+    "publisher",
+    "contact",
+    "datePosted",
+)
+
 def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     if not logger.handlers:
@@ -27,20 +54,78 @@ async def fetch(
     logger: logging.Logger,
     max_retries: int = 3,
     backoff_factor: float = 1.5,
+    cache: Optional[ResponseCache] = None,
+    limiter: Optional[AdaptiveRateLimiter] = None,
+    metrics: Optional[MetricsRegistry] = None,
 ) -> Optional[str]:
+    cached: Optional[CacheEntry] = None
+    if cache is not None:
+        cached, fresh = cache.lookup(url)
+        if cached is not None and fresh:
+            if metrics is not None:
+                metrics.counter("http_cache_hits_total", "Pages served from the response cache").inc()
+            return cached.body
+        headers = cache.conditional_headers(cached)
+    else:
+        headers = {}
+
     for attempt in range(1, max_retries + 1):
+        if limiter is not None:
+            await limiter.acquire()
+        started = time.monotonic()
+        status: Optional[int] = None
+        retry_after: Optional[float] = None
+        request_failed = False
+        cancelled = False
         try:
-            async with session.get(url, timeout=timeout) as resp:
-                text = await resp.text()
-                if resp.status != 200:
+            async with session.get(url, timeout=timeout, headers=headers) as resp:
+                status = resp.status
+                if status == 304 and cached is not None:
+                    return cache.revalidated(url, cached)
+                if status in THROTTLE_STATUSES:
+                    retry_after = parse_retry_after(resp.headers.get("Retry-After"))
+                    await discard_body(resp)
+                    logger.warning(
+                        "Throttled with status %s for %s (attempt %s/%s, retry after %s)",
+                        status,
+                        url,
+                        attempt,
+                        max_retries,
+                        retry_after,
+                    )
+                elif status != 200:
+                    # Error pages are never parsed or cached
+                    await discard_body(resp)
                     logger.warning(
                         "Non-200 status %s for %s (attempt %s)",
-                        resp.status,
+                        status,
                         url,
                         attempt,
                     )
-                return text
+                    if status < 500:
+                        # Client errors will not go away on a retry
+                        return None
+                else:
+                    body = await resp.read()
+                    text = await resp.text()
+                    if metrics is not None:
+                        metrics.counter(
+                            "http_response_bytes_total", "Response body bytes downloaded, decompressed"
+                        ).inc(len(body))
+                        metrics.counter(
+                            "http_transfer_bytes_total",
+                            "Response body bytes on the wire, before decompression",
+                        ).inc(getattr(resp.content, "total_raw_bytes", None) or len(body))
+                    if cache is not None:
+                        cache.store(
+                            url,
+                            text,
+                            etag=resp.headers.get("ETag"),
+                            last_modified=resp.headers.get("Last-Modified"),
+                        )
+                    return text
         except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            request_failed = True
             logger.warning(
                 "Request error for %s on attempt %s/%s: %s",
                 url,
@@ -48,10 +133,43 @@ async def fetch(
                 max_retries,
                 e,
             )
-            if attempt == max_retries:
-                logger.error("Giving up on %s after %s attempts", url, max_retries)
-                return None
-            await asyncio.sleep(backoff_factor ** (attempt - 1))
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            latency = time.monotonic() - started
+            if limiter is not None:
+                limiter.release(
+                    status=status,
+                    latency=latency,
+                    retry_after=retry_after,
+                    cancelled=cancelled,
+                )
+            if metrics is not None:
+                if not cancelled:
+                    metrics.histogram(
+                        "http_request_duration_seconds", "Search page request latency"
+                    ).observe(latency)
+                # Without a response: a transport error, or a speculative
+                # request cancelled by the crawler
+                label = status or ("error" if request_failed else "cancelled")
+                metrics.counter(
+                    "http_responses_total", "Responses by status code"
+                ).inc(status=label)
+
+        if attempt == max_retries:
+            logger.error("Giving up on %s after %s attempts", url, max_retries)
+            if metrics is not None:
+                metrics.counter("http_failures_total", "URLs given up on after all retries").inc()
+            return None
+        if metrics is not None:
+            metrics.counter("http_retries_total", "Requests retried after a failed attempt").inc()
+        delay = backoff_factor ** (attempt - 1)
+        if retry_after is not None:
+            # A limiter pauses every request until Retry-After has passed;
+            # without one, honour it for this URL at least.
+            delay = 0.0 if limiter is not None else retry_after
+        await asyncio.sleep(delay)
     return None
 
 def build_paged_url(base_url: str, page: int) -> str:
@@ -70,4 +188,35 @@ def extract_listing_id_from_url(url: str) -> Optional[str]:
     for part in reversed(path_parts):
         if part.isdigit():
             return part
-    return None
\ No newline at end of file
+    return None
+
+def _normalize_content_value(value: Any) -> Any:
+    if isinstance(value, str):
+        return " ".join(value.split()) or None
+    if isinstance(value, (list, tuple)):
+        # Photo order is presentation, not content
+        return sorted(str(v) for v in value)
+    return value
+
+def listing_digest(item: Dict[str, Any]) -> str:
+    """
+    Stable digest over the normalized CONTENT_FIELDS of a listing, so that a
+    changed price, area, description, photo set, ... can be detected between
+    runs without comparing whole records.
+    """
+    payload = json.dumps(
+        [_normalize_content_value(item.get(field)) for field in CONTENT_FIELDS],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+def changed_content_fields(
+    previous: Dict[str, Any], current: Dict[str, Any]
+) -> List[str]:
+    return [
+        field
+        for field in CONTENT_FIELDS
+        if _normalize_content_value(previous.get(field))
+        != _normalize_content_value(current.get(field))
+    ]
\ No newline at end of file